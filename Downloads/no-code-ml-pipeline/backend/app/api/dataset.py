@@ -1,11 +1,16 @@
 """
 Dataset information API endpoints.
 """
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from app.models.dataset import DatasetInfo, DatasetPreview
-from app.services.dataset_service import DatasetService
+from app.services.executor import ServiceExecutor
+from app.services.profiling_service import ProfilingService
+from app.core.lazy import LazyImport
 
 
+DatasetService = LazyImport('app.services.dataset_service', 'DatasetService')
+
 router = APIRouter()
 
 
@@ -21,7 +26,7 @@ async def get_dataset_info(dataset_id: str):
         DatasetInfo object
     """
     try:
-        return DatasetService.get_dataset_info(dataset_id)
+        return await ServiceExecutor.read(dataset_id, DatasetService.get_dataset_info, dataset_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -32,19 +37,29 @@ async def get_dataset_info(dataset_id: str):
 
 
 @router.get("/dataset/{dataset_id}/preview", response_model=DatasetPreview)
-async def get_dataset_preview(dataset_id: str, num_rows: int = 10):
+async def get_dataset_preview(
+    dataset_id: str,
+    response: Response,
+    num_rows: int = 10,
+    profile_id: Optional[str] = Depends(ProfilingService.requested)
+):
     """
     Get dataset preview with sample rows.
     
     Args:
         dataset_id: Dataset identifier
+        response: Response whose headers carry the profile id
         num_rows: Number of rows to preview (default: 10)
+        profile_id: Set when the request asked to be profiled
         
     Returns:
         DatasetPreview object
     """
     try:
-        return DatasetService.get_dataset_preview(dataset_id, num_rows)
+        preview = ProfilingService.wrap(DatasetService.get_dataset_preview, profile_id, 'dataset preview')
+        if profile_id:
+            response.headers['X-Profile-Id'] = profile_id
+        return await ServiceExecutor.read(dataset_id, preview, dataset_id, num_rows)
     except HTTPException:
         raise
     except Exception as e:
@@ -67,7 +82,7 @@ async def set_target_column(dataset_id: str, target_column: str):
         Validation result
     """
     try:
-        return DatasetService.set_target_column(dataset_id, target_column)
+        return await ServiceExecutor.write(dataset_id, DatasetService.set_target_column, dataset_id, target_column)
     except HTTPException:
         raise
     except Exception as e:
@@ -89,7 +104,7 @@ async def get_target_recommendations(dataset_id: str):
         List of recommended columns with scores
     """
     try:
-        return DatasetService.get_target_recommendations(dataset_id)
+        return await ServiceExecutor.read(dataset_id, DatasetService.get_target_recommendations, dataset_id)
     except HTTPException:
         raise
     except Exception as e:
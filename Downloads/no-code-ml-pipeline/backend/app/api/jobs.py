@@ -0,0 +1,165 @@
+"""
+Background job API endpoints.
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from app.models.job import JobCapacity, JobInfo, JobStatus, LeaderboardJobRequest, StreamTrainJobRequest, TrainingJobRequest
+from app.services.executor import ServiceExecutor
+from app.services.job_service import JobService
+from app.services.profiling_service import ProfilingService
+
+
+router = APIRouter()
+
+
+@router.post("/jobs/train", response_model=JobInfo)
+async def submit_training_job(
+    request: TrainingJobRequest,
+    profile_id: Optional[str] = Depends(ProfilingService.requested)
+):
+    """
+    Submit a model training job.
+    
+    Args:
+        request: Model training configuration and optional timeout
+        profile_id: Set when the request asked to be profiled
+        
+    Returns:
+        JobInfo for the queued job (its profile_id names the profile)
+    """
+    try:
+        return await ServiceExecutor.run(
+            JobService.submit,
+            'train',
+            request.model_dump(mode='json', exclude={'timeout_s'}),
+            timeout_s=request.timeout_s,
+            profile_id=profile_id
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error submitting training job: {str(e)}"
+        )
+
+
+@router.post("/jobs/leaderboard", response_model=JobInfo)
+async def submit_leaderboard_job(request: LeaderboardJobRequest):
+    """
+    Submit a leaderboard job comparing several model types.
+    
+    Args:
+        request: Model types, shared search options and optional timeout
+        
+    Returns:
+        JobInfo for the queued job
+    """
+    try:
+        return await ServiceExecutor.run(
+            JobService.submit,
+            'leaderboard',
+            request.model_dump(mode='json', exclude={'timeout_s'}),
+            timeout_s=request.timeout_s
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error submitting leaderboard job: {str(e)}"
+        )
+
+
+@router.post("/jobs/train-stream", response_model=JobInfo)
+async def submit_stream_training_job(request: StreamTrainJobRequest):
+    """
+    Submit an incremental training job over a streamed dataset.
+    
+    Args:
+        request: Streaming training configuration and optional timeout
+        
+    Returns:
+        JobInfo for the queued job
+    """
+    try:
+        return await ServiceExecutor.run(
+            JobService.submit,
+            'stream_train',
+            request.model_dump(mode='json', exclude={'timeout_s'}),
+            timeout_s=request.timeout_s
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error submitting streaming training job: {str(e)}"
+        )
+
+
+@router.get("/jobs", response_model=List[JobInfo])
+async def list_jobs(status: Optional[JobStatus] = None):
+    """
+    List background jobs, newest first.
+    
+    Args:
+        status: Optional status filter
+        
+    Returns:
+        List of JobInfo objects
+    """
+    return await ServiceExecutor.run(JobService.list_jobs, status)
+
+
+@router.get("/jobs/capacity", response_model=JobCapacity)
+async def get_job_capacity():
+    """
+    Get the training queue depth and compute slot usage.
+    
+    Returns:
+        JobCapacity object
+    """
+    return await ServiceExecutor.run(JobService.capacity)
+
+
+@router.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job_status(job_id: str):
+    """
+    Get the status of a job.
+    
+    Args:
+        job_id: Job identifier
+        
+    Returns:
+        JobInfo object
+    """
+    return await ServiceExecutor.run(JobService.get_job, job_id)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Get the result of a succeeded job.
+    
+    Args:
+        job_id: Job identifier
+        
+    Returns:
+        Job result (training metrics for training jobs)
+    """
+    return await ServiceExecutor.run(JobService.get_result, job_id)
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobInfo)
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job.
+    
+    Args:
+        job_id: Job identifier
+        
+    Returns:
+        Updated JobInfo
+    """
+    return await ServiceExecutor.run(JobService.cancel, job_id)
@@ -1,61 +1,166 @@
 """
 Model training API endpoints.
 """
-from fastapi import APIRouter, HTTPException
-from app.models.model import ModelTrainRequest, ModelTrainResponse
-from app.services.model_service import ModelService
+import asyncio
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from app.models.job import JobStatus
+from app.models.model import (
+    ExplainRequest, ExplainResponse, ImportanceRequest, ImportanceResponse, LeaderboardRequest, LeaderboardResponse,
+    ModelTrainRequest, ModelTrainResponse, StreamTrainRequest, StreamTrainResponse
+)
+from app.services.job_service import JobService
+from app.services.executor import ServiceExecutor
+from app.services.profiling_service import ProfilingService
+from app.core.lazy import LazyImport
 
 
+ModelService = LazyImport('app.services.model_service', 'ModelService')
+ModelRegistry = LazyImport('app.services.model_registry', 'ModelRegistry')
+ExplanationService = LazyImport('app.services.explanation_service', 'ExplanationService')
+
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 @router.post("/train-model", response_model=ModelTrainResponse)
-async def train_model(request: ModelTrainRequest):
+async def train_model(
+    request: ModelTrainRequest,
+    response: Response,
+    profile_id: Optional[str] = Depends(ProfilingService.requested)
+):
     """
     Train a machine learning model.
     
     Args:
         request: Model training configuration
+        response: Response whose headers carry the profile id
+        profile_id: Set when the request asked to be profiled
         
     Returns:
         ModelTrainResponse with metrics and results
     """
     try:
-        # Train model
-        results = ModelService.train_model(
-            dataset_id=request.dataset_id,
-            model_type=request.model_type,
-            target_column=request.target_column,
-            hyperparameters=request.hyperparameters
+        # Train model in a background worker and wait without blocking the event loop
+        job = await ServiceExecutor.run(
+            JobService.submit, 'train', request.model_dump(mode='json'), profile_id=profile_id
         )
+        if profile_id:
+            response.headers['X-Profile-Id'] = profile_id
+        record = await asyncio.wrap_future(JobService.wait(job['job_id']))
+        if record['status'] != JobStatus.SUCCEEDED.value:
+            raise HTTPException(
+                status_code=record.get('error_status') or 500,
+                detail=record['error'] or f"Training job {record['status']}"
+            )
+        results = record['result']
         
         return ModelTrainResponse(
             success=True,
             message="Model trained successfully",
             model_id=results['model_id'],
+            version=results.get('version'),
             model_type=results['model_type'],
+            split_id=results['split_id'],
             accuracy=results['accuracy'],
+            cv_score=results.get('cv_score'),
             precision=results.get('precision'),
             recall=results.get('recall'),
             f1_score=results.get('f1_score'),
+            roc_auc=results.get('roc_auc'),
+            pr_auc=results.get('pr_auc'),
+            confidence_intervals=results.get('confidence_intervals'),
             confusion_matrix=results.get('confusion_matrix'),
             class_labels=results.get('class_labels'),
-            feature_importance=results.get('feature_importance')
+            feature_importance=results.get('feature_importance'),
+            search=results.get('search'),
+            cached=results.get('cached', False)
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        print(f"ERROR TRAINING MODEL: {str(e)}")
-        print(f"FULL TRACEBACK:")
-        traceback.print_exc()
+        logger.exception("Error training model")
         raise HTTPException(
             status_code=500,
             detail=f"Error training model: {str(e)}"
         )
 
 
+@router.post("/train-model/stream", response_model=StreamTrainResponse)
+async def train_model_stream(request: StreamTrainRequest):
+    """
+    Train an incremental model over the dataset file in chunks.
+    
+    The uploaded CSV is read from disk chunk by chunk, so datasets larger
+    than memory can be trained on; in-memory preprocessing is not applied.
+    
+    Args:
+        request: Streaming training configuration
+        
+    Returns:
+        StreamTrainResponse with holdout metrics and per-epoch scores
+    """
+    try:
+        job = await ServiceExecutor.run(JobService.submit, 'stream_train', request.model_dump(mode='json'))
+        record = await asyncio.wrap_future(JobService.wait(job['job_id']))
+        if record['status'] != JobStatus.SUCCEEDED.value:
+            raise HTTPException(
+                status_code=record.get('error_status') or 500,
+                detail=record['error'] or f"Streaming training job {record['status']}"
+            )
+        
+        return StreamTrainResponse(
+            success=True,
+            message="Model trained successfully",
+            **record['result']
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error in streaming training: {str(e)}"
+        )
+
+
+@router.post("/leaderboard", response_model=LeaderboardResponse)
+async def train_leaderboard(request: LeaderboardRequest):
+    """
+    Train several model types on the same split and CV folds and rank them.
+    
+    Args:
+        request: Model types and shared search options
+        
+    Returns:
+        LeaderboardResponse with a ranked table of metrics and fit times
+    """
+    try:
+        job = await ServiceExecutor.run(JobService.submit, 'leaderboard', request.model_dump(mode='json'))
+        record = await asyncio.wrap_future(JobService.wait(job['job_id']))
+        if record['status'] != JobStatus.SUCCEEDED.value:
+            raise HTTPException(
+                status_code=record.get('error_status') or 500,
+                detail=record['error'] or f"Leaderboard job {record['status']}"
+            )
+        
+        return LeaderboardResponse(
+            success=True,
+            message="Leaderboard trained successfully",
+            **record['result']
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error training leaderboard: {str(e)}"
+        )
+
+
 @router.get("/model/{model_id}")
 async def get_model_results(model_id: str):
     """
@@ -68,13 +173,26 @@ async def get_model_results(model_id: str):
         Model results and metrics
     """
     try:
-        model_data = ModelService.get_model(model_id)
+        # Metadata only: the estimator is not loaded
+        model_data = await ServiceExecutor.run(ModelService.get_model, model_id)
         return {
             'model_id': model_id,
+            'version': model_data['version'],
+            'versioned_model_id': model_data['model_id'],
+            'created_at': model_data['created_at'],
             'model_type': model_data['model_type'],
+            'estimator_class': model_data['estimator_class'],
             'metrics': model_data['metrics'],
             'feature_importance': model_data.get('feature_importance'),
-            'hyperparameters': model_data.get('hyperparameters', {})
+            'hyperparameters': model_data.get('hyperparameters', {}),
+            'search': model_data.get('search'),
+            'dataset_id': model_data['dataset_id'],
+            'target_column': model_data['target_column'],
+            'feature_names': model_data['feature_names'],
+            'split_id': model_data.get('split_id'),
+            'split': model_data.get('split'),
+            'cv': model_data.get('cv'),
+            'compiled': model_data.get('compiled')
         }
     except HTTPException:
         raise
@@ -85,4 +203,144 @@ async def get_model_results(model_id: str):
         )
 
 
+@router.post("/model/{model_id}/explain", response_model=ExplainResponse)
+async def explain_predictions(model_id: str, request: ExplainRequest):
+    """
+    Explain decision-tree predictions through their decision paths.
+    
+    Each row gets the nodes it passed through and every split feature's
+    contribution to its prediction. The whole batch, up to an entire
+    test set, is explained in one vectorized pass.
+    
+    Args:
+        model_id: Model name (latest version) or name@version
+        request: Rows to explain, or use_test_set for the model's test split
+        
+    Returns:
+        ExplainResponse with per-row contributions and paths
+    """
+    try:
+        # The test split is rebuilt from the dataset when it is not cached
+        metadata = await ServiceExecutor.run(ModelRegistry.get_metadata, model_id)
+        result = await ServiceExecutor.read(
+            metadata['dataset_id'],
+            ExplanationService.explain,
+            metadata['model_id'],
+            records=request.records,
+            use_test_set=request.use_test_set,
+            include_paths=request.include_paths
+        )
+        return ExplainResponse(
+            success=True,
+            message=f"Explained {result['n_rows']} predictions",
+            **result
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error explaining predictions: {str(e)}"
+        )
+
+
+@router.post("/model/{model_id}/importance", response_model=ImportanceResponse)
+async def get_feature_importance(model_id: str, request: ImportanceRequest = ImportanceRequest()):
+    """
+    Compute permutation feature importance on a model's test split.
+    
+    Works for every model type. Results are cached per model version and
+    settings, so repeated requests return immediately.
+    
+    Args:
+        model_id: Model name (latest version) or name@version
+        request: Repeats, optional top-k screening and seed
+        
+    Returns:
+        ImportanceResponse with features ranked by mean score drop
+    """
+    try:
+        job = await ServiceExecutor.run(
+            JobService.submit, 'importance', {'model_id': model_id, **request.model_dump()}
+        )
+        record = await asyncio.wrap_future(JobService.wait(job['job_id']))
+        if record['status'] != JobStatus.SUCCEEDED.value:
+            raise HTTPException(
+                status_code=record.get('error_status') or 500,
+                detail=record['error'] or f"Importance job {record['status']}"
+            )
+        
+        return ImportanceResponse(
+            success=True,
+            message="Feature importance computed successfully",
+            **record['result']
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error computing feature importance: {str(e)}"
+        )
+
 
+@router.post("/model/{model_id}/export")
+async def export_model(model_id: str):
+    """
+    Compile a model version into its array form for fast prediction.
+    
+    Models trained with MODEL_EXPORT_COMPILED on are exported already;
+    this compiles versions registered before.
+    
+    Args:
+        model_id: Model name (latest version) or name@version
+        
+    Returns:
+        Summary of the compiled form
+    """
+    try:
+        metadata = await ServiceExecutor.run(ModelService.get_model, model_id)
+        summary = await ServiceExecutor.run(ModelService.export_model, metadata['model_id'])
+        return {'model_id': metadata['model_id'], 'compiled': summary}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error exporting model: {str(e)}"
+        )
+
+
+@router.get("/model/{model_id}/versions")
+async def list_model_versions(model_id: str):
+    """
+    List the registered versions of a model, newest first.
+    
+    Args:
+        model_id: Model name
+        
+    Returns:
+        List of version summaries
+    """
+    try:
+        versions = await ServiceExecutor.run(ModelRegistry.list_versions, model_id.partition('@')[0])
+        return [
+            {
+                'model_id': version['model_id'],
+                'version': version['version'],
+                'created_at': version['created_at'],
+                'split_id': version.get('split_id'),
+                'metrics': version['metrics'],
+                'hyperparameters': version.get('hyperparameters', {})
+            }
+            for version in versions
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error listing model versions: {str(e)}"
+        )
@@ -0,0 +1,183 @@
+"""
+Model prediction API endpoints.
+"""
+import itertools
+import tempfile
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.datastructures import UploadFile
+from app.models.prediction import OnlinePredictionRequest, OnlinePredictionResponse, OnlineStats
+from app.core.config import settings
+from app.core.lazy import LazyImport
+from app.services.executor import ServiceExecutor
+
+
+PredictionService = LazyImport('app.services.prediction_service', 'PredictionService')
+OnlinePredictionService = LazyImport('app.services.online_service', 'OnlinePredictionService')
+
+router = APIRouter()
+
+MEDIA_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+@router.post("/model/{model_id}/predict")
+async def predict(
+    model_id: str,
+    request: Request,
+    format: Optional[str] = None,
+    include_proba: bool = False,
+    chunk_size: Optional[int] = None
+):
+    """
+    Predict with a trained model.
+    
+    The request body is either a JSON batch (a list of row objects or
+    {"records": [...]}), a multipart upload with a CSV ``file`` field, or a
+    raw ``text/csv`` body streamed by the client. Rows are encoded with the
+    model's stored preprocessing and predicted in fixed-size chunks; CSV and
+    NDJSON output is streamed back chunk by chunk.
+    
+    Args:
+        model_id: Model name (latest version) or name@version
+        request: Incoming request
+        format: Output format: json, csv or ndjson (defaults to json for
+            JSON input and csv otherwise)
+        include_proba: Add class probability columns (classifiers only)
+        chunk_size: Rows per prediction chunk
+        
+    Returns:
+        JSON predictions or a streamed CSV/NDJSON response
+    """
+    source = None
+    chunks = None
+    try:
+        size = PredictionService.chunk_size(chunk_size)
+        loaded = await ServiceExecutor.run(PredictionService.load, model_id)
+        content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+        
+        if content_type == 'application/json':
+            body = await request.json()
+            records = body.get('records') if isinstance(body, dict) else body
+            if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+                raise HTTPException(
+                    status_code=400,
+                    detail="JSON input must be a list of row objects or {\"records\": [...]}"
+                )
+            chunks = PredictionService.records_chunks(records, size)
+            default_format = 'json'
+        elif content_type == 'multipart/form-data':
+            form = await request.form()
+            upload = form.get('file')
+            if not isinstance(upload, UploadFile):
+                raise HTTPException(status_code=400, detail="Multipart input needs a CSV 'file' field")
+            source = upload.file
+            chunks = PredictionService.csv_chunks(loaded, source, size)
+            default_format = 'csv'
+        elif content_type in ('text/csv', 'application/octet-stream', ''):
+            # Spool the streamed body; only the first PREDICTION_SPOOL_SIZE bytes stay in memory
+            source = tempfile.SpooledTemporaryFile(max_size=settings.PREDICTION_SPOOL_SIZE)
+            async for piece in request.stream():
+                source.write(piece)
+            source.seek(0)
+            chunks = PredictionService.csv_chunks(loaded, source, size)
+            default_format = 'csv'
+        else:
+            raise HTTPException(
+                status_code=415,
+                detail=f"Unsupported content type: {content_type}. Use application/json, multipart/form-data or text/csv"
+            )
+        
+        output_format = (format or default_format).lower()
+        if output_format not in ('json', 'csv', 'ndjson'):
+            raise HTTPException(status_code=400, detail="format must be one of json, csv, ndjson")
+        
+        predictions = PredictionService.predict_chunks(loaded, chunks, include_proba)
+        # Predict the first chunk before responding so bad input gets a 4xx status
+        first = await ServiceExecutor.run(next, predictions, None)
+        predictions = itertools.chain([] if first is None else [first], predictions)
+        version_id = loaded['metadata']['model_id']
+        
+        if output_format == 'json':
+            results = await ServiceExecutor.run(
+                lambda: [row for chunk in predictions for row in chunk.to_dict(orient='records')]
+            )
+            return {'model_id': version_id, 'n_rows': len(results), 'predictions': results}
+        
+        # The response now owns the input and releases it after streaming
+        response = StreamingResponse(
+            _iterate(PredictionService.serialize(predictions, output_format)),
+            media_type=MEDIA_TYPES[output_format],
+            headers={'X-Model-Id': version_id},
+            background=BackgroundTask(_release, chunks, source)
+        )
+        chunks, source = None, None
+        return response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error predicting: {str(e)}"
+        )
+    finally:
+        _release(chunks, source)
+
+
+@router.post("/model/{model_id}/predict/online", response_model=OnlinePredictionResponse)
+async def predict_online(model_id: str, request: OnlinePredictionRequest):
+    """
+    Predict a single row with low latency.
+    
+    Concurrent requests for the same model version are gathered for up to
+    ONLINE_BATCH_WINDOW_MS and predicted in one vectorized call.
+    
+    Args:
+        model_id: Model name (latest version) or name@version
+        request: Input row and options
+        
+    Returns:
+        OnlinePredictionResponse with the prediction
+    """
+    try:
+        result = await OnlinePredictionService.predict(model_id, request.features, request.include_proba)
+        return OnlinePredictionResponse(**result)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error predicting: {str(e)}"
+        )
+
+
+@router.get("/predict/online/stats", response_model=OnlineStats)
+async def online_stats():
+    """
+    Get online prediction latency and batching statistics.
+    
+    Returns:
+        OnlineStats with p50/p99 latency and the batch-size distribution
+        per resident model version
+    """
+    return OnlineStats(**OnlinePredictionService.stats())
+
+
+async def _iterate(pieces):
+    """Pull each streamed piece in the service pool instead of Starlette's threadpool."""
+    while True:
+        piece = await ServiceExecutor.run(next, pieces, None)
+        if piece is None:
+            return
+        yield piece
+
+
+def _release(chunks, source):
+    """Stop the chunk reader, then close the spooled or uploaded input."""
+    if chunks is not None:
+        chunks.close()
+    if source is not None:
+        source.close()
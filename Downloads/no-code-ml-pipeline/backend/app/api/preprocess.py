@@ -3,9 +3,12 @@ Data preprocessing API endpoints.
 """
 from fastapi import APIRouter, HTTPException
 from app.models.preprocess import PreprocessRequest, PreprocessResponse
-from app.services.preprocess_service import PreprocessService
+from app.services.executor import ServiceExecutor
+from app.core.lazy import LazyImport
 
 
+PreprocessService = LazyImport('app.services.preprocess_service', 'PreprocessService')
+
 router = APIRouter()
 
 
@@ -22,7 +25,9 @@ async def preprocess_dataset(request: PreprocessRequest):
     """
     try:
         # Apply scaling
-        df, scaled_columns = PreprocessService.apply_scaling(
+        df, scaled_columns = await ServiceExecutor.write(
+            request.dataset_id,
+            PreprocessService.apply_scaling,
             dataset_id=request.dataset_id,
             scaler_type=request.scaler_type,
             columns_to_scale=request.columns_to_scale,
@@ -0,0 +1,60 @@
+"""
+Request profile API endpoints.
+"""
+from typing import Any, Dict, List
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, PlainTextResponse
+from app.services.executor import ServiceExecutor
+from app.services.profiling_service import ProfilingService
+
+
+router = APIRouter()
+
+
+@router.get("/profiles", response_model=List[Dict[str, Any]])
+async def list_profiles():
+    """
+    List stored request profiles, newest first.
+    
+    Returns:
+        Profile metadata records
+    """
+    return await ServiceExecutor.run(ProfilingService.list_profiles)
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "text", sort: str = "cumulative", limit: int = 50):
+    """
+    Get a stored request profile.
+    
+    Args:
+        profile_id: Profile identifier from the X-Profile-Id response header
+        format: "text" for a pstats report, "pstats" for the raw file
+            (for snakeviz, flameprof or pstats.Stats)
+        sort: pstats sort key of the text report
+        limit: Functions listed in the text report
+        
+    Returns:
+        Text report or the pstats file
+    """
+    try:
+        if format == "pstats":
+            return FileResponse(
+                await ServiceExecutor.run(ProfilingService.profile_path, profile_id),
+                media_type="application/octet-stream",
+                filename=f"{profile_id}.prof"
+            )
+        if format != "text":
+            raise HTTPException(status_code=400, detail=f"Unsupported profile format: {format}")
+        meta = await ServiceExecutor.run(ProfilingService.get_profile, profile_id)
+        segments = ', '.join(f"{s['label']} {s['elapsed_s']:.3f}s" for s in meta['segments'])
+        header = f"Profile {profile_id}: {meta['elapsed_s']:.3f}s ({segments})\n\n"
+        report = await ServiceExecutor.run(ProfilingService.render, profile_id, sort, limit)
+        return PlainTextResponse(header + report)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error reading profile: {str(e)}"
+        )
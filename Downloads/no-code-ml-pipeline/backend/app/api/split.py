@@ -3,9 +3,12 @@ Train-test split API endpoints.
 """
 from fastapi import APIRouter, HTTPException
 from app.models.model import TrainTestSplitRequest, TrainTestSplitResponse
-from app.services.split_service import SplitService
+from app.services.executor import ServiceExecutor
+from app.core.lazy import LazyImport
 
 
+SplitService = LazyImport('app.services.split_service', 'SplitService')
+
 router = APIRouter()
 
 
@@ -22,20 +25,28 @@ async def perform_train_test_split(request: TrainTestSplitRequest):
     """
     try:
         # Perform split
-        train_size, test_size = SplitService.perform_split(
+        split_id, train_size, test_size = await ServiceExecutor.read(
+            request.dataset_id,
+            SplitService.perform_split,
             dataset_id=request.dataset_id,
             target_column=request.target_column,
             test_size=request.test_size,
-            random_state=request.random_state
+            random_state=request.random_state,
+            categorical_encoding=request.categorical_encoding,
+            hash_n_features=request.hash_n_features
         )
+        split_data = SplitService.get_split(split_id)
         
         return TrainTestSplitResponse(
             success=True,
             message="Train-test split completed successfully",
             dataset_id=request.dataset_id,
+            split_id=split_id,
             train_size=train_size,
             test_size=test_size,
-            target_column=request.target_column
+            target_column=request.target_column,
+            categorical_encoding=split_data['categorical_encoding'],
+            n_features=len(split_data['feature_names'])
         )
         
     except HTTPException:
@@ -4,9 +4,12 @@ Dataset upload API endpoint.
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from app.models.dataset import DatasetUploadResponse
 from app.utils.file_handler import save_upload_file
-from app.services.dataset_service import DatasetService
+from app.services.executor import ServiceExecutor
+from app.core.lazy import LazyImport
 
 
+DatasetService = LazyImport('app.services.dataset_service', 'DatasetService')
+
 router = APIRouter()
 
 
@@ -26,7 +29,7 @@ async def upload_dataset(file: UploadFile = File(...)):
         dataset_id, file_path = await save_upload_file(file)
         
         # Load and parse dataset
-        info = DatasetService.load_dataset(dataset_id, file_path)
+        info = await ServiceExecutor.write(dataset_id, DatasetService.load_dataset, dataset_id, file_path)
         
         return DatasetUploadResponse(
             success=True,
@@ -14,6 +14,12 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "No-Code ML Pipeline Builder"
     VERSION: str = "1.0.0"
     
+    # Logging Settings
+    LOG_LEVEL: str = "INFO"  # DEBUG adds per-stage timings and data dumps
+    
+    # Startup Settings
+    WARMUP_ON_STARTUP: bool = True  # Import the ML stack in the background once the server listens (else on the first /ready)
+    
     # CORS Settings
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -24,11 +30,59 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 10485760  # 10MB in bytes
     UPLOAD_DIR: str = "uploads"
     TEMP_DIR: str = "temp"
+    MODEL_DIR: str = "models/registry"  # Versioned trained models
     ALLOWED_EXTENSIONS: List[str] = [".csv", ".xlsx", ".xls"]
     
     # ML Settings
     RANDOM_STATE: int = 42
     DEFAULT_TEST_SIZE: float = 0.3
+    SPLIT_CACHE_SIZE: int = 32  # Cached train-test splits kept in memory
+    RESULT_CACHE_ENABLED: bool = True  # Reuse stored results of identical training runs
+    RESULT_CACHE_SIZE: int = 256  # Training results kept on disk
+    MODEL_CACHE_SIZE: int = 8  # Registered models kept loaded in memory
+    MODEL_EXPORT_COMPILED: bool = True  # Compile trees and linear models into array form after training
+    STREAM_CHUNK_SIZE: int = 50000  # Rows per chunk when training on a streamed dataset
+    STREAM_MAX_CHUNK_SIZE: int = 1000000
+    
+    # Prediction Settings
+    PREDICTION_CHUNK_SIZE: int = 10000  # Rows encoded and predicted at once
+    PREDICTION_MAX_CHUNK_SIZE: int = 100000
+    PREDICTION_SPOOL_SIZE: int = 8388608  # Streamed CSV bodies beyond 8MB spill to disk
+    PREDICTION_COMPILED: bool = True  # Predict with a model's compiled form when it has one
+    EXPLANATION_MAX_ROWS: int = 100000  # Rows explained in one decision-path request
+    ONLINE_BATCH_WINDOW_MS: float = 2.0  # How long a single-row request waits for others to batch with
+    ONLINE_MAX_BATCH_SIZE: int = 64  # Rows per online micro-batch
+    ONLINE_STATS_WINDOW: int = 10000  # Recent requests kept for latency percentiles
+    
+    # Evaluation Settings
+    EVALUATION_BOOTSTRAP_ROUNDS: int = 0  # Bootstrap resamples for metric confidence intervals (0 = off)
+    EVALUATION_MAX_BOOTSTRAP_ROUNDS: int = 5000
+    EVALUATION_CONFIDENCE: float = 0.95  # Confidence level of bootstrap intervals
+    EVALUATION_CURVE_POINTS: int = 101  # Points kept per stored ROC/PR curve
+    TRAINING_PERMUTATION_IMPORTANCE: bool = True  # Permutation importance for models without impurity importances
+    IMPORTANCE_REPEATS: int = 5  # Permutations per feature at training time
+    IMPORTANCE_TOP_K: int = 20  # Features refined past screening at training time (0 = all)
+    
+    # Training Job Settings
+    TRAINING_MAX_WORKERS: int = 2  # Concurrent training worker processes
+    TRAINING_MAX_QUEUED: int = 100  # Jobs waiting for a worker before submits are rejected
+    TRAINING_JOB_TIMEOUT: float = 1800.0  # Default per-job timeout in seconds
+    TRAINING_START_METHOD: str = "spawn"  # multiprocessing start method for workers
+    TRAINING_WORKER_MAX_JOBS: int = 50  # Jobs a worker process runs before it is replaced (0 = never)
+    TRAINING_SHARED_ARRAYS: bool = True  # Hand workers memory-mapped split matrices
+    JOB_RETENTION_COUNT: int = 1000  # Finished jobs kept in memory and under TEMP_DIR/jobs
+    JOB_RETENTION_S: float = 604800.0  # Finished jobs are removed after this many seconds (0 = no limit)
+    
+    # Compute Scheduler Settings
+    COMPUTE_SLOTS: int = 0  # CPU slots shared by all jobs (0 = one per core)
+    COMPUTE_SLOTS_PER_JOB: int = 0  # Max slots per job (0 = equal share per training worker)
+    
+    # Executor Settings
+    EXECUTOR_THREADS: int = 0  # Threads for blocking service calls from endpoints (0 = min(32, cores + 4))
+    
+    # Profiling Settings
+    PROFILING_ENABLED: bool = False  # Let requests ask for a profile with X-Profile: 1 or ?profile=1
+    PROFILE_MAX_FILES: int = 50  # Stored profiles kept under TEMP_DIR/profiles
     
     class Config:
         env_file = ".env"
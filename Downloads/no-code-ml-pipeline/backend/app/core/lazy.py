@@ -0,0 +1,38 @@
+"""
+Deferred imports for modules that pull in the ML stack.
+"""
+import importlib
+from typing import Any
+
+
+class LazyImport:
+    """
+    Stand-in for a module attribute that is imported on first use.
+
+    The API modules refer to the services through these so that importing
+    the app (and answering /health) does not wait for pandas and
+    scikit-learn. The first attribute access imports the module; later
+    ones go straight to the cached object.
+
+    Example:
+        DatasetService = LazyImport('app.services.dataset_service', 'DatasetService')
+        DatasetService.get_dataset_info(dataset_id)  # imports on this call
+    """
+
+    def __init__(self, module: str, name: str):
+        self._module = module
+        self._name = name
+        self._target = None
+
+    def resolve(self) -> Any:
+        """Import the module if needed and return the attribute."""
+        if self._target is None:
+            self._target = getattr(importlib.import_module(self._module), self._name)
+        return self._target
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.resolve(), attribute)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._target is not None else 'not loaded'
+        return f"<LazyImport {self._module}.{self._name} ({state})>"
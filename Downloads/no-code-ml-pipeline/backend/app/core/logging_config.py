@@ -0,0 +1,14 @@
+"""
+Logging setup shared by the API process and job workers.
+"""
+import logging
+
+from app.core.config import settings
+
+
+def configure_logging():
+    """Send application logs to stderr at LOG_LEVEL."""
+    logging.basicConfig(
+        level=settings.LOG_LEVEL.upper(),
+        format="%(asctime)s %(levelname)s [%(processName)s] %(name)s: %(message)s"
+    )
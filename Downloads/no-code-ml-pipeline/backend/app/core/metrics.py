@@ -0,0 +1,228 @@
+"""
+In-process metrics with Prometheus text exposition.
+"""
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Every exposed metric: name -> (type, help)
+METRICS = {
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency until the response starts'),
+    'pipeline_stage_seconds': ('histogram', 'Duration of pipeline stages (encode includes impute)'),
+    'cache_requests_total': ('counter', 'Cache lookups by cache and result'),
+    'cache_hit_ratio': ('gauge', 'Share of cache lookups that hit since start-up'),
+    'model_fits_total': ('counter', 'Estimator fits, including every search candidate and fold'),
+    'dataset_memory_bytes': ('gauge', 'Memory held by a loaded dataset'),
+    'split_cache_entries': ('gauge', 'Train-test splits held in memory'),
+    'job_queue_depth': ('gauge', 'Background jobs by state'),
+    'compute_slots_in_use': ('gauge', 'CPU slots granted to running jobs'),
+    'executor_queue_depth': ('gauge', 'Service calls waiting for an executor thread'),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    """Hashable, ordered form of a label set."""
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    """Render a label set as {k="v",...}."""
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (
+        (k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in pairs
+    )
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+
+class Metrics:
+    """
+    Process-wide counters and histograms rendered in Prometheus format.
+
+    Gauges are not stored: services register collectors that report them
+    at scrape time. Worker processes record into their own copy, which
+    the job service ships back with the job outcome and merges here.
+    """
+
+    _counters: Dict[Tuple[str, LabelKey], float] = {}
+    # (name, labels) -> [bucket counts..., +Inf count, sum]
+    _histograms: Dict[Tuple[str, LabelKey], List[float]] = {}
+    _collectors: List[Callable[[], Iterable[Tuple[str, Dict[str, Any], float]]]] = []
+    _lock = threading.Lock()
+
+    @classmethod
+    def increment(cls, name: str, labels: Optional[Dict[str, Any]] = None, amount: float = 1):
+        """
+        Add to a counter.
+
+        Args:
+            name: Metric name (a key of METRICS)
+            labels: Label values
+            amount: Increment
+        """
+        key = (name, _label_key(labels))
+        with cls._lock:
+            cls._counters[key] = cls._counters.get(key, 0) + amount
+
+    @classmethod
+    def observe(cls, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """
+        Record one histogram observation.
+
+        Args:
+            name: Metric name (a key of METRICS)
+            value: Observed value in seconds
+            labels: Label values
+        """
+        key = (name, _label_key(labels))
+        index = bisect.bisect_left(LATENCY_BUCKETS, value)
+        with cls._lock:
+            series = cls._histograms.get(key)
+            if series is None:
+                series = cls._histograms[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    @classmethod
+    def cache_lookup(cls, cache: str, hit: bool, count: int = 1):
+        """
+        Count lookups in a named cache.
+
+        Args:
+            cache: Cache name
+            hit: Whether the lookups hit
+            count: Number of lookups
+        """
+        if count:
+            cls.increment('cache_requests_total', {'cache': cache, 'result': 'hit' if hit else 'miss'}, count)
+
+    @classmethod
+    @contextmanager
+    def span(cls, stage: str):
+        """
+        Time a pipeline stage.
+
+        Args:
+            stage: Stage name (parse, profile, encode, impute, split,
+                search, fit, predict or serialize)
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            cls.observe('pipeline_stage_seconds', elapsed, {'stage': stage})
+            logger.debug("stage %s took %.4fs", stage, elapsed)
+
+    @classmethod
+    def register_collector(cls, collector: Callable[[], Iterable[Tuple[str, Dict[str, Any], float]]]):
+        """
+        Add a scrape-time source of gauge samples.
+
+        Args:
+            collector: Callable returning (name, labels, value) samples
+        """
+        cls._collectors.append(collector)
+
+    @classmethod
+    def snapshot(cls, reset: bool = False) -> Dict[str, Any]:
+        """
+        Copy the recorded counters and histograms.
+
+        Args:
+            reset: Clear them after copying (worker processes hand over
+                each job's samples once)
+
+        Returns:
+            Picklable snapshot for merge()
+        """
+        with cls._lock:
+            snapshot = {
+                'counters': dict(cls._counters),
+                'histograms': {key: list(series) for key, series in cls._histograms.items()}
+            }
+            if reset:
+                cls._counters.clear()
+                cls._histograms.clear()
+        return snapshot
+
+    @classmethod
+    def merge(cls, snapshot: Optional[Dict[str, Any]]):
+        """
+        Add another process's samples to this one.
+
+        Args:
+            snapshot: Result of snapshot() (None is ignored)
+        """
+        if not snapshot:
+            return
+        with cls._lock:
+            for key, value in snapshot['counters'].items():
+                cls._counters[key] = cls._counters.get(key, 0) + value
+            for key, series in snapshot['histograms'].items():
+                mine = cls._histograms.setdefault(key, [0] * len(series))
+                for i, value in enumerate(series):
+                    mine[i] += value
+
+    @classmethod
+    def render(cls) -> str:
+        """
+        Render every metric in the Prometheus text format (version 0.0.4).
+
+        Returns:
+            Exposition text
+        """
+        gauges: Dict[str, List[Tuple[LabelKey, float]]] = {}
+        for collector in list(cls._collectors):
+            try:
+                for name, labels, value in collector():
+                    gauges.setdefault(name, []).append((_label_key(labels), value))
+            except Exception as e:
+                logger.warning("metrics collector %s failed: %s", getattr(collector, '__qualname__', collector), e)
+
+        snapshot = cls.snapshot()
+        hits: Dict[str, List[float]] = {}
+        for (name, key), value in snapshot['counters'].items():
+            if name == 'cache_requests_total':
+                labels = dict(key)
+                totals = hits.setdefault(labels['cache'], [0, 0])
+                totals[0 if labels['result'] == 'hit' else 1] += value
+        gauges['cache_hit_ratio'] = [
+            ((('cache', cache),), hit / (hit + miss)) for cache, (hit, miss) in hits.items() if hit + miss
+        ]
+
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'counter':
+                for (metric, key), value in sorted(snapshot['counters'].items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(key)} {value:g}")
+            elif kind == 'histogram':
+                for (metric, key), series in sorted(snapshot['histograms'].items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), series[:-1]):
+                        cumulative += count
+                        le = bound if isinstance(bound, str) else f"{bound:g}"
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', le))} {cumulative:g}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {series[-1]:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {cumulative:g}")
+            else:
+                for key, value in sorted(gauges.get(name, [])):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,94 @@
+"""
+Background warm-up of the ML stack after start-up.
+"""
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Service modules imported by the warm-up, heaviest dependencies first
+WARMUP_MODULES = (
+    'app.services.dataset_service',
+    'app.services.preprocess_service',
+    'app.services.split_service',
+    'app.services.model_registry',
+    'app.services.prediction_service',
+    'app.services.online_service',
+    'app.services.model_service',
+    'app.services.stream_training_service',
+    'app.services.importance_service',
+    'app.services.explanation_service',
+)
+
+
+class Warmup:
+    """
+    Imports pandas, scikit-learn and the services off the request path.
+
+    The app starts listening before any of them is loaded (the API modules
+    reach the services through app.core.lazy), so /health answers at once.
+    The warm-up then imports every service in a background thread and
+    /ready reports when it is done; a request that needs a service before
+    that imports it itself.
+    """
+
+    _thread: Optional[threading.Thread] = None
+    _started_at: Optional[float] = None
+    _finished_at: Optional[float] = None
+    _modules: Dict[str, float] = {}
+    _error: Optional[str] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def start(cls):
+        """Start the warm-up thread (once)."""
+        with cls._lock:
+            if cls._thread is not None:
+                return
+            cls._started_at = time.perf_counter()
+            cls._thread = threading.Thread(target=cls._run, name='warmup', daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def status(cls) -> Dict[str, Any]:
+        """
+        Warm-up progress.
+
+        Returns:
+            Dictionary with the state (pending, warming, ready or failed),
+            elapsed seconds and per-module import times
+        """
+        if cls._thread is None:
+            state = 'pending'
+        elif cls._error is not None:
+            state = 'failed'
+        elif cls._finished_at is None:
+            state = 'warming'
+        else:
+            state = 'ready'
+        end = cls._finished_at if cls._finished_at is not None else time.perf_counter()
+        return {
+            'status': state,
+            'elapsed_s': end - cls._started_at if cls._started_at is not None else None,
+            'modules': dict(cls._modules),
+            'error': cls._error
+        }
+
+    @classmethod
+    def _run(cls):
+        """Import every warm-up module, timing each."""
+        try:
+            for module in WARMUP_MODULES:
+                started = time.perf_counter()
+                importlib.import_module(module)
+                cls._modules[module] = time.perf_counter() - started
+        except Exception as e:
+            cls._error = f"{module}: {str(e)}"
+            logger.exception("Warm-up failed importing %s", module)
+            return
+        cls._finished_at = time.perf_counter()
+        logger.info(f"ML stack warm in {cls._finished_at - cls._started_at:.2f}s")
@@ -1,17 +1,25 @@
 """
 FastAPI Application Entry Point.
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import os
+import time
 
 from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.core.metrics import Metrics
+from app.core.warmup import Warmup
 
 
-# Create uploads and temp directories if they don't exist
+configure_logging()
+
+
+# Create uploads, temp and model directories if they don't exist
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 os.makedirs(settings.TEMP_DIR, exist_ok=True)
+os.makedirs(settings.MODEL_DIR, exist_ok=True)
 
 
 # Initialize FastAPI app
@@ -35,6 +43,29 @@ app.add_middleware(
 )
 
 
+# Request latency by route template (so /model/{model_id} is one series)
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    """Observe every request's latency in http_request_duration_seconds."""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        Metrics.observe(
+            'http_request_duration_seconds',
+            time.perf_counter() - started,
+            {
+                'method': request.method,
+                'route': route.path if route is not None else 'unmatched',
+                'status': status
+            }
+        )
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -56,14 +87,49 @@ async def health_check():
     })
 
 
+# Readiness endpoint: /health only says the server is listening
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 200 once pandas, scikit-learn and the services are loaded."""
+    Warmup.start()
+    status = Warmup.status()
+    return JSONResponse(status, status_code=200 if status['status'] == 'ready' else 503)
+
+
+# Metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Process metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(Metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 # Import and include routers
-from app.api import upload, dataset, preprocess, split, model
+from app.api import upload, dataset, preprocess, split, model, predict, jobs, profiles
 
 app.include_router(upload.router, prefix=settings.API_PREFIX, tags=["upload"])
 app.include_router(dataset.router, prefix=settings.API_PREFIX, tags=["dataset"])
 app.include_router(preprocess.router, prefix=settings.API_PREFIX, tags=["preprocess"])
 app.include_router(split.router, prefix=settings.API_PREFIX, tags=["split"])
 app.include_router(model.router, prefix=settings.API_PREFIX, tags=["model"])
+app.include_router(predict.router, prefix=settings.API_PREFIX, tags=["predict"])
+app.include_router(jobs.router, prefix=settings.API_PREFIX, tags=["jobs"])
+app.include_router(profiles.router, prefix=settings.API_PREFIX, tags=["profiles"])
+
+
+@app.on_event("startup")
+async def start_warmup():
+    """Load the ML stack in the background so start-up does not wait for it."""
+    if settings.WARMUP_ON_STARTUP:
+        Warmup.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_jobs():
+    """Terminate training workers and the service thread pool when the server stops."""
+    from app.services.job_service import JobService
+    from app.services.executor import ServiceExecutor
+    JobService.shutdown()
+    ServiceExecutor.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+"""
+Pydantic models for background job operations.
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from enum import Enum
+
+from app.models.model import LeaderboardRequest, ModelTrainRequest, StreamTrainRequest
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a background job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMEOUT = "timeout"
+
+
+class TrainingJobRequest(ModelTrainRequest):
+    """Request to submit a model training job."""
+    timeout_s: Optional[float] = Field(
+        default=None, gt=0,
+        description="Per-job timeout in seconds (defaults to TRAINING_JOB_TIMEOUT)"
+    )
+
+
+class LeaderboardJobRequest(LeaderboardRequest):
+    """Request to submit a leaderboard job."""
+    timeout_s: Optional[float] = Field(
+        default=None, gt=0,
+        description="Per-job timeout in seconds (defaults to TRAINING_JOB_TIMEOUT)"
+    )
+
+
+class StreamTrainJobRequest(StreamTrainRequest):
+    """Request to submit a streaming training job."""
+    timeout_s: Optional[float] = Field(
+        default=None, gt=0,
+        description="Per-job timeout in seconds (defaults to TRAINING_JOB_TIMEOUT)"
+    )
+
+
+class JobInfo(BaseModel):
+    """Status of a background job."""
+    job_id: str
+    kind: str
+    status: JobStatus
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    timeout_s: float
+    slots: Optional[int] = None
+    profile_id: Optional[str] = None
+    request: Dict[str, Any]
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+
+
+class JobCapacity(BaseModel):
+    """Training queue depth and compute slot usage."""
+    queued: int
+    running: int
+    max_queued: int
+    max_running: int
+    total_slots: int
+    slots_per_job: int
+    slots_in_use: int
+    slots_free: int
+    allocations: Dict[str, int]
@@ -2,7 +2,7 @@
 Pydantic models for ML model operations.
 """
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from enum import Enum
 
 
@@ -10,6 +10,27 @@ class ModelType(str, Enum):
     """Supported ML model types."""
     LOGISTIC_REGRESSION = "logistic_regression"
     DECISION_TREE = "decision_tree"
+    SGD_LINEAR = "sgd_linear"
+    HIST_GRADIENT_BOOSTING = "hist_gradient_boosting"
+    NAIVE_BAYES = "naive_bayes"
+
+
+class SearchStrategy(str, Enum):
+    """Supported hyperparameter search strategies."""
+    GRID = "grid"
+    RANDOM = "random"
+    HALVING = "halving"
+    BAYESIAN = "bayesian"
+    PATH = "path"
+    PRUNING = "pruning"
+
+
+class CategoricalEncoding(str, Enum):
+    """Supported categorical encoding strategies."""
+    LABEL = "label"
+    HASHING = "hashing"
+    TARGET = "target"
+    NATIVE = "native"
 
 
 class TrainTestSplitRequest(BaseModel):
@@ -18,6 +39,14 @@ class TrainTestSplitRequest(BaseModel):
     test_size: float = Field(default=0.3, ge=0.1, le=0.5)
     target_column: str
     random_state: Optional[int] = 42
+    categorical_encoding: CategoricalEncoding = Field(
+        default=CategoricalEncoding.LABEL,
+        description="How categorical columns are encoded (label, hashing, target, native)"
+    )
+    hash_n_features: int = Field(
+        default=1024, ge=16, le=1048576,
+        description="Width of the hashed feature block when using hashing"
+    )
 
 
 class TrainTestSplitResponse(BaseModel):
@@ -25,9 +54,12 @@ class TrainTestSplitResponse(BaseModel):
     success: bool
     message: str
     dataset_id: str
+    split_id: Optional[str] = None
     train_size: int
     test_size: int
     target_column: str
+    categorical_encoding: Optional[str] = None
+    n_features: Optional[int] = None
 
 
 class ModelTrainRequest(BaseModel):
@@ -35,7 +67,19 @@ class ModelTrainRequest(BaseModel):
     dataset_id: str
     model_type: ModelType
     target_column: str
-    hyperparameters: Optional[Dict[str, Any]] = None
+    hyperparameters: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description=(
+            "Model hyperparameters and search options: search_strategy "
+            "(grid, random, halving, bayesian, path, pruning; pruning tunes decision "
+            "trees with splitter='best' and max_features=None), time_budget_s, max_fits, "
+            "n_candidates, cv_folds, cv_repeats, bootstrap_rounds"
+        )
+    )
+    split_id: Optional[str] = Field(
+        default=None,
+        description="Split to train on (defaults to the latest split for the target)"
+    )
 
 
 class ModelTrainResponse(BaseModel):
@@ -43,11 +87,176 @@ class ModelTrainResponse(BaseModel):
     success: bool
     message: str
     model_id: str
+    version: Optional[int] = None
     model_type: str
+    split_id: Optional[str] = None
     accuracy: float
+    cv_score: Optional[float] = None
     precision: Optional[float] = None
     recall: Optional[float] = None
     f1_score: Optional[float] = None
+    roc_auc: Optional[float] = None
+    pr_auc: Optional[float] = None
+    confidence_intervals: Optional[Dict[str, Any]] = None
     confusion_matrix: Optional[list] = None
     class_labels: Optional[list] = None
     feature_importance: Optional[Dict[str, float]] = None
+    search: Optional[Dict[str, Any]] = None
+    cached: bool = False
+
+
+class StreamTrainRequest(BaseModel):
+    """Request for incremental training over a dataset streamed in chunks."""
+    dataset_id: str
+    model_type: ModelType = Field(description="sgd_linear or naive_bayes")
+    target_column: str
+    epochs: int = Field(default=5, ge=1, le=100, description="Passes over the training chunks")
+    chunk_size: Optional[int] = Field(
+        default=None,
+        description="Rows per chunk (defaults to STREAM_CHUNK_SIZE)"
+    )
+    holdout_fraction: float = Field(default=0.2, ge=0.05, le=0.5)
+    hash_n_features: int = Field(
+        default=1024, ge=16, le=1048576,
+        description="Width of the hashed categorical feature block"
+    )
+    hyperparameters: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Estimator parameters: alpha and penalty (sgd_linear), var_smoothing (naive_bayes)"
+    )
+    random_state: int = 42
+
+
+class StreamTrainResponse(ModelTrainResponse):
+    """Response after streaming training, with per-epoch holdout scores."""
+    streaming: Dict[str, Any]
+
+
+class LeaderboardRequest(BaseModel):
+    """Request to train and rank several model types on one split."""
+    dataset_id: str
+    target_column: str
+    model_types: Optional[List[ModelType]] = Field(
+        default=None,
+        description="Model types to compare (defaults to all)"
+    )
+    hyperparameters: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description=(
+            "Search options shared by every model type: search_strategy, time_budget_s, "
+            "max_fits, n_candidates, cv_folds, cv_repeats, bootstrap_rounds"
+        )
+    )
+    split_id: Optional[str] = Field(
+        default=None,
+        description="Split to train on (defaults to the latest split for the target)"
+    )
+
+
+class LeaderboardEntry(BaseModel):
+    """One model type's row in a leaderboard."""
+    rank: Optional[int] = None
+    model_type: str
+    model_id: Optional[str] = None
+    version: Optional[int] = None
+    cv_score: Optional[float] = None
+    test_score: Optional[float] = None
+    metrics: Optional[Dict[str, Any]] = None
+    hyperparameters: Optional[Dict[str, Any]] = None
+    fit_time_s: Optional[float] = None
+    n_fits: Optional[int] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+
+class LeaderboardResponse(BaseModel):
+    """Ranked comparison of model types trained on the same split and folds."""
+    success: bool
+    message: str
+    dataset_id: str
+    split_id: str
+    scoring: str
+    cv: Optional[Dict[str, Any]] = None
+    best_model_id: Optional[str] = None
+    leaderboard: List[LeaderboardEntry]
+
+
+class ImportanceRequest(BaseModel):
+    """Request for permutation feature importance on a model's test split."""
+    n_repeats: int = Field(default=5, ge=1, le=50, description="Permutations per feature")
+    top_k: Optional[int] = Field(
+        default=None, ge=1,
+        description="Stop refining features that cannot reach the top k (default: refine all)"
+    )
+    random_state: int = 42
+
+
+class FeatureImportanceEntry(BaseModel):
+    """Score drop when one feature is permuted."""
+    feature: str
+    mean: float
+    std: float
+    n_repeats: int
+
+
+class ImportanceResponse(BaseModel):
+    """Permutation feature importance of a model version."""
+    success: bool
+    message: str
+    model_id: str
+    method: str
+    scoring: str
+    baseline_score: float
+    n_repeats: int
+    top_k: Optional[int] = None
+    n_features: int
+    n_constant: int
+    n_refined: Optional[int] = None
+    importances: List[FeatureImportanceEntry]
+    elapsed_s: float
+    cached: bool = False
+
+
+class ExplainRequest(BaseModel):
+    """Request for decision-path explanations of a batch of rows."""
+    records: Optional[List[Dict[str, Any]]] = Field(
+        default=None,
+        description="Raw rows to explain, with the training dataset's columns"
+    )
+    use_test_set: bool = Field(default=False, description="Explain the model's whole test split instead")
+    include_paths: bool = Field(default=True, description="Add node paths and the visited nodes")
+
+
+class RowExplanation(BaseModel):
+    """Explanation of one prediction: bias + sum(contributions) = score."""
+    prediction: Any
+    score: float
+    bias: float
+    contributions: Dict[str, float]
+    actual: Optional[Any] = None
+    path: Optional[List[int]] = None
+
+
+class TreeNode(BaseModel):
+    """A node on at least one explained path."""
+    node: int
+    feature: Optional[str] = None
+    threshold: Optional[float] = None
+    left: Optional[int] = None
+    right: Optional[int] = None
+    n_samples: int
+    value: List[float]
+
+
+class ExplainResponse(BaseModel):
+    """Decision-path explanations of a batch of predictions."""
+    success: bool
+    message: str
+    model_id: str
+    source: str
+    explained: str
+    n_rows: int
+    rows: List[RowExplanation]
+    nodes: Optional[List[TreeNode]] = None
+    mean_abs_contributions: Dict[str, float]
+    elapsed_s: float
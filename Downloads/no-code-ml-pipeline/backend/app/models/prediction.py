@@ -0,0 +1,37 @@
+"""
+Pydantic models for prediction operations.
+"""
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+
+
+class OnlinePredictionRequest(BaseModel):
+    """Single-row prediction request."""
+    features: Dict[str, Any] = Field(description="One input row keyed by training column name")
+    include_proba: bool = Field(default=False, description="Return class probabilities (classifiers only)")
+
+
+class OnlinePredictionResponse(BaseModel):
+    """Single-row prediction result."""
+    model_id: str
+    prediction: Any
+    probabilities: Optional[Dict[str, float]] = None
+    batch_size: int = Field(description="Number of requests predicted together with this one")
+    latency_ms: float
+
+
+class OnlineModelStats(BaseModel):
+    """Micro-batching statistics of one resident model version."""
+    model_id: str
+    requests: int
+    batches: int
+    mean_batch_size: float
+    latency_ms: Dict[str, float] = Field(description="p50, p99 and mean over recent requests")
+    batch_sizes: Dict[int, int] = Field(description="Number of batches per batch size")
+
+
+class OnlineStats(BaseModel):
+    """Online prediction statistics."""
+    window_ms: float
+    max_batch_size: int
+    models: List[OnlineModelStats]
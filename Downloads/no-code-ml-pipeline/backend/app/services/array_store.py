@@ -0,0 +1,191 @@
+"""
+Memory-mapped training matrices shared with worker processes.
+"""
+import os
+import shutil
+import threading
+import uuid
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+SPLIT_ARRAYS = ('X_train', 'X_test', 'y_train', 'y_test')
+
+
+def _save_npy(path: str, array: np.ndarray) -> str:
+    """Atomically write one array as a .npy file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+    return path
+
+
+def attach(handle: Dict[str, Any]):
+    """
+    Open an exported array without copying it.
+
+    Dense arrays come back as read-only ``np.memmap`` objects and sparse
+    matrices as CSR matrices over memory-mapped components. joblib sends
+    memory-mapped arrays to its workers by file name, so CV workers attach
+    to the same pages instead of receiving a pickled copy.
+
+    Args:
+        handle: Handle produced by ArrayStore.export_split
+
+    Returns:
+        Array, sparse matrix or pandas Series (for targets)
+    """
+    kind = handle['format']
+    if kind == 'dense':
+        return np.load(handle['path'], mmap_mode='r')
+    if kind == 'csr':
+        return sparse.csr_matrix(
+            tuple(np.load(handle[part], mmap_mode='r') for part in ('data', 'indices', 'indptr')),
+            shape=tuple(handle['shape']),
+            copy=False
+        )
+    if kind == 'series':
+        values = handle['values'] if 'values' in handle else np.load(handle['path'], mmap_mode='r')
+        return pd.Series(values, name=handle['name'], copy=False)
+    raise ValueError(f"Unknown array handle format: {kind}")
+
+
+class ArrayStore:
+    """
+    Service exporting split matrices as memory-mapped .npy files.
+
+    Each cached split is converted once per dtype into contiguous arrays
+    under TEMP_DIR/arrays/<split_id>-<token>/<dtype>/; training payloads
+    then carry small file handles instead of the matrices. Every export
+    hands out a lease that the job holds until it ends, and a split's files
+    are removed once it has left the split cache and its last lease is
+    released.
+    """
+
+    _lock = threading.Lock()
+    # Export directory -> number of outstanding leases
+    _leases: Dict[str, int] = {}
+    # Directories of evicted splits waiting for their last lease
+    _evicted: Set[str] = set()
+
+    @classmethod
+    def export_split(
+        cls,
+        split_data: Dict[str, Any],
+        dtype: str = 'float64'
+    ) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+        """
+        Export a split's train and test matrices (once per dtype) and lease them.
+
+        Args:
+            split_data: Split entry from SplitService
+            dtype: Feature dtype (float32 for trees, float64 otherwise)
+
+        Returns:
+            Lease to hand back to release() when the job ends, and a
+            dictionary of array name to handle, for use with attach()
+        """
+        dtype = np.dtype(dtype).name
+        with cls._lock:
+            # One directory per split entry: a split recreated under the same
+            # id after eviction never shares files with jobs of the old one
+            lease = split_data.setdefault(
+                'array_dir', os.path.join(cls._root(), f"{split_data['split_id']}-{uuid.uuid4().hex[:8]}")
+            )
+            exported = split_data.setdefault('arrays', {})
+            if dtype not in exported:
+                directory = os.path.join(lease, dtype)
+                os.makedirs(directory, exist_ok=True)
+                exported[dtype] = {
+                    name: cls._export(directory, name, split_data[name], dtype)
+                    for name in SPLIT_ARRAYS
+                }
+            cls._leases[lease] = cls._leases.get(lease, 0) + 1
+            if split_data.get('arrays_released'):
+                # Exported from an entry evicted meanwhile; nothing else will free it
+                cls._evicted.add(lease)
+            return lease, exported[dtype]
+
+    @classmethod
+    def release(cls, lease: Optional[str]):
+        """
+        Return a lease taken by export_split.
+
+        The files are deleted when this was the last lease of an evicted split.
+
+        Args:
+            lease: Lease from export_split (None is ignored)
+        """
+        if lease is None:
+            return
+        with cls._lock:
+            remaining = cls._leases.get(lease, 0) - 1
+            if remaining > 0:
+                cls._leases[lease] = remaining
+                return
+            cls._leases.pop(lease, None)
+            if lease in cls._evicted:
+                cls._evicted.discard(lease)
+                shutil.rmtree(lease, ignore_errors=True)
+
+    @classmethod
+    def release_split(cls, split_data: Dict[str, Any]):
+        """
+        Delete an evicted split's exported files once no job leases them.
+
+        Workers that already mapped them keep their pages until they exit.
+
+        Args:
+            split_data: Split entry leaving the split cache
+        """
+        with cls._lock:
+            split_data['arrays_released'] = True
+            lease = split_data.get('array_dir')
+            if lease is None:
+                return
+            if cls._leases.get(lease):
+                cls._evicted.add(lease)
+            else:
+                shutil.rmtree(lease, ignore_errors=True)
+
+    @classmethod
+    def _export(cls, directory: str, name: str, values, dtype: str) -> Dict[str, Any]:
+        """Write one matrix or target and describe how to reopen it."""
+        base = os.path.join(directory, name)
+        if isinstance(values, pd.Series):
+            handle = {'format': 'series', 'name': values.name}
+            if values.dtype == object:
+                # Object labels cannot be memory-mapped; they are one small column
+                handle['values'] = values.to_numpy()
+            else:
+                handle['path'] = _save_npy(f"{base}.npy", np.ascontiguousarray(values.to_numpy()))
+            return handle
+
+        if sparse.issparse(values):
+            matrix = sparse.csr_matrix(values, dtype=dtype)
+            matrix.sort_indices()
+            return {
+                'format': 'csr',
+                'shape': matrix.shape,
+                **{
+                    part: _save_npy(f"{base}_{part}.npy", getattr(matrix, part))
+                    for part in ('data', 'indices', 'indptr')
+                }
+            }
+
+        if isinstance(values, pd.DataFrame):
+            values = values.to_numpy(dtype=dtype)
+        return {
+            'format': 'dense',
+            'path': _save_npy(f"{base}.npy", np.ascontiguousarray(values, dtype=dtype))
+        }
+
+    @classmethod
+    def _root(cls) -> str:
+        """Directory holding exported splits."""
+        return os.path.join(settings.TEMP_DIR, 'arrays')
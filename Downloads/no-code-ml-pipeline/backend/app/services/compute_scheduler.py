@@ -0,0 +1,127 @@
+"""
+Process-wide compute scheduler for CPU-bound work.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from threadpoolctl import threadpool_limits
+
+from app.core.config import settings
+
+
+# Slots granted to this process by the innermost compute_limits block
+_granted_workers = 1
+
+
+@contextmanager
+def compute_limits(n_workers: int):
+    """
+    Confine the current process to its granted worker slots.
+
+    joblib code that leaves ``n_jobs`` unset uses ``n_workers`` workers, and
+    BLAS/OpenMP pools are pinned to one thread both here and inside those
+    workers, so a job never runs more threads than it holds slots.
+
+    Args:
+        n_workers: Number of granted slots
+    """
+    # joblib is only needed inside worker processes; keep it off the API's import path
+    from joblib import parallel_config
+
+    global _granted_workers
+    previous, _granted_workers = _granted_workers, n_workers
+    try:
+        with threadpool_limits(limits=1), parallel_config(backend='loky', n_jobs=n_workers, inner_max_num_threads=1):
+            yield
+    finally:
+        _granted_workers = previous
+
+
+def granted_workers() -> int:
+    """Number of slots granted to this process (1 outside compute_limits)."""
+    return _granted_workers
+
+
+@contextmanager
+def estimator_threads():
+    """
+    Let OpenMP-parallel estimators use every granted slot in this process.
+
+    Fits that joblib dispatches to its workers stay single-threaded
+    (``inner_max_num_threads``); only fits running here, such as a final
+    refit or an untuned fit, get the extra threads. With one slot, joblib
+    runs everything here with one thread, so the job never exceeds its
+    grant either way.
+    """
+    with threadpool_limits(limits=_granted_workers, user_api='openmp'):
+        yield
+
+
+class ComputeScheduler:
+    """
+    Scheduler handing out a bounded number of CPU slots.
+
+    The machine has COMPUTE_SLOTS slots (one per core by default). Each job
+    gets up to COMPUTE_SLOTS_PER_JOB of them (an equal share across
+    TRAINING_MAX_WORKERS by default) and must wait while none are free, so
+    concurrent jobs split the cores instead of each claiming all of them.
+    """
+
+    _allocations: Dict[str, int] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def total_slots(cls) -> int:
+        """Number of slots on this machine."""
+        return settings.COMPUTE_SLOTS or os.cpu_count() or 1
+
+    @classmethod
+    def slots_per_job(cls) -> int:
+        """Maximum slots granted to one job."""
+        if settings.COMPUTE_SLOTS_PER_JOB:
+            return min(settings.COMPUTE_SLOTS_PER_JOB, cls.total_slots())
+        return max(1, cls.total_slots() // max(1, settings.TRAINING_MAX_WORKERS))
+
+    @classmethod
+    def try_acquire(cls, owner: str) -> Optional[int]:
+        """
+        Grant free slots to an owner without blocking.
+
+        Args:
+            owner: Identifier of the job taking the slots
+
+        Returns:
+            Number of slots granted, or None if no slot is free
+        """
+        with cls._lock:
+            free = cls.total_slots() - sum(cls._allocations.values())
+            if free <= 0:
+                return None
+            granted = min(free, cls.slots_per_job())
+            cls._allocations[owner] = granted
+            return granted
+
+    @classmethod
+    def release(cls, owner: str):
+        """
+        Return an owner's slots.
+
+        Args:
+            owner: Identifier passed to try_acquire
+        """
+        with cls._lock:
+            cls._allocations.pop(owner, None)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Slot capacity and current usage."""
+        with cls._lock:
+            in_use = sum(cls._allocations.values())
+            return {
+                'total_slots': cls.total_slots(),
+                'slots_per_job': cls.slots_per_job(),
+                'slots_in_use': in_use,
+                'slots_free': max(0, cls.total_slots() - in_use),
+                'allocations': dict(cls._allocations)
+            }
@@ -1,11 +1,18 @@
 """
 Dataset parsing and validation service.
 """
+import hashlib
+import logging
+import threading
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from fastapi import HTTPException
 from app.models.dataset import DatasetInfo, DatasetPreview
 from app.utils.file_handler import get_dataset_path
+from app.core.metrics import Metrics
+
+
+logger = logging.getLogger(__name__)
 
 
 class DatasetService:
@@ -14,6 +21,14 @@ class DatasetService:
     # In-memory storage for datasets (in production, use Redis or database)
     _datasets: Dict[str, pd.DataFrame] = {}
     _metadata: Dict[str, DatasetInfo] = {}
+    # Incremented whenever a dataset's contents change; used to key caches
+    _versions: Dict[str, int] = {}
+    # Content hash of each dataset with the version it was computed for
+    _fingerprints: Dict[str, Tuple[int, str]] = {}
+    # Deep memory usage of each loaded dataset, measured once per version
+    _memory: Dict[str, int] = {}
+    # Serializes reloads from disk so concurrent readers load a dataset once
+    _lock = threading.Lock()
     
     @classmethod
     def load_dataset(cls, dataset_id: str, file_path: str) -> DatasetInfo:
@@ -32,25 +47,29 @@ class DatasetService:
         """
         try:
             # Load based on file extension
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
-            elif file_path.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file_path)
-            else:
-                raise HTTPException(status_code=400, detail="Unsupported file format")
+            with Metrics.span('parse'):
+                if file_path.endswith('.csv'):
+                    df = pd.read_csv(file_path)
+                elif file_path.endswith(('.xlsx', '.xls')):
+                    df = pd.read_excel(file_path)
+                else:
+                    raise HTTPException(status_code=400, detail="Unsupported file format")
             
             # Store in memory
             cls._datasets[dataset_id] = df
+            cls._versions[dataset_id] = cls._versions.get(dataset_id, 0) + 1
             
             # Extract metadata
-            info = DatasetInfo(
-                filename=file_path.split('/')[-1],
-                rows=len(df),
-                columns=len(df.columns),
-                column_names=df.columns.tolist(),
-                column_types={col: str(dtype) for col, dtype in df.dtypes.items()},
-                missing_values={col: int(df[col].isna().sum()) for col in df.columns}
-            )
+            with Metrics.span('profile'):
+                info = DatasetInfo(
+                    filename=file_path.split('/')[-1],
+                    rows=len(df),
+                    columns=len(df.columns),
+                    column_names=df.columns.tolist(),
+                    column_types={col: str(dtype) for col, dtype in df.dtypes.items()},
+                    missing_values={col: int(df[col].isna().sum()) for col in df.columns}
+                )
+                cls._memory[dataset_id] = int(df.memory_usage(deep=True).sum())
             
             cls._metadata[dataset_id] = info
             return info
@@ -79,44 +98,95 @@ class DatasetService:
         if dataset_id in cls._datasets:
             return cls._datasets[dataset_id]
         
-        # Try to reload from disk
-        try:
-            print(f"Dataset {dataset_id} not in memory, attempting to reload from disk...")
-            file_path = get_dataset_path(dataset_id)
+        with cls._lock:
+            # Another request may have reloaded it while this one waited
+            if dataset_id in cls._datasets:
+                return cls._datasets[dataset_id]
             
-            # Load based on file extension
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
-            elif file_path.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file_path)
-            else:
-                raise HTTPException(status_code=400, detail="Unsupported file format")
-            
-            # Store in memory
-            cls._datasets[dataset_id] = df
-            
-            # Recreate metadata if missing
-            if dataset_id not in cls._metadata:
-                info = DatasetInfo(
-                    filename=file_path.split('/')[-1].split('\\')[-1],
-                    rows=len(df),
-                    columns=len(df.columns),
-                    column_names=df.columns.tolist(),
-                    column_types={col: str(dtype) for col, dtype in df.dtypes.items()},
-                    missing_values={col: int(df[col].isna().sum()) for col in df.columns}
+            # Try to reload from disk
+            try:
+                logger.info(f"Dataset {dataset_id} not in memory, attempting to reload from disk")
+                file_path = get_dataset_path(dataset_id)
+                
+                # Load based on file extension
+                with Metrics.span('parse'):
+                    if file_path.endswith('.csv'):
+                        df = pd.read_csv(file_path)
+                    elif file_path.endswith(('.xlsx', '.xls')):
+                        df = pd.read_excel(file_path)
+                    else:
+                        raise HTTPException(status_code=400, detail="Unsupported file format")
+                
+                # Store in memory
+                cls._datasets[dataset_id] = df
+                cls._versions[dataset_id] = cls._versions.get(dataset_id, 0) + 1
+                cls._memory[dataset_id] = int(df.memory_usage(deep=True).sum())
+                
+                # Recreate metadata if missing
+                if dataset_id not in cls._metadata:
+                    info = DatasetInfo(
+                        filename=file_path.split('/')[-1].split('\\')[-1],
+                        rows=len(df),
+                        columns=len(df.columns),
+                        column_names=df.columns.tolist(),
+                        column_types={col: str(dtype) for col, dtype in df.dtypes.items()},
+                        missing_values={col: int(df[col].isna().sum()) for col in df.columns}
+                    )
+                    cls._metadata[dataset_id] = info
+                
+                logger.info(f"Reloaded dataset {dataset_id} from disk")
+                return df
+                
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Dataset not found: {dataset_id}. Error: {str(e)}"
                 )
-                cls._metadata[dataset_id] = info
+    
+    @classmethod
+    def get_dataset_version(cls, dataset_id: str) -> int:
+        """
+        Get the current content version of a dataset.
+        
+        Args:
+            dataset_id: Dataset identifier
             
-            print(f"Successfully reloaded dataset {dataset_id} from disk")
-            return df
+        Returns:
+            Version number, incremented on every load or update
+        """
+        if dataset_id not in cls._versions:
+            cls.get_dataset(dataset_id)
+        return cls._versions[dataset_id]
+    
+    @classmethod
+    def get_dataset_fingerprint(cls, dataset_id: str) -> str:
+        """
+        Get a content hash of a dataset.
+        
+        Computed once per version. Unlike the version number, it stays the
+        same across restarts and reloads as long as the data is unchanged.
+        
+        Args:
+            dataset_id: Dataset identifier
             
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Dataset not found: {dataset_id}. Error: {str(e)}"
-            )
+        Returns:
+            Hex digest of the column names, dtypes and values
+        """
+        version = cls.get_dataset_version(dataset_id)
+        cached = cls._fingerprints.get(dataset_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        df = cls.get_dataset(dataset_id)
+        with Metrics.span('fingerprint'):
+            digest = hashlib.sha256()
+            digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+            digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+            fingerprint = digest.hexdigest()
+        cls._fingerprints[dataset_id] = (version, fingerprint)
+        return fingerprint
     
     @classmethod
     def get_dataset_info(cls, dataset_id: str) -> DatasetInfo:
@@ -151,30 +221,33 @@ class DatasetService:
         df = cls.get_dataset(dataset_id)
         info = cls.get_dataset_info(dataset_id)
         
-        # Get preview rows (replace NaN with None for JSON serialization)
-        preview_data = df.head(num_rows).where(pd.notnull(df.head(num_rows)), None).to_dict(orient='records')
-        
-        # Get basic statistics for numeric columns
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        statistics = None
-        if numeric_cols:
-            statistics = df[numeric_cols].describe().to_dict()
-        
-        # Categorize columns by type
-        column_categories = {}
-        unique_counts = {}
+        # Get preview rows (replace NaN with None for JSON serialization; float
+        # columns would turn None back into NaN, so go through object dtype)
+        head = df.head(num_rows).astype(object)
+        preview_data = head.where(pd.notnull(head), None).to_dict(orient='records')
         
-        for col in df.columns:
-            # Count unique values
-            unique_counts[col] = int(df[col].nunique())
+        with Metrics.span('profile'):
+            # Get basic statistics for numeric columns
+            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+            statistics = None
+            if numeric_cols:
+                statistics = df[numeric_cols].describe().to_dict()
             
-            # Categorize column type
-            if pd.api.types.is_numeric_dtype(df[col]):
-                column_categories[col] = 'numeric'
-            elif pd.api.types.is_datetime64_any_dtype(df[col]):
-                column_categories[col] = 'datetime'
-            else:
-                column_categories[col] = 'categorical'
+            # Categorize columns by type
+            column_categories = {}
+            unique_counts = {}
+            
+            for col in df.columns:
+                # Count unique values
+                unique_counts[col] = int(df[col].nunique())
+                
+                # Categorize column type
+                if pd.api.types.is_numeric_dtype(df[col]):
+                    column_categories[col] = 'numeric'
+                elif pd.api.types.is_datetime64_any_dtype(df[col]):
+                    column_categories[col] = 'datetime'
+                else:
+                    column_categories[col] = 'categorical'
         
         return DatasetPreview(
             info=info,
@@ -194,18 +267,30 @@ class DatasetService:
             df: Updated DataFrame
         """
         cls._datasets[dataset_id] = df
+        cls._versions[dataset_id] = cls._versions.get(dataset_id, 0) + 1
         
         # Update metadata
-        info = DatasetInfo(
-            filename=cls._metadata[dataset_id].filename,
-            rows=len(df),
-            columns=len(df.columns),
-            column_names=df.columns.tolist(),
-            column_types={col: str(dtype) for col, dtype in df.dtypes.items()},
-            missing_values={col: int(df[col].isna().sum()) for col in df.columns}
-        )
+        with Metrics.span('profile'):
+            info = DatasetInfo(
+                filename=cls._metadata[dataset_id].filename,
+                rows=len(df),
+                columns=len(df.columns),
+                column_names=df.columns.tolist(),
+                column_types={col: str(dtype) for col, dtype in df.dtypes.items()},
+                missing_values={col: int(df[col].isna().sum()) for col in df.columns}
+            )
+            cls._memory[dataset_id] = int(df.memory_usage(deep=True).sum())
         cls._metadata[dataset_id] = info
     
+    @classmethod
+    def metrics(cls):
+        """Gauge samples for /metrics."""
+        return [
+            ('dataset_memory_bytes', {'dataset_id': dataset_id}, size)
+            for dataset_id, size in list(cls._memory.items())
+            if dataset_id in cls._datasets
+        ]
+    
     @classmethod
     def set_target_column(cls, dataset_id: str, target_column: str) -> Dict[str, Any]:
         """
@@ -330,3 +415,5 @@ class DatasetService:
             'total_columns': len(df.columns)
         }
 
+
+Metrics.register_collector(DatasetService.metrics)
@@ -0,0 +1,402 @@
+"""
+Vectorized evaluation metrics for classification and regression.
+"""
+import numpy as np
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+# Upper bound on cells (replicates x rows x columns) per bootstrap batch
+BOOTSTRAP_BATCH_CELLS = 4000000
+
+
+class EvaluationService:
+    """
+    Service computing test-set metrics in as few passes as possible.
+
+    Every classification metric is derived from one confusion matrix,
+    built with a single bincount over (true, predicted) label indices.
+    ROC and precision-recall curves come from one sort of the predicted
+    probabilities. Bootstrap confidence intervals reuse both: a resample
+    is a vector of row counts, so replicate confusion matrices are one
+    weighted bincount and replicate curves are weighted cumulative sums
+    over the already sorted scores.
+    """
+
+    @classmethod
+    def classification_metrics(
+        cls,
+        y_true,
+        y_pred,
+        y_score: Optional[np.ndarray] = None,
+        score_classes: Optional[np.ndarray] = None,
+        bootstrap_rounds: int = 0,
+        random_state: int = 42
+    ) -> Dict[str, Any]:
+        """
+        Evaluate class predictions (and optionally class probabilities).
+
+        Args:
+            y_true: True labels
+            y_pred: Predicted labels
+            y_score: Optional predict_proba output, one column per class
+            score_classes: Class of each y_score column (estimator classes_)
+            bootstrap_rounds: Resamples for confidence intervals (0 = none)
+            random_state: Seed for the resamples
+
+        Returns:
+            Dictionary with accuracy, precision, recall, F1, the confusion
+            matrix and, with scores, ROC/PR AUC and binary curves
+        """
+        y_true = np.asarray(y_true)
+        y_pred = np.asarray(y_pred)
+        n_rows = len(y_true)
+        labels, inverse = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+        n_labels = len(labels)
+        cells = inverse[:n_rows] * n_labels + inverse[n_rows:]
+        confusion = np.bincount(cells, minlength=n_labels ** 2).reshape(n_labels, n_labels)
+
+        metrics = cls.classification_from_confusion(confusion, labels)
+        ranking = None
+        if y_score is not None and score_classes is not None:
+            ranking = cls._sort_scores(y_true, y_score, score_classes)
+            if ranking is not None:
+                metrics.update(cls._ranking_metrics(ranking))
+
+        if bootstrap_rounds:
+            positive = cls._positive_index(labels)
+            replicates = {name: [] for name in ('accuracy', 'precision', 'recall', 'f1_score')}
+            if ranking is not None:
+                replicates.update({'roc_auc': [], 'pr_auc': []})
+            n_columns = ranking['positives'].shape[1] if ranking is not None else 1
+            for counts in cls._resample_counts(n_rows, bootstrap_rounds, n_columns, random_state):
+                n_batch = len(counts)
+                offsets = np.arange(n_batch)[:, np.newaxis] * n_labels ** 2
+                batch_confusion = np.bincount(
+                    (offsets + cells).ravel(), weights=counts.ravel(), minlength=n_batch * n_labels ** 2
+                ).reshape(n_batch, n_labels, n_labels)
+                for name, values in cls._confusion_scores(batch_confusion, positive).items():
+                    replicates[name].append(values)
+                if ranking is not None:
+                    scores = cls._ranking_scores(ranking, counts[:, ranking['order']])
+                    replicates['roc_auc'].append(scores['roc_auc'])
+                    replicates['pr_auc'].append(scores['pr_auc'])
+            metrics['confidence_intervals'] = cls._intervals(replicates, bootstrap_rounds)
+        return metrics
+
+    @classmethod
+    def regression_metrics(
+        cls,
+        y_true,
+        y_pred,
+        bootstrap_rounds: int = 0,
+        random_state: int = 42
+    ) -> Dict[str, Any]:
+        """
+        Evaluate continuous predictions.
+
+        Args:
+            y_true: True values
+            y_pred: Predicted values
+            bootstrap_rounds: Resamples for confidence intervals (0 = none)
+            random_state: Seed for the resamples
+
+        Returns:
+            Dictionary with R², MSE, RMSE and MAE (R² doubles as accuracy)
+        """
+        y_true = np.asarray(y_true, dtype=np.float64)
+        errors = y_true - np.asarray(y_pred, dtype=np.float64)
+        squared = errors ** 2
+        absolute = np.abs(errors)
+        centered = y_true - np.average(y_true)
+        metrics = cls._regression_result(
+            float(np.average(squared)),
+            float(np.average(absolute)),
+            cls._r2(squared.sum(), (centered ** 2).sum())
+        )
+
+        if bootstrap_rounds:
+            replicates = {'r2_score': [], 'mse': [], 'rmse': [], 'mae': []}
+            n_rows = len(y_true)
+            for counts in cls._resample_counts(n_rows, bootstrap_rounds, 1, random_state):
+                sse = counts @ squared
+                sum_y = counts @ centered
+                # Sum of squares about each resample's own mean
+                sst = counts @ centered ** 2 - sum_y ** 2 / n_rows
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    r2 = np.where(sst > 0, 1 - sse / sst, np.where(sse == 0, 1.0, 0.0))
+                replicates['r2_score'].append(r2)
+                replicates['mse'].append(sse / n_rows)
+                replicates['rmse'].append(np.sqrt(sse / n_rows))
+                replicates['mae'].append(counts @ absolute / n_rows)
+            metrics['confidence_intervals'] = cls._intervals(replicates, bootstrap_rounds)
+        return metrics
+
+    @classmethod
+    def classification_from_confusion(cls, confusion: np.ndarray, labels) -> Dict[str, Any]:
+        """
+        Classification metrics from an accumulated confusion matrix.
+
+        Scores are binary for the label 1 when the labels are 0/1 (or a
+        subset containing 1) and support-weighted averages otherwise.
+
+        Args:
+            confusion: Square matrix of counts, rows true and columns predicted
+            labels: Sorted labels of the matrix rows and columns
+
+        Returns:
+            Dictionary with accuracy, precision, recall, F1 and the matrix
+        """
+        labels = np.asarray(labels)
+        scores = cls._confusion_scores(confusion[np.newaxis], cls._positive_index(labels))
+        return {
+            'accuracy': float(scores['accuracy'][0]),
+            'confusion_matrix': np.asarray(confusion).astype(np.int64).tolist(),
+            'class_labels': [str(label) for label in labels.tolist()],
+            'precision': float(scores['precision'][0]),
+            'recall': float(scores['recall'][0]),
+            'f1_score': float(scores['f1_score'][0])
+        }
+
+    @classmethod
+    def regression_from_totals(
+        cls,
+        n_rows: float,
+        sum_y: float,
+        sum_y2: float,
+        sse: float,
+        sae: float
+    ) -> Dict[str, Any]:
+        """
+        Regression metrics from running totals.
+
+        Args:
+            n_rows: Number of rows
+            sum_y: Sum of true values
+            sum_y2: Sum of squared true values
+            sse: Sum of squared errors
+            sae: Sum of absolute errors
+
+        Returns:
+            Dictionary with R², MSE, RMSE and MAE
+        """
+        return cls._regression_result(
+            float(sse / n_rows),
+            float(sae / n_rows),
+            cls._r2(sse, sum_y2 - sum_y ** 2 / n_rows)
+        )
+
+    @classmethod
+    def _regression_result(cls, mse: float, mae: float, r2: float) -> Dict[str, Any]:
+        """Regression metrics in the shape shared with classification."""
+        return {
+            'accuracy': r2,  # Use R² as "accuracy" for consistency
+            'r2_score': r2,
+            'mse': mse,
+            'rmse': float(np.sqrt(mse)),
+            'mae': mae,
+            'confusion_matrix': None,
+            'class_labels': None,
+            'precision': None,
+            'recall': None,
+            'f1_score': None
+        }
+
+    @classmethod
+    def _r2(cls, sse: float, sst: float) -> float:
+        """R² with a constant target scored 1 if predicted exactly, else 0."""
+        if sst > 0:
+            return float(1 - sse / sst)
+        return 1.0 if sse == 0 else 0.0
+
+    @classmethod
+    def _positive_index(cls, labels: np.ndarray) -> Optional[int]:
+        """Row of the label 1 for binary scoring, or None for weighted averages."""
+        values = labels.tolist()
+        if len(values) <= 2 and 1 in values:
+            return values.index(1)
+        if len(values) < 2:
+            return -1  # One label that is not 1: binary scores are all zero
+        return None
+
+    @classmethod
+    def _confusion_scores(cls, confusion: np.ndarray, positive: Optional[int]) -> Dict[str, np.ndarray]:
+        """
+        Accuracy, precision, recall and F1 for a stack of confusion matrices.
+
+        Args:
+            confusion: Array of shape (replicates, labels, labels)
+            positive: Index of the positive label, -1 for an absent one,
+                or None for support-weighted averages
+
+        Returns:
+            Dictionary of metric name to one value per replicate
+        """
+        true_pos = np.diagonal(confusion, axis1=1, axis2=2).astype(np.float64)
+        support = confusion.sum(axis=2).astype(np.float64)
+        predicted = confusion.sum(axis=1).astype(np.float64)
+        total = support.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_class = {
+                'precision': np.where(predicted > 0, true_pos / predicted, 0.0),
+                'recall': np.where(support > 0, true_pos / support, 0.0),
+                'f1_score': np.where(support + predicted > 0, 2 * true_pos / (support + predicted), 0.0)
+            }
+            scores = {'accuracy': true_pos.sum(axis=1) / total}
+        for name, values in per_class.items():
+            if positive == -1:
+                scores[name] = np.zeros(len(total))
+            elif positive is not None:
+                scores[name] = values[:, positive]
+            else:
+                scores[name] = (values * support).sum(axis=1) / total
+        return scores
+
+    @classmethod
+    def _sort_scores(cls, y_true: np.ndarray, y_score: np.ndarray, classes: np.ndarray) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Sort every score column once, in descending order.
+
+        Binary problems keep the positive-class column only; multiclass
+        problems keep one one-vs-rest column per class. Columns whose class
+        is absent from (or the only class in) y_true cannot be ranked and
+        are dropped.
+
+        Returns:
+            Dictionary with sorted scores, sorted positive flags and the
+            row order per column, or None when nothing can be ranked
+        """
+        y_score = np.asarray(y_score, dtype=np.float64)
+        if y_score.ndim == 1:
+            y_score = np.column_stack([1 - y_score, y_score])
+        positives = y_true[:, np.newaxis] == np.asarray(classes)[np.newaxis, :]
+        if len(classes) == 2:
+            y_score, positives = y_score[:, 1:], positives[:, 1:]
+        n_positive = positives.sum(axis=0)
+        rankable = (n_positive > 0) & (n_positive < len(y_true))
+        if not rankable.any():
+            return None
+        y_score, positives = y_score[:, rankable], positives[:, rankable]
+
+        order = np.argsort(-y_score, axis=0, kind='mergesort')
+        sorted_scores = np.take_along_axis(y_score, order, axis=0)
+        return {
+            'scores': sorted_scores,
+            'positives': np.take_along_axis(positives, order, axis=0).astype(np.float64),
+            'order': order,
+            # Last row of each run of tied scores: the curve's thresholds
+            'thresholds': np.vstack([sorted_scores[1:] != sorted_scores[:-1], np.ones((1, y_score.shape[1]), dtype=bool)])
+        }
+
+    @classmethod
+    def _ranking_scores(cls, ranking: Dict[str, np.ndarray], weights: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        ROC AUC and average precision per column, optionally row-weighted.
+
+        Args:
+            ranking: Output of _sort_scores
+            weights: Optional resample counts in sorted order, shape
+                (replicates, rows, columns)
+
+        Returns:
+            Dictionary with roc_auc and pr_auc (macro averages over columns),
+            one value per replicate, plus the cumulative counts
+        """
+        positives = ranking['positives']
+        if weights is None:
+            weights = np.ones((1,) + positives.shape)
+        true_pos = np.cumsum(weights * positives, axis=1)
+        false_pos = np.cumsum(weights * (1 - positives), axis=1)
+
+        # Counts at the previous threshold, (0, 0) before the first one
+        rows = np.arange(positives.shape[0])[:, np.newaxis]
+        last = np.maximum.accumulate(np.where(ranking['thresholds'], rows, -1), axis=0)
+        previous = np.vstack([np.full((1, positives.shape[1]), -1), last[:-1]])
+        index = np.broadcast_to(np.maximum(previous, 0), true_pos.shape)
+        seen = previous >= 0
+        true_prev = np.where(seen, np.take_along_axis(true_pos, index, axis=1), 0.0)
+        false_prev = np.where(seen, np.take_along_axis(false_pos, index, axis=1), 0.0)
+
+        mask = ranking['thresholds']
+        n_pos, n_neg = true_pos[:, -1], false_pos[:, -1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            area = np.where(mask, (false_pos - false_prev) * (true_pos + true_prev) / 2, 0.0).sum(axis=1)
+            roc_auc = area / (n_pos * n_neg)
+            precision = np.where(true_pos + false_pos > 0, true_pos / (true_pos + false_pos), 0.0)
+            pr_auc = np.where(mask, (true_pos - true_prev) * precision, 0.0).sum(axis=1) / n_pos
+            # Resamples that miss one side of a column cannot rank it
+            roc_auc = np.where((n_pos > 0) & (n_neg > 0), roc_auc, np.nan)
+            pr_auc = np.where(n_pos > 0, pr_auc, np.nan)
+        return {
+            'roc_auc': cls._macro_average(roc_auc),
+            'pr_auc': cls._macro_average(pr_auc),
+            'true_pos': true_pos[0],
+            'false_pos': false_pos[0]
+        }
+
+    @classmethod
+    def _macro_average(cls, values: np.ndarray) -> np.ndarray:
+        """Mean over the finite columns of each row (NaN if there are none)."""
+        finite = np.isfinite(values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(finite, values, 0.0).sum(axis=1) / finite.sum(axis=1)
+
+    @classmethod
+    def _ranking_metrics(cls, ranking: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """ROC/PR AUC, plus thinned curves for binary problems."""
+        scores = cls._ranking_scores(ranking)
+        metrics = {
+            'roc_auc': float(scores['roc_auc'][0]),
+            'pr_auc': float(scores['pr_auc'][0])
+        }
+        if ranking['scores'].shape[1] == 1:
+            mask = ranking['thresholds'][:, 0]
+            true_pos = scores['true_pos'][mask, 0]
+            false_pos = scores['false_pos'][mask, 0]
+            thresholds = ranking['scores'][mask, 0]
+            keep = np.unique(np.linspace(0, len(thresholds) - 1, min(len(thresholds), settings.EVALUATION_CURVE_POINTS)).round().astype(int))
+            true_pos, false_pos, thresholds = true_pos[keep], false_pos[keep], thresholds[keep]
+            metrics['curves'] = {
+                'roc': {
+                    'fpr': [0.0] + (false_pos / false_pos[-1]).tolist(),
+                    'tpr': [0.0] + (true_pos / true_pos[-1]).tolist(),
+                    'thresholds': [None] + thresholds.tolist()  # None: above every score
+                },
+                'pr': {
+                    'precision': (true_pos / (true_pos + false_pos)).tolist(),
+                    'recall': (true_pos / true_pos[-1]).tolist(),
+                    'thresholds': thresholds.tolist()
+                }
+            }
+        return metrics
+
+    @classmethod
+    def _resample_counts(cls, n_rows: int, rounds: int, n_columns: int, random_state: int):
+        """
+        Yield bootstrap resamples as row-count matrices, in bounded batches.
+
+        Each row of a yielded (batch, n_rows) matrix counts how often every
+        row was drawn in one resample.
+        """
+        rng = np.random.RandomState(random_state)
+        batch_size = max(1, BOOTSTRAP_BATCH_CELLS // (n_rows * n_columns))
+        for start in range(0, rounds, batch_size):
+            n_batch = min(batch_size, rounds - start)
+            draws = rng.randint(0, n_rows, size=(n_batch, n_rows))
+            draws += np.arange(n_batch)[:, np.newaxis] * n_rows
+            yield np.bincount(draws.ravel(), minlength=n_batch * n_rows).reshape(n_batch, n_rows).astype(np.float64)
+
+    @classmethod
+    def _intervals(cls, replicates: Dict[str, list], rounds: int) -> Dict[str, Any]:
+        """Percentile intervals from per-replicate metric values."""
+        tail = (1 - settings.EVALUATION_CONFIDENCE) / 2 * 100
+        intervals = {'level': settings.EVALUATION_CONFIDENCE, 'rounds': rounds}
+        for name, batches in replicates.items():
+            values = np.concatenate(batches)
+            values = values[np.isfinite(values)]
+            intervals[name] = (
+                [float(np.percentile(values, tail)), float(np.percentile(values, 100 - tail))]
+                if len(values) else None
+            )
+        return intervals
@@ -0,0 +1,184 @@
+"""
+Execution layer running blocking service calls off the event loop.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import Metrics
+
+
+class RWLock:
+    """
+    Reader/writer lock preferring writers.
+
+    Any number of readers may hold the lock together; a writer holds it
+    alone. New readers wait while a writer is waiting, so a steady stream
+    of reads cannot starve a mutation. Not reentrant.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        """Hold the lock shared."""
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """Hold the lock exclusively."""
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class ServiceExecutor:
+    """
+    Thread pool for synchronous service calls made by async endpoints.
+
+    Pandas and scikit-learn calls in the dataset, preprocessing, split and
+    model services would otherwise run on the event loop and stall every
+    other request, /health included. Service state lives in this process
+    (class-level dicts), so the pool uses threads; training and other
+    heavy jobs already run in worker processes via JobService.
+
+    Calls touching a dataset take its reader/writer lock inside the pool
+    thread: reads of the same dataset run concurrently, while mutations
+    (upload, scaling) wait for them and run alone.
+    """
+
+    _pool: Optional[ThreadPoolExecutor] = None
+    _dataset_locks: Dict[str, RWLock] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def dataset_lock(cls, dataset_id: str) -> RWLock:
+        """
+        Get the reader/writer lock of a dataset.
+
+        Args:
+            dataset_id: Dataset identifier
+
+        Returns:
+            RWLock shared by every call touching the dataset
+        """
+        with cls._lock:
+            if dataset_id not in cls._dataset_locks:
+                cls._dataset_locks[dataset_id] = RWLock()
+            return cls._dataset_locks[dataset_id]
+
+    @classmethod
+    def reading(cls, dataset_id: Optional[str]):
+        """Context holding a dataset's lock shared (no-op without a dataset)."""
+        return cls.dataset_lock(dataset_id).read() if dataset_id else nullcontext()
+
+    @classmethod
+    async def run(cls, fn: Callable[..., Any], /, *args, **kwargs) -> Any:
+        """
+        Run a call in the pool without dataset locking.
+
+        Args:
+            fn: Synchronous callable
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of fn
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cls._get_pool(), functools.partial(fn, *args, **kwargs))
+
+    @classmethod
+    async def read(cls, dataset_id: str, fn: Callable[..., Any], /, *args, **kwargs) -> Any:
+        """
+        Run a call in the pool holding the dataset's lock shared.
+
+        Args:
+            dataset_id: Dataset the call reads
+            fn: Synchronous callable
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of fn
+        """
+        return await cls.run(cls._locked, cls.dataset_lock(dataset_id).read, fn, args, kwargs)
+
+    @classmethod
+    async def write(cls, dataset_id: str, fn: Callable[..., Any], /, *args, **kwargs) -> Any:
+        """
+        Run a call in the pool holding the dataset's lock exclusively.
+
+        Args:
+            dataset_id: Dataset the call mutates
+            fn: Synchronous callable
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of fn
+        """
+        return await cls.run(cls._locked, cls.dataset_lock(dataset_id).write, fn, args, kwargs)
+
+    @classmethod
+    def metrics(cls):
+        """Gauge samples for /metrics."""
+        pool = cls._pool
+        return [('executor_queue_depth', {}, pool._work_queue.qsize() if pool is not None else 0)]
+
+    @classmethod
+    def shutdown(cls):
+        """Stop the pool after the calls already submitted finish."""
+        with cls._lock:
+            pool, cls._pool = cls._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    @classmethod
+    def _get_pool(cls) -> ThreadPoolExecutor:
+        """Create the pool on first use."""
+        with cls._lock:
+            if cls._pool is None:
+                cls._pool = ThreadPoolExecutor(
+                    max_workers=settings.EXECUTOR_THREADS or None,
+                    thread_name_prefix='service'
+                )
+            return cls._pool
+
+    @staticmethod
+    def _locked(acquire: Callable, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        """Call fn inside a lock context (runs in a pool thread)."""
+        with acquire():
+            return fn(*args, **kwargs)
+
+
+Metrics.register_collector(ServiceExecutor.metrics)
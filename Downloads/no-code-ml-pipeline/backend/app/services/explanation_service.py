@@ -0,0 +1,157 @@
+"""
+Decision-path explanations for tree predictions.
+"""
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException
+
+from app.models.model import ModelType
+from app.services.model_registry import ModelRegistry
+from app.services.split_service import SplitService
+from app.utils.tree_utils import node_predictions, path_contributions
+from app.core.config import settings
+
+
+class ExplanationService:
+    """
+    Service explaining decision-tree predictions.
+
+    Each row gets the path it took through the tree and the contribution
+    of every feature split on along the way: the root value plus the
+    contributions equals the row's prediction (the predicted class's
+    probability for classifiers). A batch is explained in one vectorized
+    pass over its sparse decision-path indicator, so explaining a whole
+    test set costs about as much as predicting it.
+    """
+
+    @classmethod
+    def explain(
+        cls,
+        model_id: str,
+        records: Optional[List[Dict[str, Any]]] = None,
+        use_test_set: bool = False,
+        include_paths: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Explain a batch of predictions of a decision-tree model.
+
+        Args:
+            model_id: Model name (latest version) or name@version
+            records: Raw input rows with the training dataset's columns
+            use_test_set: Explain the model's test split instead of records
+            include_paths: Add each row's node path and the visited nodes
+
+        Returns:
+            Dictionary with one explanation per row, the visited nodes and
+            the mean absolute contribution of every feature
+
+        Raises:
+            HTTPException: If the model is not a decision tree or the input
+                is missing, too large or cannot be encoded
+        """
+        started = time.perf_counter()
+        metadata = ModelRegistry.get_metadata(model_id)
+        if metadata['model_type'] != ModelType.DECISION_TREE.value:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Decision-path explanations need a decision_tree model, not {metadata['model_type']}"
+            )
+        if (records is None) == (not use_test_set):
+            raise HTTPException(status_code=400, detail="Provide either records or use_test_set")
+
+        estimator = ModelRegistry.load_estimator(metadata['model_id'])
+        actual = None
+        if use_test_set:
+            split_data = SplitService.get_model_split(metadata)
+            X = split_data['X_test']
+            actual = np.asarray(split_data['y_test']).tolist()
+        else:
+            X = cls._encode(metadata, records)
+
+        n_rows = X.shape[0]
+        if n_rows > settings.EXPLANATION_MAX_ROWS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot explain {n_rows} rows at once (limit {settings.EXPLANATION_MAX_ROWS})"
+            )
+        if isinstance(X, pd.DataFrame) and not hasattr(estimator, 'feature_names_in_'):
+            X = X.to_numpy(dtype=np.float32)
+
+        classes = getattr(estimator, 'classes_', None)
+        # Classifiers explain the predicted class's probability
+        indicator, outputs, bias, contributions = path_contributions(estimator, X)
+        scores = bias + np.asarray(contributions.sum(axis=1)).ravel()
+        predictions = classes[outputs].tolist() if classes is not None else scores.tolist()
+
+        feature_names = metadata['feature_names']
+        named = np.asarray(feature_names, dtype=object)[contributions.indices].tolist()
+        values = contributions.data.tolist()
+        row_bounds = contributions.indptr.tolist()
+        if include_paths:
+            nodes = indicator.indices.tolist()
+            path_bounds = indicator.indptr.tolist()
+
+        rows = []
+        for i in range(n_rows):
+            start, end = row_bounds[i], row_bounds[i + 1]
+            row = {
+                'prediction': predictions[i],
+                'score': float(scores[i]),
+                'bias': float(bias[i]),
+                'contributions': dict(zip(named[start:end], values[start:end]))
+            }
+            if actual is not None:
+                row['actual'] = actual[i]
+            if include_paths:
+                row['path'] = nodes[path_bounds[i]:path_bounds[i + 1]]
+            rows.append(row)
+
+        mean_abs = np.asarray(abs(contributions).mean(axis=0)).ravel()
+        order = np.argsort(-mean_abs, kind='mergesort')
+        return {
+            'model_id': metadata['model_id'],
+            'source': 'test_set' if use_test_set else 'records',
+            'explained': 'predicted_class_probability' if classes is not None else 'prediction',
+            'n_rows': n_rows,
+            'rows': rows,
+            'nodes': cls._nodes(estimator, feature_names, np.unique(indicator.indices)) if include_paths else None,
+            'mean_abs_contributions': {
+                feature_names[j]: float(mean_abs[j]) for j in order if mean_abs[j] > 0
+            },
+            'elapsed_s': time.perf_counter() - started
+        }
+
+    @classmethod
+    def _encode(cls, metadata: Dict[str, Any], records: List[Dict[str, Any]]):
+        """Encode raw rows with the model's stored preprocessing."""
+        encoder = ModelRegistry.load_encoder(metadata['model_id'])
+        if encoder is None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Model {metadata['model_id']} has no stored preprocessing and cannot explain records"
+            )
+        try:
+            return encoder.transform(pd.DataFrame.from_records(records))
+        except (ValueError, TypeError, KeyError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid explanation input: {str(e)}")
+
+    @classmethod
+    def _nodes(cls, estimator, feature_names: List[str], visited: np.ndarray) -> List[Dict[str, Any]]:
+        """Describe the visited nodes: split rule, children, size and value."""
+        tree_ = estimator.tree_
+        values = node_predictions(estimator)[visited].tolist()
+        nodes = []
+        for node, value in zip(visited.tolist(), values):
+            is_leaf = tree_.children_left[node] == -1
+            nodes.append({
+                'node': node,
+                'feature': None if is_leaf else feature_names[tree_.feature[node]],
+                'threshold': None if is_leaf else float(tree_.threshold[node]),
+                'left': None if is_leaf else int(tree_.children_left[node]),
+                'right': None if is_leaf else int(tree_.children_right[node]),
+                'n_samples': int(tree_.n_node_samples[node]),
+                'value': value
+            })
+        return nodes
@@ -0,0 +1,160 @@
+"""
+Cross-validation fold registry service.
+"""
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from sklearn.model_selection import (
+    KFold, StratifiedKFold, RepeatedKFold, RepeatedStratifiedKFold
+)
+
+from app.services.split_service import SplitService
+from app.core.config import settings
+
+
+class FoldService:
+    """
+    Service for precomputed cross-validation folds.
+
+    Folds are computed once per split and scheme and stored inside the
+    split entry, so they are evicted together with the split. Each repeat
+    is stored as a single small-integer array assigning every training row
+    to its validation fold; index arrays are materialized from it on demand.
+    """
+
+    @classmethod
+    def get_folds(
+        cls,
+        split_id: str,
+        n_splits: int = 5,
+        n_repeats: int = 1,
+        stratify: bool = True,
+        random_state: Optional[int] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get (train, validation) index pairs for a split's training rows.
+
+        The result can be passed directly as ``cv=`` to scikit-learn
+        searches and is identical for every model trained on the split.
+
+        Args:
+            split_id: Split identifier
+            n_splits: Number of folds per repeat
+            n_repeats: Number of repeats (reshuffled) of the K-fold scheme
+            stratify: Whether to stratify folds on the target
+            random_state: Seed for repeated folds (defaults to the split seed)
+
+        Returns:
+            List of (train indices, validation indices) tuples
+        """
+        entry = cls.get_fold_assignments(split_id, n_splits, n_repeats, stratify, random_state)
+        assignments = entry['assignments']
+        positions = np.arange(assignments.shape[1], dtype=entry['index_dtype'])
+
+        folds = []
+        for repeat in assignments:
+            for fold in range(entry['n_splits']):
+                in_fold = repeat == fold
+                folds.append((positions[~in_fold], positions[in_fold]))
+        return folds
+
+    @classmethod
+    def get_fold_assignments(
+        cls,
+        split_id: str,
+        n_splits: int = 5,
+        n_repeats: int = 1,
+        stratify: bool = True,
+        random_state: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get (computing once) the compact fold assignment of a split.
+
+        Args:
+            split_id: Split identifier
+            n_splits: Number of folds per repeat
+            n_repeats: Number of repeats of the K-fold scheme
+            stratify: Whether to stratify folds on the target
+            random_state: Seed for repeated folds
+
+        Returns:
+            Dictionary with the (n_repeats, n_train) assignment array and
+            the scheme actually used
+        """
+        split_data = SplitService.get_split(split_id)
+        if random_state is None:
+            random_state = split_data.get('random_state', settings.RANDOM_STATE)
+
+        y_train = np.asarray(split_data['y_train'])
+        if stratify and not cls._can_stratify(y_train, n_splits):
+            stratify = False
+
+        key = (n_splits, n_repeats, stratify, random_state if n_repeats > 1 else None)
+        registry = split_data.setdefault('folds', {})
+        if key not in registry:
+            registry[key] = cls._compute_assignments(
+                y_train, n_splits, n_repeats, stratify, random_state
+            )
+        return registry[key]
+
+    @classmethod
+    def _compute_assignments(
+        cls,
+        y: np.ndarray,
+        n_splits: int,
+        n_repeats: int,
+        stratify: bool,
+        random_state: int
+    ) -> Dict[str, Any]:
+        """Run the K-fold splitter once and record each row's fold."""
+        if n_repeats > 1:
+            splitter_cls = RepeatedStratifiedKFold if stratify else RepeatedKFold
+            splitter = splitter_cls(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+        else:
+            # Unshuffled folds match what GridSearchCV(cv=n_splits) would use
+            splitter = StratifiedKFold(n_splits=n_splits) if stratify else KFold(n_splits=n_splits)
+
+        n_rows = len(y)
+        assignments = np.empty((n_repeats, n_rows), dtype=np.int8)
+        for i, (_, val_idx) in enumerate(splitter.split(np.zeros(n_rows), y)):
+            assignments[i // n_splits, val_idx] = i % n_splits
+
+        return {
+            'assignments': assignments,
+            'n_splits': n_splits,
+            'n_repeats': n_repeats,
+            'scheme': ('repeated_' if n_repeats > 1 else '') + ('stratified_kfold' if stratify else 'kfold'),
+            'index_dtype': np.int32 if n_rows < np.iinfo(np.int32).max else np.int64
+        }
+
+    @classmethod
+    def _can_stratify(cls, y: np.ndarray, n_splits: int) -> bool:
+        """Check every class has at least n_splits members."""
+        _, counts = np.unique(y, return_counts=True)
+        return len(counts) > 1 and counts.min() >= n_splits
+
+    @classmethod
+    def describe(
+        cls,
+        split_id: str,
+        n_splits: int = 5,
+        n_repeats: int = 1,
+        stratify: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Describe the fold scheme used for a split.
+
+        Args:
+            split_id: Split identifier
+            n_splits: Number of folds per repeat
+            n_repeats: Number of repeats
+            stratify: Whether stratification was requested
+
+        Returns:
+            Dictionary with scheme, fold count and repeats
+        """
+        entry = cls.get_fold_assignments(split_id, n_splits, n_repeats, stratify)
+        return {
+            'scheme': entry['scheme'],
+            'n_splits': entry['n_splits'],
+            'n_repeats': entry['n_repeats']
+        }
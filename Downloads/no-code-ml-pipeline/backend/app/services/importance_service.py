@@ -0,0 +1,349 @@
+"""
+Model-agnostic permutation feature importance.
+"""
+import time
+import numpy as np
+from scipy import sparse
+from typing import Any, Dict, List, Optional
+from joblib import Parallel, delayed, effective_n_jobs
+
+from app.services.array_store import ArrayStore, attach
+from app.services.split_service import SplitService
+from app.services.model_registry import ModelRegistry
+from app.services.job_service import JobService
+
+
+# Repeats every feature gets before top-k screening drops hopeless ones
+SCREENING_REPEATS = 2
+
+# Estimated serial run time (seconds) below which starting workers costs more than it saves
+PARALLEL_MIN_SECONDS = 2.0
+
+
+def _score(y_true: np.ndarray, y_pred: np.ndarray, is_regression: bool) -> float:
+    """R² for regression, accuracy for classification."""
+    if not is_regression:
+        return float(np.mean(y_pred == y_true))
+    sse = float(((y_true - y_pred) ** 2).sum())
+    sst = float(((y_true - y_true.mean()) ** 2).sum())
+    if sst > 0:
+        return 1 - sse / sst
+    return 1.0 if sse == 0 else 0.0
+
+
+def _permuted_scores(
+    estimator,
+    X,
+    y: np.ndarray,
+    is_regression: bool,
+    columns: List[int],
+    repeats: List[int],
+    random_state: int
+) -> np.ndarray:
+    """
+    Score the estimator with each column permuted in turn (worker task).
+
+    Dense matrices are copied once into a buffer; each column is shuffled
+    in place and restored after its repeats. Sparse matrices get the
+    permuted column as a sparse delta added to the original.
+
+    Returns:
+        Array of shape (len(columns), len(repeats)) with permuted scores
+    """
+    n_rows = X.shape[0]
+    # Repeat r uses the same permutation in every task, however features are chunked
+    permutations = [np.random.RandomState(random_state + r).permutation(n_rows) for r in repeats]
+    scores = np.empty((len(columns), len(repeats)))
+
+    if sparse.issparse(X):
+        X = sparse.csr_matrix(X)
+        by_column = X.tocsc()
+        # Row i takes the value of row permutation[i], so row r's value moves to inverse[r]
+        inverses = [np.argsort(permutation) for permutation in permutations]
+        for i, j in enumerate(columns):
+            start, end = by_column.indptr[j], by_column.indptr[j + 1]
+            rows, values = by_column.indices[start:end], by_column.data[start:end]
+            for k, inverse in enumerate(inverses):
+                moved = inverse[rows]
+                delta = sparse.csr_matrix(
+                    (np.concatenate([-values, values]), (np.concatenate([rows, moved]), np.full(2 * len(rows), j))),
+                    shape=X.shape
+                )
+                scores[i, k] = _score(y, estimator.predict(X + delta), is_regression)
+        return scores
+
+    buffer = np.array(X)
+    for i, j in enumerate(columns):
+        original = buffer[:, j].copy()
+        for k, permutation in enumerate(permutations):
+            buffer[:, j] = original[permutation]
+            scores[i, k] = _score(y, estimator.predict(buffer), is_regression)
+        buffer[:, j] = original
+    return scores
+
+
+class ImportanceService:
+    """
+    Service computing permutation importance on a model's test split.
+
+    A feature's importance is the drop in test score (accuracy or R²)
+    when its column is shuffled. Chunks of features run in parallel on
+    the compute slots granted to the job once the work outweighs worker
+    start-up; constant columns score zero
+    without any predictions. With ``top_k``, every feature first gets a
+    couple of repeats and only those that can still reach the top k get
+    the rest. Results are cached with the model version.
+    """
+
+    @classmethod
+    def permutation_importance(
+        cls,
+        estimator,
+        X,
+        y,
+        is_regression: bool,
+        feature_names: List[str],
+        n_repeats: int = 5,
+        top_k: Optional[int] = None,
+        random_state: int = 42
+    ) -> Dict[str, Any]:
+        """
+        Compute permutation importance for a fitted estimator.
+
+        Args:
+            estimator: Fitted estimator
+            X: Test features (array or sparse matrix)
+            y: Test target
+            is_regression: Whether to score with R² instead of accuracy
+            feature_names: Name of every column of X
+            n_repeats: Permutations per feature
+            top_k: Only refine the estimates of features that can still
+                rank in the top k (None = refine all)
+            random_state: Seed for the permutations
+
+        Returns:
+            Dictionary with the baseline score and, per feature, the mean
+            and standard deviation of the score drop, ranked
+        """
+        started = time.perf_counter()
+        y = np.asarray(y, dtype=np.float64) if is_regression else np.asarray(y)
+        predict_started = time.perf_counter()
+        baseline = _score(y, estimator.predict(X), is_regression)
+        predict_s = time.perf_counter() - predict_started
+        n_features = X.shape[1]
+        drops = np.full((n_features, n_repeats), np.nan)
+
+        columns = [j for j in range(n_features) if not cls._is_constant(X, j)]
+        n_constant = n_features - len(columns)
+        drops[np.setdiff1d(np.arange(n_features), columns)] = 0.0
+
+        screened = top_k is not None and top_k < len(columns) and n_repeats > SCREENING_REPEATS
+        first = list(range(SCREENING_REPEATS if screened else n_repeats))
+        parallel = predict_s * len(columns) * n_repeats >= PARALLEL_MIN_SECONDS
+        cls._run(estimator, X, y, is_regression, columns, first, random_state, baseline, drops, parallel)
+
+        if screened:
+            done = drops[columns][:, first]
+            margin = 2 * done.std(axis=1) / np.sqrt(len(first))
+            kth_lower = np.sort(done.mean(axis=1) - margin)[-top_k]
+            columns = [j for j, upper in zip(columns, done.mean(axis=1) + margin) if upper >= kth_lower]
+            rest = list(range(len(first), n_repeats))
+            cls._run(estimator, X, y, is_regression, columns, rest, random_state, baseline, drops, parallel)
+
+        # Features dropped by screening keep the estimate of their first repeats
+        counts = np.isfinite(drops).sum(axis=1)
+        means = np.nanmean(drops, axis=1)
+        stds = np.nanstd(drops, axis=1)
+        order = np.argsort(-means, kind='mergesort')
+        return {
+            'method': 'permutation',
+            'scoring': 'r2' if is_regression else 'accuracy',
+            'baseline_score': baseline,
+            'n_repeats': n_repeats,
+            'top_k': top_k,
+            'random_state': random_state,
+            'n_features': n_features,
+            'n_constant': n_constant,
+            'n_refined': len(columns) if screened else None,
+            'importances': [
+                {
+                    'feature': feature_names[j],
+                    'mean': float(means[j]),
+                    'std': float(stds[j]),
+                    'n_repeats': int(counts[j])
+                }
+                for j in order
+            ],
+            'elapsed_s': time.perf_counter() - started
+        }
+
+    @classmethod
+    def prepare(
+        cls,
+        model_id: str,
+        n_repeats: int = 5,
+        top_k: Optional[int] = None,
+        random_state: int = 42
+    ) -> Dict[str, Any]:
+        """
+        Resolve a model version and its test split into a job payload.
+
+        The split is taken from the split cache, or recomputed with the
+        settings recorded at training time if the dataset is unchanged.
+
+        Args:
+            model_id: Model name (latest version) or name@version
+            n_repeats: Permutations per feature
+            top_k: Optional number of top features to refine
+            random_state: Seed for the permutations
+
+        Returns:
+            Self-contained payload for run()
+
+        Raises:
+            HTTPException: If the model has no reproducible test split
+        """
+        metadata = ModelRegistry.get_metadata(model_id)
+        payload = {
+            'model_id': metadata['model_id'],
+            'n_repeats': n_repeats,
+            'top_k': top_k,
+            'random_state': random_state,
+            'key': cls._cache_key(n_repeats, top_k, random_state)
+        }
+        if cls.cached_result(payload) is not None:
+            return payload
+
+        split_data = SplitService.get_model_split(metadata)
+        dtype = 'float32' if metadata['model_type'] == 'decision_tree' else 'float64'
+        estimator = ModelRegistry.load_estimator(metadata['model_id'])
+        lease, arrays = ArrayStore.export_split(split_data, dtype)
+        return {
+            **payload,
+            'estimator': estimator,
+            'X_test': arrays['X_test'],
+            'y_test': arrays['y_test'],
+            'array_lease': lease,
+            'is_regression': metadata['is_regression'],
+            'feature_names': metadata['feature_names']
+        }
+
+    @classmethod
+    def run(cls, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Compute importance for a prepared payload (runs in a worker process)."""
+        return cls.permutation_importance(
+            payload['estimator'],
+            attach(payload['X_test']),
+            attach(payload['y_test']),
+            payload['is_regression'],
+            payload['feature_names'],
+            n_repeats=payload['n_repeats'],
+            top_k=payload['top_k'],
+            random_state=payload['random_state']
+        )
+
+    @classmethod
+    def release(cls, payload: Dict[str, Any]):
+        """Release the exported test matrices a payload leases."""
+        ArrayStore.release(payload.get('array_lease'))
+
+    @classmethod
+    def cached_result(cls, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Stored result for the same model version and settings, if any."""
+        cached = ModelRegistry.load_importance(payload['model_id'])
+        if cached is None or payload['key'] not in cached:
+            return None
+        return {**cached[payload['key']], 'cached': True}
+
+    @classmethod
+    def store_result(cls, payload: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cache a result with its model version and build the response.
+
+        Args:
+            payload: Payload from prepare()
+            result: Result from run() or cached_result()
+
+        Returns:
+            Importance result with the versioned model ID
+        """
+        if not result.pop('cached', False):
+            cls.store(payload['model_id'], result)
+            cached = False
+        else:
+            cached = True
+        return {'model_id': payload['model_id'], **result, 'cached': cached}
+
+    @classmethod
+    def store(cls, model_id: str, result: Dict[str, Any]):
+        """
+        Add a result to a model version's importance cache.
+
+        Args:
+            model_id: Versioned model ID
+            result: Result of permutation_importance()
+        """
+        cached = dict(ModelRegistry.load_importance(model_id) or {})
+        key = cls._cache_key(result['n_repeats'], result['top_k'], result['random_state'])
+        cached[key] = result
+        ModelRegistry.add_artifact(model_id, 'importance', cached, {'importance': sorted(cached)})
+
+    @classmethod
+    def _run(
+        cls,
+        estimator,
+        X,
+        y: np.ndarray,
+        is_regression: bool,
+        columns: List[int],
+        repeats: List[int],
+        random_state: int,
+        baseline: float,
+        drops: np.ndarray,
+        parallel: bool = True
+    ):
+        """Score column chunks (in parallel if worthwhile) and record the drops."""
+        if not columns or not repeats:
+            return
+        if not parallel:
+            drops[np.ix_(columns, repeats)] = baseline - _permuted_scores(
+                estimator, X, y, is_regression, columns, repeats, random_state
+            )
+            return
+        # A few chunks per worker balances load without copying X per feature
+        n_chunks = min(len(columns), 4 * max(1, effective_n_jobs(None)))
+        chunks = [list(chunk) for chunk in np.array_split(columns, n_chunks)]
+        results = Parallel(n_jobs=None)(
+            delayed(_permuted_scores)(estimator, X, y, is_regression, chunk, repeats, random_state)
+            for chunk in chunks
+        )
+        for chunk, scores in zip(chunks, results):
+            drops[np.ix_(chunk, repeats)] = baseline - scores
+
+    @classmethod
+    def _is_constant(cls, X, j: int) -> bool:
+        """Whether shuffling column j cannot change any row."""
+        if sparse.issparse(X):
+            column = X[:, j]
+            if column.nnz == 0:
+                return True
+            values = column.data
+            return column.nnz == X.shape[0] and bool(np.all(values == values[0]))
+        column = X[:, j]
+        return bool(np.all(column == column[0]))
+
+    @classmethod
+    def _cache_key(cls, n_repeats: int, top_k: Optional[int], random_state: int) -> str:
+        """Cache key of one importance setting."""
+        return f"repeats={n_repeats},top_k={top_k},seed={random_state}"
+
+
+# Importance runs as a background job on the job's compute slots
+JobService.register_handler(
+    'importance',
+    prepare=lambda request: ImportanceService.prepare(**request),
+    run=ImportanceService.run,
+    finish=ImportanceService.store_result,
+    cached=ImportanceService.cached_result,
+    release=ImportanceService.release
+)
@@ -0,0 +1,711 @@
+"""
+Background job service for long-running training work.
+"""
+import atexit
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import HTTPException
+
+from app.models.job import JobStatus
+from app.services.compute_scheduler import ComputeScheduler, compute_limits
+from app.services.executor import ServiceExecutor
+from app.services.profiling_service import ProfilingService
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.core.metrics import Metrics
+
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.TIMEOUT}
+
+# Modules registering each job kind's handler, imported when the kind is first used
+HANDLER_MODULES = {
+    'train': 'app.services.model_service',
+    'leaderboard': 'app.services.model_service',
+    'stream_train': 'app.services.stream_training_service',
+    'importance': 'app.services.importance_service'
+}
+
+
+def _run_task(conn, task) -> None:
+    """Run one job in a worker process and send back its outcome."""
+    run, payload, n_workers, profile_id = task
+    try:
+        with compute_limits(n_workers), ProfilingService.profile(profile_id, 'run'):
+            outcome = ('ok', run(payload))
+    except HTTPException as e:
+        outcome = ('error', e.status_code, str(e.detail))
+    except Exception as e:
+        outcome = ('error', 500, str(e))
+    try:
+        conn.send((*outcome, Metrics.snapshot(reset=True)))
+    except (TypeError, ValueError, AttributeError, pickle.PicklingError) as e:
+        conn.send(('error', 500, f"Job result could not be sent back: {str(e)}", Metrics.snapshot(reset=True)))
+
+
+def _worker_loop(conn) -> None:
+    """
+    Worker process entry point: run jobs received over conn until it closes.
+
+    Each task is (run, payload, n_workers, profile_id); the outcome goes
+    back on the same pipe with the job's metrics samples as its last
+    element. Imports done by one job (pandas, scikit-learn) stay loaded
+    for the next.
+
+    Args:
+        conn: Duplex pipe end shared with the dispatcher
+    """
+    configure_logging()
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        _run_task(conn, task)
+    conn.close()
+
+
+class JobWorker:
+    """A long-lived worker process that runs one job at a time."""
+
+    def __init__(self, name: str):
+        context = multiprocessing.get_context(settings.TRAINING_START_METHOD)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_loop, args=(child_conn,), name=name)
+        self.process.start()
+        child_conn.close()
+        self.n_jobs = 0
+        self.retired = False
+
+    def submit(
+        self,
+        run: Callable[[Dict[str, Any]], Any],
+        payload: Dict[str, Any],
+        n_workers: int,
+        profile_id: Optional[str]
+    ):
+        """Hand the worker a job (raises OSError if the process is gone)."""
+        self.conn.send((run, payload, n_workers, profile_id))
+        self.n_jobs += 1
+
+    @property
+    def reusable(self) -> bool:
+        """Whether the worker can take another job."""
+        if self.retired or not self.process.is_alive():
+            return False
+        return not settings.TRAINING_WORKER_MAX_JOBS or self.n_jobs < settings.TRAINING_WORKER_MAX_JOBS
+
+    def stop(self):
+        """Ask an idle worker to exit after its current loop (non-blocking)."""
+        self.retired = True
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+
+    def kill(self):
+        """Terminate the worker, abandoning its job (non-blocking)."""
+        self.retired = True
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def join(self, timeout: float = 5.0):
+        """Wait for the process to exit, killing it if it does not."""
+        self.process.join(timeout=timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class JobService:
+    """
+    Service for queued background jobs executed in worker processes.
+
+    Each job goes through three steps supplied by its handler: ``prepare``
+    builds a payload from service state in the API process, ``run`` does
+    the CPU-bound work in a worker process, and ``finish`` stores the
+    outcome back in the API process. Up to TRAINING_MAX_WORKERS long-lived
+    worker processes run one job each, each job only once the compute
+    scheduler grants it CPU slots. A worker whose job times out or is
+    cancelled is killed and replaced on demand; workers are also recycled
+    after TRAINING_WORKER_MAX_JOBS jobs. Job records are persisted as JSON
+    under TEMP_DIR; finished ones are removed after JOB_RETENTION_S or
+    beyond the newest JOB_RETENTION_COUNT.
+    """
+
+    _jobs: Dict[str, Dict[str, Any]] = {}
+    _queue: deque = deque()
+    _running: Dict[str, Dict[str, Any]] = {}
+    _futures: Dict[str, Future] = {}
+    _handlers: Dict[str, Dict[str, Callable]] = {}
+    _idle: List[JobWorker] = []
+    # Workers that were killed or stopped, joined by the dispatcher outside the lock
+    _retired: List[JobWorker] = []
+    _n_spawned = 0
+    _lock = threading.RLock()
+    _dispatcher: Optional[threading.Thread] = None
+    _stopping = threading.Event()
+    _loaded = False
+
+    @classmethod
+    def register_handler(
+        cls,
+        kind: str,
+        prepare: Callable[[Dict[str, Any]], Dict[str, Any]],
+        run: Callable[[Dict[str, Any]], Any],
+        finish: Callable[[Dict[str, Any], Any], Dict[str, Any]],
+        cached: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        release: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        Register how a kind of job is prepared, run and finished.
+
+        Args:
+            kind: Job kind name
+            prepare: Builds the worker payload from the job request
+            run: Runs in the worker process; must be picklable
+            finish: Stores the worker result and returns the job result
+            cached: Optional lookup returning a stored run result for the
+                payload; on a hit the job finishes without a worker
+            release: Optional hook freeing what the payload holds (such as
+                exported arrays); called once the job ends, however it ends
+        """
+        cls._handlers[kind] = {
+            'prepare': prepare, 'run': run, 'finish': finish, 'cached': cached, 'release': release
+        }
+
+    @classmethod
+    def submit(
+        cls,
+        kind: str,
+        request: Dict[str, Any],
+        timeout_s: Optional[float] = None,
+        profile_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a job for execution.
+
+        Args:
+            kind: Job kind (must have a registered handler)
+            request: JSON-serializable job request
+            timeout_s: Per-job timeout in seconds
+            profile_id: Profile the job's prepare and run are recorded into
+
+        Returns:
+            Job record
+
+        Raises:
+            HTTPException: If the kind is unknown or the queue is full
+        """
+        cls._ensure_started()
+        if cls._get_handler(kind) is None:
+            raise HTTPException(status_code=400, detail=f"Unsupported job kind: {kind}")
+
+        with cls._lock:
+            if len(cls._queue) >= settings.TRAINING_MAX_QUEUED:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Training queue is full. Please retry later.",
+                    headers={'Retry-After': '30'}
+                )
+            job_id = str(uuid.uuid4())
+            record = {
+                'job_id': job_id,
+                'kind': kind,
+                'status': JobStatus.QUEUED.value,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'timeout_s': float(timeout_s or settings.TRAINING_JOB_TIMEOUT),
+                'slots': None,
+                'profile_id': profile_id,
+                'request': request,
+                'error': None,
+                'error_status': None,
+                'result': None
+            }
+            cls._jobs[job_id] = record
+            cls._futures[job_id] = Future()
+            cls._queue.append(job_id)
+            cls._persist(record)
+        return record
+
+    @classmethod
+    def get_job(cls, job_id: str) -> Dict[str, Any]:
+        """
+        Get a job record.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job record
+
+        Raises:
+            HTTPException: If job not found
+        """
+        cls._load()
+        if job_id not in cls._jobs:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        return cls._jobs[job_id]
+
+    @classmethod
+    def get_result(cls, job_id: str) -> Dict[str, Any]:
+        """
+        Get the result of a succeeded job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job result dictionary
+
+        Raises:
+            HTTPException: If the job has not succeeded
+        """
+        record = cls.get_job(job_id)
+        if record['status'] != JobStatus.SUCCEEDED.value:
+            detail = f"Job {job_id} is {record['status']}"
+            if record['error']:
+                detail += f": {record['error']}"
+            raise HTTPException(status_code=409, detail=detail)
+        return record['result']
+
+    @classmethod
+    def list_jobs(cls, status: Optional[JobStatus] = None) -> List[Dict[str, Any]]:
+        """
+        List jobs, newest first.
+
+        Args:
+            status: Optional status filter
+
+        Returns:
+            List of job records
+        """
+        cls._load()
+        jobs = [
+            job for job in cls._jobs.values()
+            if status is None or job['status'] == JobStatus(status).value
+        ]
+        return sorted(jobs, key=lambda job: job['created_at'], reverse=True)
+
+    @classmethod
+    def cancel(cls, job_id: str) -> Dict[str, Any]:
+        """
+        Cancel a queued or running job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Updated job record
+
+        Raises:
+            HTTPException: If the job already finished
+        """
+        with cls._lock:
+            record = cls.get_job(job_id)
+            status = JobStatus(record['status'])
+            if status in FINISHED_STATUSES:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Job {job_id} already finished with status {status.value}"
+                )
+            if job_id in cls._queue:
+                cls._queue.remove(job_id)
+            else:
+                cls._terminate(job_id)
+            cls._finish(job_id, JobStatus.CANCELLED, error="Cancelled by user")
+        return record
+
+    @classmethod
+    def wait(cls, job_id: str) -> Future:
+        """
+        Get a future resolved with the job record once the job finishes.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            concurrent.futures.Future (wrap with asyncio.wrap_future to await)
+        """
+        record = cls.get_job(job_id)
+        with cls._lock:
+            future = cls._futures.get(job_id)
+            if future is None:
+                future = Future()
+                cls._futures[job_id] = future
+                if JobStatus(record['status']) in FINISHED_STATUSES:
+                    future.set_result(record)
+        return future
+
+    @classmethod
+    def queue_depth(cls) -> Dict[str, int]:
+        """Number of queued and running jobs."""
+        with cls._lock:
+            return {'queued': len(cls._queue), 'running': len(cls._running)}
+
+    @classmethod
+    def capacity(cls) -> Dict[str, Any]:
+        """Queue depth and compute slot usage."""
+        return {
+            **cls.queue_depth(),
+            'max_queued': settings.TRAINING_MAX_QUEUED,
+            'max_running': settings.TRAINING_MAX_WORKERS,
+            **ComputeScheduler.stats()
+        }
+
+    @classmethod
+    def metrics(cls):
+        """Gauge samples for /metrics."""
+        depth = cls.queue_depth()
+        return [
+            ('job_queue_depth', {'state': 'queued'}, depth['queued']),
+            ('job_queue_depth', {'state': 'running'}, depth['running']),
+            ('compute_slots_in_use', {}, ComputeScheduler.stats()['slots_in_use'])
+        ]
+
+    @classmethod
+    def shutdown(cls):
+        """Stop the dispatcher and every worker process."""
+        cls._stopping.set()
+        with cls._lock:
+            for job_id in list(cls._running):
+                cls._terminate(job_id)
+                cls._finish(job_id, JobStatus.FAILED, error="Interrupted by server shutdown")
+            for worker in cls._idle:
+                worker.stop()
+            cls._retired.extend(cls._idle)
+            cls._idle = []
+        cls._reap()
+
+    @classmethod
+    def _get_handler(cls, kind: str) -> Optional[Dict[str, Callable]]:
+        """Handler of a job kind, importing the module that registers it."""
+        if kind not in cls._handlers and kind in HANDLER_MODULES:
+            importlib.import_module(HANDLER_MODULES[kind])
+        return cls._handlers.get(kind)
+
+    @classmethod
+    def _ensure_started(cls):
+        """Load persisted jobs and start the dispatcher thread once."""
+        cls._load()
+        with cls._lock:
+            if cls._dispatcher is None or not cls._dispatcher.is_alive():
+                cls._stopping.clear()
+                cls._dispatcher = threading.Thread(
+                    target=cls._dispatch_loop, name="job-dispatcher", daemon=True
+                )
+                cls._dispatcher.start()
+
+    @classmethod
+    def _dispatch_loop(cls):
+        """Start queued jobs, collect finished ones and enforce timeouts."""
+        while not cls._stopping.is_set():
+            cls._start_queued()
+
+            with cls._lock:
+                conns = {
+                    info['worker'].conn: job_id
+                    for job_id, info in cls._running.items()
+                    if info.get('worker') is not None
+                }
+            if conns:
+                for conn in wait(list(conns), timeout=0.2):
+                    cls._collect(conns[conn])
+            else:
+                cls._stopping.wait(0.2)
+
+            cls._enforce_timeouts()
+            cls._reap()
+
+    @classmethod
+    def _start_queued(cls):
+        """Start queued jobs while worker processes and CPU slots are free."""
+        while True:
+            with cls._lock:
+                if not cls._queue or len(cls._running) >= settings.TRAINING_MAX_WORKERS:
+                    return
+                job_id = cls._queue[0]
+                n_slots = ComputeScheduler.try_acquire(job_id)
+                if n_slots is None:
+                    return
+                cls._queue.popleft()
+                record = cls._jobs[job_id]
+                record['slots'] = n_slots
+                # Reserve the worker while the payload is prepared
+                cls._running[job_id] = {'worker': None, 'payload': None}
+
+            handler = cls._get_handler(record['kind'])
+            try:
+                # Preparing reads the dataset (splits); hold off concurrent mutations
+                with ProfilingService.profile(record.get('profile_id'), 'prepare'):
+                    with ServiceExecutor.reading(record['request'].get('dataset_id')):
+                        payload = handler['prepare'](record['request'])
+                    with cls._lock:
+                        if job_id not in cls._running:
+                            # Cancelled while the payload was being prepared
+                            cls._release(record['kind'], payload)
+                            continue
+                        # From here on _finish releases the payload
+                        cls._running[job_id]['payload'] = payload
+                    stored = handler['cached'](payload) if handler['cached'] else None
+                    if stored is not None:
+                        result = handler['finish'](payload, stored)
+                if stored is not None:
+                    with cls._lock:
+                        if job_id in cls._running:
+                            cls._finish(job_id, JobStatus.SUCCEEDED, result=result)
+                    continue
+            except HTTPException as e:
+                with cls._lock:
+                    cls._finish(job_id, JobStatus.FAILED, error=str(e.detail), error_status=e.status_code)
+                continue
+            except Exception as e:
+                with cls._lock:
+                    cls._finish(job_id, JobStatus.FAILED, error=str(e), error_status=500)
+                continue
+
+            with cls._lock:
+                if job_id not in cls._running:
+                    # Cancelled while the cached result was looked up
+                    continue
+                worker = cls._idle.pop() if cls._idle else None
+            worker = cls._send(worker, handler['run'], payload, n_slots, record.get('profile_id'))
+
+            with cls._lock:
+                if job_id not in cls._running:
+                    # Cancelled while the job was handed over
+                    worker.kill()
+                    cls._retired.append(worker)
+                    continue
+                cls._running[job_id] = {
+                    'worker': worker,
+                    'payload': payload,
+                    'deadline': time.time() + record['timeout_s']
+                }
+                record['status'] = JobStatus.RUNNING.value
+                record['started_at'] = time.time()
+                cls._persist(record)
+
+    @classmethod
+    def _send(
+        cls,
+        worker: Optional[JobWorker],
+        run: Callable[[Dict[str, Any]], Any],
+        payload: Dict[str, Any],
+        n_slots: int,
+        profile_id: Optional[str]
+    ) -> JobWorker:
+        """Hand a job to an idle worker, starting a new one if there is none or it died."""
+        if worker is not None:
+            try:
+                worker.submit(run, payload, n_slots, profile_id)
+                return worker
+            except OSError:
+                worker.kill()
+                with cls._lock:
+                    cls._retired.append(worker)
+        with cls._lock:
+            cls._n_spawned += 1
+            name = f"job-worker-{cls._n_spawned}"
+        worker = JobWorker(name)
+        worker.submit(run, payload, n_slots, profile_id)
+        return worker
+
+    @classmethod
+    def _collect(cls, job_id: str):
+        """Receive a worker's outcome and finish its job."""
+        with cls._lock:
+            info = cls._running.get(job_id)
+        if info is None:
+            return
+
+        worker = info['worker']
+        try:
+            *outcome, samples = worker.conn.recv()
+            Metrics.merge(samples)
+        except (EOFError, OSError):
+            worker.process.join(timeout=1)
+            worker.kill()
+            outcome = ('error', 500, f"Worker exited unexpectedly (exit code {worker.process.exitcode})")
+
+        if outcome[0] == 'ok':
+            try:
+                result = cls._get_handler(cls._jobs[job_id]['kind'])['finish'](info['payload'], outcome[1])
+            except HTTPException as e:
+                outcome = ('error', e.status_code, str(e.detail))
+            except Exception as e:
+                outcome = ('error', 500, str(e))
+
+        with cls._lock:
+            if job_id not in cls._running:
+                # Cancelled or timed out while the result was being stored
+                return
+            if outcome[0] == 'ok':
+                cls._finish(job_id, JobStatus.SUCCEEDED, result=result)
+            else:
+                cls._finish(job_id, JobStatus.FAILED, error=outcome[2], error_status=outcome[1])
+
+    @classmethod
+    def _enforce_timeouts(cls):
+        """Terminate running jobs past their deadline."""
+        now = time.time()
+        with cls._lock:
+            for job_id, info in list(cls._running.items()):
+                if info.get('deadline') is not None and now > info['deadline']:
+                    cls._terminate(job_id)
+                    cls._finish(
+                        job_id, JobStatus.TIMEOUT,
+                        error=f"Job exceeded timeout of {cls._jobs[job_id]['timeout_s']}s"
+                    )
+
+    @classmethod
+    def _terminate(cls, job_id: str):
+        """Kill a running job's worker process (joined later by _reap)."""
+        info = cls._running.get(job_id)
+        if info and info.get('worker') is not None:
+            info['worker'].kill()
+
+    @classmethod
+    def _reap(cls):
+        """Join retired workers without holding the lock."""
+        with cls._lock:
+            retired, cls._retired = cls._retired, []
+        for worker in retired:
+            worker.join()
+
+    @classmethod
+    def _finish(
+        cls,
+        job_id: str,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        error_status: Optional[int] = None
+    ):
+        """Record a job's final state and resolve its future (lock held)."""
+        info = cls._running.pop(job_id, None)
+        worker = info.get('worker') if info else None
+        if worker is not None:
+            if worker.reusable:
+                cls._idle.append(worker)
+            else:
+                if not worker.retired:
+                    worker.stop()
+                cls._retired.append(worker)
+        ComputeScheduler.release(job_id)
+
+        record = cls._jobs[job_id]
+        if info and info.get('payload') is not None:
+            cls._release(record['kind'], info['payload'])
+        record['status'] = status.value
+        record['finished_at'] = time.time()
+        record['result'] = result
+        record['error'] = error
+        record['error_status'] = error_status
+        cls._persist(record)
+
+        future = cls._futures.pop(job_id, None)
+        if future is not None and not future.done():
+            future.set_result(record)
+        cls._prune()
+
+    @classmethod
+    def _prune(cls):
+        """Remove finished jobs past the retention limits (lock held)."""
+        finished = sorted(
+            (
+                record for record in cls._jobs.values()
+                if JobStatus(record['status']) in FINISHED_STATUSES
+            ),
+            key=lambda record: record['finished_at'] or record['created_at'],
+            reverse=True
+        )
+        expired = finished[max(0, settings.JOB_RETENTION_COUNT):]
+        if settings.JOB_RETENTION_S:
+            cutoff = time.time() - settings.JOB_RETENTION_S
+            expired += [
+                record for record in finished[:settings.JOB_RETENTION_COUNT]
+                if (record['finished_at'] or record['created_at']) < cutoff
+            ]
+        for record in expired:
+            del cls._jobs[record['job_id']]
+            cls._futures.pop(record['job_id'], None)
+            try:
+                os.remove(os.path.join(cls._jobs_dir(), f"{record['job_id']}.json"))
+            except OSError:
+                pass
+
+    @classmethod
+    def _release(cls, kind: str, payload: Dict[str, Any]):
+        """Run a job kind's release hook on its payload; failures are only logged."""
+        release = cls._handlers[kind]['release']
+        if release is None:
+            return
+        try:
+            release(payload)
+        except Exception:
+            logger.exception("Releasing the payload of a %s job failed", kind)
+
+    @classmethod
+    def _jobs_dir(cls) -> str:
+        """Directory holding persisted job records."""
+        return os.path.join(settings.TEMP_DIR, 'jobs')
+
+    @classmethod
+    def _persist(cls, record: Dict[str, Any]):
+        """Atomically write a job record to disk."""
+        os.makedirs(cls._jobs_dir(), exist_ok=True)
+        path = os.path.join(cls._jobs_dir(), f"{record['job_id']}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(record, f, default=str)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def _load(cls):
+        """Load persisted job records once; unfinished ones were interrupted."""
+        with cls._lock:
+            if cls._loaded:
+                return
+            cls._loaded = True
+            if not os.path.isdir(cls._jobs_dir()):
+                return
+            for filename in os.listdir(cls._jobs_dir()):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(cls._jobs_dir(), filename)) as f:
+                        record = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if record['job_id'] in cls._jobs:
+                    continue
+                cls._jobs[record['job_id']] = record
+                if JobStatus(record['status']) not in FINISHED_STATUSES:
+                    record['status'] = JobStatus.FAILED.value
+                    record['finished_at'] = time.time()
+                    record['error'] = "Interrupted by server restart"
+                    cls._persist(record)
+            cls._prune()
+
+
+Metrics.register_collector(JobService.metrics)
+# Idle workers wait on their pipes; stop them before multiprocessing joins its children at exit
+atexit.register(JobService.shutdown)
@@ -0,0 +1,321 @@
+"""
+Versioned on-disk model registry.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import joblib
+import sklearn
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.metrics import Metrics
+
+
+class ModelRegistry:
+    """
+    Registry of trained model versions stored under MODEL_DIR.
+
+    Every registration creates ``MODEL_DIR/<name>/<version>/`` holding
+    ``metadata.json`` (metrics, parameters, lineage), ``estimator.joblib``,
+    ``encoder.joblib`` and, once exported, ``compiled.joblib``. A model ID
+    is either ``name`` (the latest version) or ``name@version``. Metadata is
+    read without touching the pickles; artifacts are loaded on first use
+    with their numpy arrays memory-mapped, and only those of the
+    MODEL_CACHE_SIZE most recently used models stay resident.
+    """
+
+    _metadata: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    # Modification time of each model directory when its metadata was read
+    _mtimes: Dict[str, Optional[int]] = {}
+    _loaded: "OrderedDict[Tuple[str, int, str], Any]" = OrderedDict()
+    _lock = threading.RLock()
+
+    @classmethod
+    def register(
+        cls,
+        name: str,
+        estimator,
+        encoder,
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Persist a new version of a model.
+
+        Args:
+            name: Model name (versions accumulate under it)
+            estimator: Fitted estimator
+            encoder: Fitted FeatureEncoder of the training split (or None)
+            metadata: JSON-serializable metrics, parameters and lineage
+
+        Returns:
+            Metadata of the registered version
+        """
+        with cls._lock:
+            versions = cls._versions(name)
+            version = max(versions, default=0) + 1
+            model_dir = cls._model_dir(name)
+            os.makedirs(model_dir, exist_ok=True)
+
+            # Build the version in a scratch directory, then publish it atomically
+            staging = os.path.join(model_dir, f".{version}.tmp")
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            # Uncompressed pickles so arrays can be memory-mapped on load
+            with Metrics.span('serialize'):
+                joblib.dump(estimator, os.path.join(staging, 'estimator.joblib'))
+                joblib.dump(encoder, os.path.join(staging, 'encoder.joblib'))
+
+            record = {
+                **metadata,
+                'name': name,
+                'version': version,
+                'model_id': f"{name}@{version}",
+                'created_at': time.time(),
+                'estimator_class': type(estimator).__name__,
+                'sklearn_version': sklearn.__version__,
+                'size_bytes': sum(
+                    os.path.getsize(os.path.join(staging, f)) for f in os.listdir(staging)
+                )
+            }
+            with open(os.path.join(staging, 'metadata.json'), 'w') as f:
+                json.dump(record, f, default=str)
+            os.rename(staging, os.path.join(model_dir, str(version)))
+
+            versions[version] = record
+            return record
+
+    @classmethod
+    def get_metadata(cls, model_id: str) -> Dict[str, Any]:
+        """
+        Get a version's metadata without loading its estimator.
+
+        Args:
+            model_id: ``name`` (latest version) or ``name@version``
+
+        Returns:
+            Metadata dictionary
+
+        Raises:
+            HTTPException: If the model or version does not exist
+        """
+        name, version = cls._resolve(model_id)
+        return cls._versions(name)[version]
+
+    @classmethod
+    def cached_version_id(cls, model_id: str) -> Optional[str]:
+        """
+        Resolve a model ID from metadata already in memory.
+
+        Only stats the model directory and never waits for the registry
+        lock, so it is safe on the event loop. Versions published by other
+        processes (job workers) change the directory's mtime, which turns
+        the cached metadata into a miss until it is read again.
+
+        Args:
+            model_id: ``name`` (latest version) or ``name@version``
+
+        Returns:
+            Concrete ``name@version``, or None if the metadata is not
+            cached (resolve with get_metadata then)
+        """
+        name, _, version = model_id.partition('@')
+        versions = cls._metadata.get(name)
+        if not versions or cls._mtimes.get(name) != cls._dir_mtime(name):
+            return None
+        if not version:
+            return f"{name}@{max(versions)}"
+        return f"{name}@{int(version)}" if version.isdigit() and int(version) in versions else None
+
+    @classmethod
+    def list_versions(cls, name: str) -> List[Dict[str, Any]]:
+        """
+        List a model's versions, newest first.
+
+        Args:
+            name: Model name
+
+        Returns:
+            List of metadata dictionaries
+
+        Raises:
+            HTTPException: If the model does not exist
+        """
+        versions = cls._versions(name)
+        if not versions:
+            raise HTTPException(status_code=404, detail=f"Model not found: {name}")
+        return [versions[v] for v in sorted(versions, reverse=True)]
+
+    @classmethod
+    def load_estimator(cls, model_id: str):
+        """
+        Load (or reuse) a version's fitted estimator.
+
+        Args:
+            model_id: ``name`` or ``name@version``
+
+        Returns:
+            Fitted estimator
+        """
+        return cls._load(model_id, 'estimator')
+
+    @classmethod
+    def load_encoder(cls, model_id: str):
+        """
+        Load (or reuse) a version's fitted feature encoder.
+
+        Args:
+            model_id: ``name`` or ``name@version``
+
+        Returns:
+            FeatureEncoder, or None if the model was registered without one
+        """
+        return cls._load(model_id, 'encoder')
+
+    @classmethod
+    def load_compiled(cls, model_id: str):
+        """
+        Load (or reuse) a version's compiled array-form evaluator.
+
+        Args:
+            model_id: ``name`` or ``name@version``
+
+        Returns:
+            Compiled evaluator, or None if the version was never exported
+        """
+        if not cls.get_metadata(model_id).get('compiled'):
+            return None
+        return cls._load(model_id, 'compiled')
+
+    @classmethod
+    def load_importance(cls, model_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load (or reuse) a version's cached feature importance results.
+
+        Args:
+            model_id: ``name`` or ``name@version``
+
+        Returns:
+            Dictionary of importance setting to result, or None if none
+            were computed
+        """
+        if not cls.get_metadata(model_id).get('importance'):
+            return None
+        return cls._load(model_id, 'importance')
+
+    @classmethod
+    def add_artifact(
+        cls,
+        model_id: str,
+        artifact: str,
+        value,
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Store an extra artifact with an existing version.
+
+        Args:
+            model_id: ``name`` or ``name@version``
+            artifact: Artifact name (stored as ``<artifact>.joblib``)
+            value: Picklable artifact
+            metadata: Fields merged into the version's metadata
+
+        Returns:
+            Updated metadata of the version
+        """
+        name, version = cls._resolve(model_id)
+        version_dir = os.path.join(cls._model_dir(name), str(version))
+        path = os.path.join(version_dir, f"{artifact}.joblib")
+        with cls._lock:
+            joblib.dump(value, f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+
+            record = {**cls._versions(name)[version], **metadata}
+            metadata_path = os.path.join(version_dir, 'metadata.json')
+            with open(f"{metadata_path}.tmp", 'w') as f:
+                json.dump(record, f, default=str)
+            os.replace(f"{metadata_path}.tmp", metadata_path)
+
+            cls._versions(name)[version] = record
+            cls._loaded.pop((name, version, artifact), None)
+            return record
+
+    @classmethod
+    def _load(cls, model_id: str, artifact: str):
+        """Load an artifact through the resident-model LRU."""
+        name, version = cls._resolve(model_id)
+        key = (name, version, artifact)
+        with cls._lock:
+            if key in cls._loaded:
+                cls._loaded.move_to_end(key)
+                Metrics.cache_lookup('model', hit=True)
+                return cls._loaded[key]
+        Metrics.cache_lookup('model', hit=False)
+
+        path = os.path.join(cls._model_dir(name), str(version), f"{artifact}.joblib")
+        value = joblib.load(path, mmap_mode='r')
+
+        with cls._lock:
+            cls._loaded[key] = value
+            # Up to four artifacts (estimator, encoder, compiled, importance) per resident model
+            while len(cls._loaded) > 4 * settings.MODEL_CACHE_SIZE:
+                cls._loaded.popitem(last=False)
+        return value
+
+    @classmethod
+    def _resolve(cls, model_id: str) -> Tuple[str, int]:
+        """Split a model ID into name and concrete version."""
+        name, _, version = model_id.partition('@')
+        versions = cls._versions(name)
+        if not versions:
+            raise HTTPException(status_code=404, detail=f"Model not found: {model_id}")
+        if not version:
+            return name, max(versions)
+        try:
+            version = int(version)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid model version: {version}")
+        if version not in versions:
+            raise HTTPException(status_code=404, detail=f"Model not found: {model_id}")
+        return name, version
+
+    @classmethod
+    def _versions(cls, name: str) -> Dict[int, Dict[str, Any]]:
+        """Metadata of every published version of a model (re-read when its directory changes)."""
+        with cls._lock:
+            mtime = cls._dir_mtime(name)
+            if name not in cls._metadata or cls._mtimes.get(name) != mtime:
+                versions = {}
+                model_dir = cls._model_dir(name)
+                if os.path.isdir(model_dir):
+                    for entry in os.listdir(model_dir):
+                        if not entry.isdigit():
+                            continue
+                        try:
+                            with open(os.path.join(model_dir, entry, 'metadata.json')) as f:
+                                versions[int(entry)] = json.load(f)
+                        except (OSError, ValueError):
+                            continue
+                cls._metadata[name] = versions
+                # Taken before listing, so a version published meanwhile forces another read
+                cls._mtimes[name] = mtime
+            return cls._metadata[name]
+
+    @classmethod
+    def _dir_mtime(cls, name: str) -> Optional[int]:
+        """Modification time of a model's directory in ns, or None if it does not exist."""
+        try:
+            return os.stat(cls._model_dir(name)).st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def _model_dir(cls, name: str) -> str:
+        """Directory holding a model's versions."""
+        if not name or os.path.basename(name) != name or name.startswith('.'):
+            raise HTTPException(status_code=400, detail=f"Invalid model name: {name}")
+        return os.path.join(settings.MODEL_DIR, name)
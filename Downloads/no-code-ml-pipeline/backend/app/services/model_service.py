@@ -1,28 +1,46 @@
 """
 ML model training and evaluation service.
 """
+import logging
+import time
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, Optional
-from sklearn.linear_model import LogisticRegression, LinearRegression
+from typing import Dict, Any, List, Optional
+from joblib import Parallel, delayed
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression, LinearRegression, SGDClassifier, SGDRegressor
 from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
-from sklearn.model_selection import GridSearchCV
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, 
-    f1_score, confusion_matrix,
-    mean_squared_error, mean_absolute_error, r2_score
-)
+from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+from sklearn.naive_bayes import GaussianNB
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 from fastapi import HTTPException
 
-from app.models.model import ModelType
+from app.models.model import CategoricalEncoding, ModelType, SearchStrategy
 from app.services.split_service import SplitService
+from app.services.array_store import ArrayStore, SPLIT_ARRAYS, attach
+from app.services.fold_service import FoldService
+from app.services.search_service import PRUNING_FIXED, SearchService
+from app.services.evaluation_service import EvaluationService
+from app.services.importance_service import ImportanceService
+from app.services.result_cache import ResultCache
+from app.services.model_registry import ModelRegistry
+from app.services.job_service import JobService
+from app.services.compute_scheduler import estimator_threads, granted_workers
+from app.utils.compiled_models import compile_estimator
+from app.core.config import settings
+from app.core.metrics import Metrics
+
+
+logger = logging.getLogger(__name__)
 
 
 class ModelService:
-    """Service for ML model training and evaluation."""
+    """
+    Service for ML model training and evaluation.
     
-    # Store trained models
-    _models: Dict[str, Dict[str, Any]] = {}
+    Trained models are persisted as versions in the ModelRegistry.
+    """
     
     @classmethod
     def train_model(
@@ -30,16 +48,21 @@ class ModelService:
         dataset_id: str,
         model_type: ModelType,
         target_column: str,
-        hyperparameters: Optional[Dict[str, Any]] = None
+        hyperparameters: Optional[Dict[str, Any]] = None,
+        split_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Train ML model on dataset.
+        Train ML model on dataset in the current process.
+        
+        The API runs training through JobService instead, which calls the
+        same prepare/run/store steps with the run step in a worker process.
         
         Args:
             dataset_id: Dataset identifier
             model_type: Type of model to train
             target_column: Name of the target column
             hyperparameters: Optional model hyperparameters
+            split_id: Optional split to train on
             
         Returns:
             Dictionary with training results and metrics
@@ -47,178 +70,307 @@ class ModelService:
         Raises:
             HTTPException: If training fails
         """
+        payload = cls.prepare_training(
+            dataset_id, model_type, target_column, hyperparameters, split_id
+        )
+        result = cls.cached_training_result(payload) or cls.run_training(payload)
+        return cls.store_training_result(payload, result)
+    
+    @classmethod
+    def prepare_training(
+        cls,
+        dataset_id: str,
+        model_type: ModelType,
+        target_column: str,
+        hyperparameters: Optional[Dict[str, Any]] = None,
+        split_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Resolve the split and build a self-contained training payload.
+        
+        The payload holds everything run_training needs, so it can be
+        shipped to a worker process that has no access to service state.
+        
+        Args:
+            dataset_id: Dataset identifier
+            model_type: Type of model to train
+            target_column: Name of the target column
+            hyperparameters: Optional model hyperparameters
+            split_id: Optional split to train on
+            
+        Returns:
+            Training payload dictionary
+        """
         try:
-            print(f"\n{'='*60}")
-            print(f"TRAINING MODEL - Start")
-            print(f"Dataset ID: {dataset_id}")
-            print(f"Model Type: {model_type}")
-            print(f"Target Column: {target_column}")
-            print(f"{'='*60}\n")
-            
-            # Get split data - if not exists, perform split first
-            try:
-                print("Step 1: Getting split data...")
-                split_data = SplitService.get_split_data(dataset_id)
-                print(f"✓ Split data found in memory")
-            except HTTPException as e:
-                if e.status_code == 404:
-                    # Split hasn't been performed yet - do it now with defaults
-                    print(f"✗ No split data found. Performing automatic split...")
-                    SplitService.perform_split(
-                        dataset_id=dataset_id,
-                        target_column=target_column,
-                        test_size=0.3,
-                        random_state=42
-                    )
-                    split_data = SplitService.get_split_data(dataset_id)
-                    print(f"✓ Automatic split completed")
-                else:
-                    print(f"✗ Error getting split data: {e.detail}")
-                    raise
+            model_type = ModelType(model_type)
+            logger.info(f"Training {model_type.value} on dataset {dataset_id} (target {target_column})")
+            
+            # Get split data - reuse a cached split or perform one with defaults
+            split_data = cls._resolve_split(dataset_id, target_column, split_id)
+            logger.info(f"Using split {split_data['split_id']}")
             
-            print(f"Step 2: Extracting train/test data...")
-            X_train = split_data['X_train']
-            X_test = split_data['X_test']
-            y_train = split_data['y_train']
-            y_test = split_data['y_test']
-            print(f"✓ Train shape: {X_train.shape}, Test shape: {X_test.shape}")
+            if model_type in (ModelType.HIST_GRADIENT_BOOSTING, ModelType.NAIVE_BAYES) and sparse.issparse(split_data['X_train']):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{model_type.value} needs dense features; use label or target encoding"
+                )
+            native = split_data['preprocessing_plan']['categorical_encoding'] == CategoricalEncoding.NATIVE.value
+            if native and model_type != ModelType.HIST_GRADIENT_BOOSTING:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Native encoding keeps missing values, which {model_type.value} cannot handle; use label encoding"
+                )
             
             # Detect task type (regression vs classification)
-            print(f"\nStep 3: Detecting task type...")
-            is_regression = cls._is_regression_task(y_train)
-            task_type = "regression" if is_regression else "classification"
-            print(f"✓ Detected task type: {task_type.upper()}")
-            print(f"  Target unique values: {y_train.nunique()}")
-            print(f"  Target dtype: {y_train.dtype}")
+            is_regression = cls._is_regression_task(split_data['y_train'])
             
-            # Initialize model based on task type
-            print(f"Step 4: Initializing {model_type.value} model for {task_type}...")
-            if model_type == ModelType.LOGISTIC_REGRESSION:
-                if is_regression:
-                    print(f"  → Using Linear Regression (continuous target)")
-                    model = cls._create_linear_regression(hyperparameters)
-                else:
-                    print(f"  → Using Logistic Regression (discrete target)")
-                    model = cls._create_logistic_regression(hyperparameters)
-            elif model_type == ModelType.DECISION_TREE:
-                if is_regression:
-                    print(f"  → Using Decision Tree Regressor (continuous target)")
-                    model = cls._create_decision_tree_regressor(hyperparameters)
-                else:
-                    print(f"  → Using Decision Tree Classifier (discrete target)")
-                    model = cls._create_decision_tree_classifier(hyperparameters)
-            else:
+            # Cross-validation scheme (folds are shared across model types)
+            search_options = hyperparameters or {}
+            cv_options = {
+                'n_splits': int(search_options.get('cv_folds', 5)),
+                'n_repeats': int(search_options.get('cv_repeats', 1)),
+                'stratify': not is_regression
+            }
+            if not 2 <= cv_options['n_splits'] <= 20 or not 1 <= cv_options['n_repeats'] <= 10:
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Unsupported model type: {model_type}"
+                    detail="cv_folds must be between 2 and 20 and cv_repeats between 1 and 10"
+                )
+            
+            parsed_options = cls._get_search_options(search_options, model_type, is_regression)
+            cache = None
+            if settings.RESULT_CACHE_ENABLED:
+                cache = cls._cache_keys(
+                    split_data, model_type, is_regression, hyperparameters, cv_options, parsed_options
+                )
+            
+            # Reuse the split's precomputed folds so every model type
+            # is compared on identical cross-validation partitions
+            cv_folds = FoldService.get_folds(split_data['split_id'], **cv_options)
+            cv = FoldService.describe(split_data['split_id'], **cv_options)
+            
+            if settings.TRAINING_SHARED_ARRAYS:
+                # Convert once to contiguous arrays that workers memory-map;
+                # trees work in float32 internally, linear models in float64.
+                # The lease keeps the files until release_training
+                dtype = 'float32' if model_type == ModelType.DECISION_TREE else 'float64'
+                lease, arrays = ArrayStore.export_split(split_data, dtype)
+                matrices = {'arrays': arrays, 'array_lease': lease}
+            else:
+                matrices = {name: split_data[name] for name in SPLIT_ARRAYS}
+            
+            return {
+                'search_options': parsed_options,
+                'cache': cache,
+                'dataset_id': dataset_id,
+                'model_type': model_type,
+                'target_column': target_column,
+                'hyperparameters': hyperparameters,
+                'is_regression': is_regression,
+                'split_id': split_data['split_id'],
+                'encoder': split_data['encoder'],
+                'categorical_features': split_data['encoder'].native_categorical_mask(),
+                **matrices,
+                'feature_names': split_data['feature_names'],
+                'cv_folds': cv_folds,
+                'cv': cv,
+                'split': {
+                    'dataset_fingerprint': split_data['dataset_fingerprint'],
+                    'target_column': split_data['target_column'],
+                    'test_size': split_data['test_size'],
+                    'random_state': split_data['random_state'],
+                    'preprocessing_plan': split_data['preprocessing_plan']
+                }
+            }
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error training model: {str(e)}"
+            )
+    
+    @classmethod
+    @estimator_threads()
+    def run_training(cls, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Tune, fit and evaluate a model from a training payload.
+        
+        This step only touches the payload, never class-level state, so it
+        is safe to run in a worker process. OpenMP estimators (boosting)
+        may use every slot granted to the job for fits made here.
+        
+        Args:
+            payload: Payload from prepare_training
+            
+        Returns:
+            Dictionary with the fitted model, metrics and best parameters
+        """
+        try:
+            model_type = payload['model_type']
+            hyperparameters = payload['hyperparameters']
+            is_regression = payload['is_regression']
+            
+            if 'arrays' in payload:
+                # Zero-copy views of the exported split
+                X_train, X_test, y_train, y_test = (
+                    attach(payload['arrays'][name]) for name in SPLIT_ARRAYS
                 )
-            print(f"✓ Model initialized")
+            else:
+                X_train, X_test, y_train, y_test = (payload[name] for name in SPLIT_ARRAYS)
+            feature_names = payload['feature_names']
+            logger.info(f"Train shape: {X_train.shape}, test shape: {X_test.shape}")
+            if sparse.issparse(X_train):
+                logger.debug(f"Sparse training matrix with {X_train.nnz} non-zero entries")
+            
+            # Detect task type (regression vs classification)
+            task_type = "regression" if is_regression else "classification"
+            logger.debug("Target: %s unique values, dtype %s", y_train.nunique(), y_train.dtype)
+            
+            # Initialize model based on task type
+            model = cls._create_model(
+                model_type, is_regression, hyperparameters, payload.get('categorical_features')
+            )
+            logger.info(f"Using {type(model).__name__} for {task_type}")
             
             # Hyperparameter tuning
-            print(f"\nStep 5: Hyperparameter tuning with GridSearchCV...")
             
             # Define parameter grids
-            param_grid = cls._get_param_grid(model_type, is_regression)
+            search_options = payload['search_options']
+            param_grid = cls._get_param_grid(model_type, is_regression, search_options['strategy'])
+            cv_info = payload['cv']
+            search_info = None
+            candidate_scores = {}
             
-            # Perform grid search only if there are parameters to tune
+            # Perform search only if there are parameters to tune
             try:
                 if param_grid:
-                    print(f"  Searching for best parameters to maximize performance...")
-                    print(f"  Parameter grid: {param_grid}")
-                    
-                    scoring = 'r2' if is_regression else 'accuracy'
-                    grid_search = GridSearchCV(
-                        estimator=model,
-                        param_grid=param_grid,
-                        cv=5,  # 5-fold cross-validation
-                        scoring=scoring,
-                        n_jobs=-1,  # Use all CPU cores
-                        verbose=0
+                    logger.info(
+                        f"Searching hyperparameters ({search_options['strategy'].value}) with "
+                        f"{cv_info['scheme']} ({cv_info['n_splits']} folds x {cv_info['n_repeats']} repeats)"
                     )
-                    
-                    grid_search.fit(X_train, y_train)
-                    
+                    logger.debug("Parameter grid: %s", param_grid)
+                
+                    scoring = 'r2' if is_regression else 'accuracy'
+                    with Metrics.span('search'):
+                        search = SearchService.search(
+                            estimator=model,
+                            param_grid=param_grid,
+                            X=X_train,
+                            y=y_train,
+                            cv_folds=payload['cv_folds'],
+                            scoring=scoring,
+                            strategy=search_options['strategy'],
+                            time_budget_s=search_options['time_budget_s'],
+                            max_fits=search_options['max_fits'],
+                            n_candidates=search_options['n_candidates'],
+                            random_state=payload['split']['random_state'],
+                            n_jobs=None,  # Slots granted by the compute scheduler
+                            score_cache=payload['cache']['scores'] if payload.get('cache') else None
+                        )
+                
                     # Get best model
-                    model = grid_search.best_estimator_
-                    best_params = grid_search.best_params_
-                    best_score = grid_search.best_score_
-                    
-                    print(f"✓ Hyperparameter tuning completed!")
-                    print(f"  Best parameters: {best_params}")
-                    print(f"  Best CV {scoring}: {best_score:.4f}")
-                    
+                    model = search['best_estimator']
+                    best_params = search['best_params']
+                    best_score = search['best_score']
+                    search_info = {
+                        'strategy': search['strategy'],
+                        'scoring': scoring,
+                        'best_score': best_score,
+                        'n_candidates': search['n_candidates'],
+                        'n_fits': search['n_fits'],
+                        'elapsed_s': search['elapsed_s'],
+                        'budget_exhausted': search['budget_exhausted'],
+                        'n_cached': search['n_cached']
+                    }
+                    # New full-data fold scores, for reuse by overlapping searches
+                    full_rows = len(payload['cv_folds'][0][0])
+                    candidate_scores = {
+                        SearchService.candidate_key(r['params']): r['fold_scores']
+                        for r in search['results']
+                        if r['n_resources'] == full_rows and not r.get('cached') and not r.get('approximate')
+                    }
+                
+                    Metrics.increment('model_fits_total', {'model_type': model_type.value}, search['n_fits'])
+                    Metrics.cache_lookup('fold_scores', hit=True, count=search['n_cached'])
+                    Metrics.cache_lookup('fold_scores', hit=False, count=search['n_candidates'] - search['n_cached'])
+                    logger.info(f"Best parameters: {best_params}")
+                    logger.info(f"Best CV {scoring}: {best_score:.4f} ({search['n_fits']} fits in {search['elapsed_s']:.1f}s)")
+                
                     # Store best params for return
                     hyperparameters = best_params
                 else:
                     # No hyperparameters to tune (e.g., Linear Regression)
-                    print(f"  No hyperparameters to tune for this model. Training directly...")
-                    model.fit(X_train, y_train)
-                    print(f"✓ Model training completed!")
-                
+                    logger.info("No hyperparameters to tune for this model; fitting directly")
+                    with Metrics.span('fit'):
+                        model.fit(X_train, y_train)
+                    Metrics.increment('model_fits_total', {'model_type': model_type.value})
+            
             except Exception as fit_error:
-                print(f"✗ HYPERPARAMETER TUNING FAILED!")
-                print(f"Error: {str(fit_error)}")
-                print(f"\nDEBUG INFO:")
-                print(f"X_train dtypes:\n{X_train.dtypes}")
-                print(f"\nX_train sample:\n{X_train.head()}")
-                print(f"y_train dtype: {y_train.dtype}")
-                print(f"y_train sample:\n{y_train.head()}")
+                logger.error(f"Hyperparameter tuning failed: {str(fit_error)}")
+                if sparse.issparse(X_train):
+                    logger.debug(f"X_train: sparse {X_train.shape}, {X_train.nnz} non-zero entries")
+                elif isinstance(X_train, np.ndarray):
+                    logger.debug(f"X_train: {X_train.dtype} array {X_train.shape}")
+                else:
+                    logger.debug("X_train dtypes:\n%s\nX_train sample:\n%s", X_train.dtypes, X_train.head())
+                logger.debug("y_train dtype: %s\ny_train sample:\n%s", y_train.dtype, y_train.head())
                 raise
+        
+            if model_type == ModelType.HIST_GRADIENT_BOOSTING and model.do_early_stopping_:
+                logger.info(f"Early stopping after {model.n_iter_} of {model.max_iter} boosting iterations")
             
             # Make predictions
-            print(f"Step 6: Making predictions on test set...")
-            y_pred = model.predict(X_test)
-            print(f"✓ Predictions completed")
+            with Metrics.span('predict'):
+                y_pred = model.predict(X_test)
+                y_score = None
+                if not is_regression and hasattr(model, 'predict_proba'):
+                    y_score = model.predict_proba(X_test)
             
             # Calculate metrics based on task type
-            print(f"Step 7: Calculating {task_type} metrics...")
+            bootstrap_rounds = payload['search_options'].get('bootstrap_rounds', 0)
+            random_state = payload['split']['random_state']
             if is_regression:
-                metrics = cls._calculate_regression_metrics(y_test, y_pred)
-                print(f"✓ Regression Metrics:")
-                print(f"  - R² Score: {metrics['r2_score']:.4f}")
-                print(f"  - RMSE: {metrics['rmse']:.4f}")
-                print(f"  - MAE: {metrics['mae']:.4f}")
+                metrics = EvaluationService.regression_metrics(
+                    y_test, y_pred, bootstrap_rounds=bootstrap_rounds, random_state=random_state
+                )
+                logger.info(f"R² {metrics['r2_score']:.4f}, RMSE {metrics['rmse']:.4f}, MAE {metrics['mae']:.4f}")
             else:
-                metrics = cls._calculate_classification_metrics(y_test, y_pred)
-                print(f"✓ Classification Metrics:")
-                print(f"  - Accuracy: {metrics['accuracy']:.4f}")
+                metrics = EvaluationService.classification_metrics(
+                    y_test, y_pred, y_score, getattr(model, 'classes_', None),
+                    bootstrap_rounds=bootstrap_rounds, random_state=random_state
+                )
+                logger.info(f"Accuracy {metrics['accuracy']:.4f}")
+                if metrics.get('roc_auc') is not None:
+                    logger.info(f"ROC AUC {metrics['roc_auc']:.4f}, PR AUC {metrics['pr_auc']:.4f}")
             
-            # Add feature importance for Decision Tree
+            # Impurity importance for Decision Tree, permutation importance otherwise
             feature_importance = None
+            importance = None
             if model_type == ModelType.DECISION_TREE:
                 feature_importance = dict(zip(
-                    X_train.columns,
+                    feature_names,
                     model.feature_importances_.tolist()
                 ))
+            elif settings.TRAINING_PERMUTATION_IMPORTANCE:
+                importance = ImportanceService.permutation_importance(
+                    model, X_test, y_test, is_regression, feature_names,
+                    n_repeats=settings.IMPORTANCE_REPEATS,
+                    top_k=settings.IMPORTANCE_TOP_K or None,
+                    random_state=random_state
+                )
+                feature_importance = {item['feature']: item['mean'] for item in importance['importances']}
+                logger.info(f"Permutation importance computed in {importance['elapsed_s']:.1f}s")
             
-            # Generate model ID
-            model_id = f"{dataset_id}_{model_type.value}"
-            
-            # Store model and results
-            cls._models[model_id] = {
+            return {
                 'model': model,
-                'model_type': model_type.value,
-                'dataset_id': dataset_id,
                 'metrics': metrics,
                 'feature_importance': feature_importance,
-                'hyperparameters': hyperparameters or {}
-            }
-            
-            print(f"✓ Model stored with ID: {model_id}")
-            print(f"{'='*60}")
-            print(f"TRAINING MODEL - Success!")
-            print(f"{'='*60}\n")
-            
-            return {
-                'model_id': model_id,
-                'model_type': model_type.value,
-                'accuracy': metrics['accuracy'],
-                'precision': metrics.get('precision'),
-                'recall': metrics.get('recall'),
-                'f1_score': metrics.get('f1_score'),
-                'confusion_matrix': metrics['confusion_matrix'],
-                'class_labels': metrics['class_labels'],
-                'feature_importance': feature_importance
+                'importance': importance,
+                'hyperparameters': hyperparameters or {},
+                'search': search_info,
+                'candidate_scores': candidate_scores
             }
             
         except HTTPException:
@@ -230,17 +382,511 @@ class ModelService:
             )
     
     @classmethod
-    def _get_param_grid(cls, model_type: ModelType, is_regression: bool) -> Dict[str, list]:
+    def release_training(cls, payload: Dict[str, Any]):
+        """Release the exported split matrices a training payload leases."""
+        ArrayStore.release(payload.get('array_lease'))
+    
+    @classmethod
+    def cached_training_result(cls, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a stored result for an identical training run.
+        
+        Args:
+            payload: Payload from prepare_training
+            
+        Returns:
+            Stored run_training result, or None on a miss
+        """
+        if not payload.get('cache'):
+            return None
+        result = ResultCache.load_result(payload['cache']['result_key'])
+        Metrics.cache_lookup('training_result', hit=result is not None)
+        if result is not None:
+            logger.info(f"Reusing cached training result {payload['cache']['result_key']}")
+            result['cached'] = True
+        return result
+    
+    @classmethod
+    def store_training_result(
+        cls,
+        payload: Dict[str, Any],
+        result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Store a fitted model and build the training response.
+        
+        Args:
+            payload: Payload from prepare_training
+            result: Result from run_training
+            
+        Returns:
+            Dictionary with training results and metrics
+        """
+        dataset_id = payload['dataset_id']
+        model_type = payload['model_type']
+        metrics = result['metrics']
+        cached = result.pop('cached', False)
+        candidate_scores = result.pop('candidate_scores', {})
+        
+        if payload.get('cache') and not cached:
+            ResultCache.store_result(payload['cache']['result_key'], result)
+            ResultCache.store_scores(payload['cache']['score_context'], candidate_scores)
+        
+        # Model name; every training run adds a new version under it
+        model_id = f"{dataset_id}_{model_type.value}"
+        
+        # Persist model, preprocessing state, results and lineage
+        record = ModelRegistry.register(
+            model_id,
+            estimator=result['model'],
+            encoder=payload.get('encoder'),
+            metadata={
+                'model_type': model_type.value,
+                'dataset_id': dataset_id,
+                'target_column': payload['target_column'],
+                'is_regression': payload['is_regression'],
+                'feature_names': list(payload['feature_names']),
+                'metrics': metrics,
+                'feature_importance': result['feature_importance'],
+                'hyperparameters': result['hyperparameters'],
+                'search': result['search'],
+                'split_id': payload['split_id'],
+                'cv': payload['cv'],
+                'split': payload['split'],
+                'cached': cached
+            }
+        )
+        
+        if settings.MODEL_EXPORT_COMPILED:
+            cls.export_model(record['model_id'], estimator=result['model'], required=False)
+        if result.get('importance'):
+            ImportanceService.store(record['model_id'], result['importance'])
+        
+        logger.info(f"Model stored with ID: {record['model_id']}")
+        
+        return {
+            'model_id': model_id,
+            'version': record['version'],
+            'model_type': model_type.value,
+            'split_id': payload['split_id'],
+            'accuracy': metrics['accuracy'],
+            'cv_score': result['search']['best_score'] if result['search'] else None,
+            'precision': metrics.get('precision'),
+            'recall': metrics.get('recall'),
+            'f1_score': metrics.get('f1_score'),
+            'roc_auc': metrics.get('roc_auc'),
+            'pr_auc': metrics.get('pr_auc'),
+            'confidence_intervals': metrics.get('confidence_intervals'),
+            'confusion_matrix': metrics['confusion_matrix'],
+            'class_labels': metrics['class_labels'],
+            'feature_importance': result['feature_importance'],
+            'search': result['search'],
+            'cached': cached
+        }
+    
+    @classmethod
+    def prepare_leaderboard(
+        cls,
+        dataset_id: str,
+        target_column: str,
+        model_types: Optional[List[ModelType]] = None,
+        hyperparameters: Optional[Dict[str, Any]] = None,
+        split_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build training payloads for several model types on one split.
+        
+        The split is resolved once and every model type gets the same
+        split, matrices and CV folds, so their scores are comparable.
+        
+        Args:
+            dataset_id: Dataset identifier
+            target_column: Name of the target column
+            model_types: Model types to compare (defaults to all)
+            hyperparameters: Search options shared by every model type
+            split_id: Optional split to train on
+            
+        Returns:
+            Leaderboard payload with one training payload per model type
+            
+        Raises:
+            HTTPException: If no model type can be trained on the split
+        """
+        model_types = list(dict.fromkeys(ModelType(t) for t in (model_types or list(ModelType))))
+        logger.info(f"Leaderboard of {[t.value for t in model_types]} on dataset {dataset_id}")
+        
+        split_data = cls._resolve_split(dataset_id, target_column, split_id)
+        families = {}
+        errors = {}
+        for model_type in model_types:
+            try:
+                families[model_type.value] = cls.prepare_training(
+                    dataset_id, model_type, target_column, hyperparameters, split_data['split_id']
+                )
+            except HTTPException as e:
+                if e.status_code >= 500:
+                    cls.release_leaderboard({'families': families})
+                    raise
+                logger.warning(f"Skipping {model_type.value}: {e.detail}")
+                errors[model_type.value] = str(e.detail)
+        if not families:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No model type can be trained on this split: {errors}"
+            )
+        
+        return {
+            'dataset_id': dataset_id,
+            'split_id': split_data['split_id'],
+            'families': families,
+            'errors': errors
+        }
+    
+    @classmethod
+    def release_leaderboard(cls, payload: Dict[str, Any]):
+        """Release the exported matrices of every family of a leaderboard payload."""
+        for family in payload['families'].values():
+            cls.release_training(family)
+    
+    @classmethod
+    def run_leaderboard(cls, payload: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Train every model type of a leaderboard payload.
+        
+        Model types run in parallel, one per granted compute slot, each
+        with a sequential search; with a single slot they run one after
+        another and each search may use it.
+        
+        Args:
+            payload: Payload from prepare_leaderboard
+            
+        Returns:
+            Model type to training outcome
+        """
+        families = {
+            # Encoders are only needed to store results, not to train
+            name: {key: value for key, value in family.items() if key != 'encoder'}
+            for name, family in payload['families'].items()
+        }
+        n_workers = min(granted_workers(), len(families))
+        if n_workers > 1:
+            outcomes = Parallel(n_jobs=n_workers)(
+                delayed(cls._run_leaderboard_entry)(family) for family in families.values()
+            )
+        else:
+            outcomes = [cls._run_leaderboard_entry(family) for family in families.values()]
+        return dict(zip(families, outcomes))
+    
+    @classmethod
+    def cached_leaderboard_result(cls, payload: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Look up stored results for every model type of a leaderboard.
+        
+        Args:
+            payload: Payload from prepare_leaderboard
+            
+        Returns:
+            run_leaderboard-style outcomes, or None unless all are cached
+        """
+        outcomes = {}
+        for name, family in payload['families'].items():
+            started = time.perf_counter()
+            result = cls.cached_training_result(family)
+            if result is None:
+                return None
+            outcomes[name] = {'result': result, 'fit_time_s': time.perf_counter() - started}
+        return outcomes
+    
+    @classmethod
+    def _run_leaderboard_entry(cls, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Train one model type, timing it and capturing its failure."""
+        started = time.perf_counter()
+        try:
+            result = cls.cached_training_result(payload) or cls.run_training(payload)
+        except HTTPException as e:
+            return {'error': str(e.detail), 'fit_time_s': time.perf_counter() - started}
+        return {'result': result, 'fit_time_s': time.perf_counter() - started}
+    
+    @classmethod
+    def store_leaderboard_result(
+        cls,
+        payload: Dict[str, Any],
+        result: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Register every trained model and rank them.
+        
+        Models are ranked by best CV score (model types without a search
+        space fall back to their test score), then by test score.
+        
+        Args:
+            payload: Payload from prepare_leaderboard
+            result: Result from run_leaderboard
+            
+        Returns:
+            Dictionary with the ranked leaderboard
+        """
+        entries = []
+        failed = [
+            {'model_type': model_type, 'error': error}
+            for model_type, error in payload['errors'].items()
+        ]
+        for model_type, outcome in result.items():
+            if 'error' in outcome:
+                failed.append({
+                    'model_type': model_type,
+                    'error': outcome['error'],
+                    'fit_time_s': outcome['fit_time_s']
+                })
+                continue
+            trained = outcome['result']
+            stored = cls.store_training_result(payload['families'][model_type], trained)
+            search = trained['search']
+            entries.append({
+                'model_type': model_type,
+                'model_id': f"{stored['model_id']}@{stored['version']}",
+                'version': stored['version'],
+                'cv_score': stored['cv_score'],
+                'test_score': stored['accuracy'],
+                'metrics': trained['metrics'],
+                'hyperparameters': trained['hyperparameters'],
+                'fit_time_s': outcome['fit_time_s'],
+                'n_fits': search['n_fits'] if search else 1,
+                'cached': stored['cached']
+            })
+        
+        entries.sort(
+            key=lambda e: (
+                e['cv_score'] if e['cv_score'] is not None else e['test_score'],
+                e['test_score']
+            ),
+            reverse=True
+        )
+        for rank, entry in enumerate(entries, start=1):
+            entry['rank'] = rank
+        
+        first = next(iter(payload['families'].values()))
+        logger.info(f"Leaderboard: {[(e['model_type'], round(e['test_score'], 4)) for e in entries]}")
+        return {
+            'dataset_id': payload['dataset_id'],
+            'split_id': payload['split_id'],
+            'scoring': 'r2' if first['is_regression'] else 'accuracy',
+            'cv': first['cv'],
+            'best_model_id': entries[0]['model_id'] if entries else None,
+            'leaderboard': entries + failed
+        }
+    
+    @classmethod
+    def _resolve_split(
+        cls,
+        dataset_id: str,
+        target_column: str,
+        split_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Find the split a model should be trained on.
+        
+        An explicit split ID is used as-is. Otherwise the latest split for
+        the dataset is re-requested with its own settings (a cache hit unless
+        the dataset changed since), or a default split is performed.
+        
+        Args:
+            dataset_id: Dataset identifier
+            target_column: Name of the target column
+            split_id: Optional split identifier
+            
+        Returns:
+            Split data dictionary
+        """
+        if split_id is not None:
+            split_data = SplitService.get_split(split_id)
+            if split_data['dataset_id'] != dataset_id or split_data['target_column'] != target_column:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Split {split_id} does not belong to dataset {dataset_id} with target '{target_column}'"
+                )
+            return split_data
+        
+        split_kwargs = {
+            'test_size': settings.DEFAULT_TEST_SIZE,
+            'random_state': settings.RANDOM_STATE
+        }
+        try:
+            latest = SplitService.get_split_data(dataset_id)
+            if latest['target_column'] == target_column:
+                split_kwargs = {
+                    'test_size': latest['test_size'],
+                    'random_state': latest['random_state'],
+                    'categorical_encoding': latest['categorical_encoding'],
+                    'hash_n_features': latest['preprocessing_plan'].get('hash_n_features', 1024)
+                }
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+            logger.info("No split data found; performing automatic split")
+        
+        resolved_id, _, _ = SplitService.perform_split(
+            dataset_id=dataset_id,
+            target_column=target_column,
+            **split_kwargs
+        )
+        return SplitService.get_split(resolved_id)
+    
+    @classmethod
+    def _get_search_options(
+        cls,
+        options: Dict[str, Any],
+        model_type: ModelType,
+        is_regression: bool
+    ) -> Dict[str, Any]:
+        """
+        Parse search options from the hyperparameters dictionary.
+        
+        Args:
+            options: Request hyperparameters
+            model_type: Type of model
+            is_regression: Whether this is a regression task
+            
+        Returns:
+            Dictionary with strategy, time_budget_s, max_fits, n_candidates
+            and bootstrap_rounds
+            
+        Raises:
+            HTTPException: If an option is invalid
+        """
+        try:
+            parsed = {
+                'strategy': SearchStrategy(
+                    options.get('search_strategy') or cls._default_search_strategy(model_type, is_regression)
+                ),
+                'time_budget_s': options.get('time_budget_s'),
+                'max_fits': options.get('max_fits'),
+                'n_candidates': options.get('n_candidates'),
+                'bootstrap_rounds': int(options.get('bootstrap_rounds', settings.EVALUATION_BOOTSTRAP_ROUNDS))
+            }
+            if not 0 <= parsed['bootstrap_rounds'] <= settings.EVALUATION_MAX_BOOTSTRAP_ROUNDS:
+                raise ValueError(f"bootstrap_rounds must be between 0 and {settings.EVALUATION_MAX_BOOTSTRAP_ROUNDS}")
+            for key, cast in (('time_budget_s', float), ('max_fits', int), ('n_candidates', int)):
+                if parsed[key] is not None:
+                    parsed[key] = cast(parsed[key])
+                    if parsed[key] <= 0:
+                        raise ValueError(f"{key} must be positive")
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid search options: {str(e)}. "
+                       f"search_strategy must be one of {[s.value for s in SearchStrategy]}"
+            )
+        if parsed['strategy'] == SearchStrategy.PATH and (
+            model_type != ModelType.LOGISTIC_REGRESSION or is_regression
+        ):
+            raise HTTPException(
+                status_code=400,
+                detail="The path search strategy only supports logistic regression classification"
+            )
+        if parsed['strategy'] == SearchStrategy.PRUNING and model_type != ModelType.DECISION_TREE:
+            raise HTTPException(
+                status_code=400,
+                detail="The pruning search strategy only supports decision trees"
+            )
+        return parsed
+    
+    @classmethod
+    def _cache_keys(
+        cls,
+        split_data: Dict[str, Any],
+        model_type: ModelType,
+        is_regression: bool,
+        hyperparameters: Optional[Dict[str, Any]],
+        cv_options: Dict[str, Any],
+        search_options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Build result-cache keys for a training run.
+        
+        The score context covers everything a candidate's fold scores depend
+        on (data, folds, base estimator, scoring); the result key adds the
+        search space and options.
+        
+        Args:
+            split_data: Split entry
+            model_type: Type of model
+            is_regression: Whether this is a regression task
+            hyperparameters: Request hyperparameters
+            cv_options: Fold scheme options
+            search_options: Parsed search options
+            
+        Returns:
+            Dictionary with result_key, score_context and the cached scores
+        """
+        estimator = cls._create_model(
+            model_type, is_regression, hyperparameters, split_data['encoder'].native_categorical_mask()
+        )
+        score_parts = {
+            'split': ResultCache.fingerprint_split(split_data),
+            'preprocessing_plan': split_data['preprocessing_plan'],
+            'cv': FoldService.describe(split_data['split_id'], **cv_options),
+            'model_type': model_type.value,
+            'estimator': type(estimator).__name__,
+            'estimator_params': estimator.get_params(),
+            'scoring': 'r2' if is_regression else 'accuracy'
+        }
+        score_context = ResultCache.key(score_parts)
+        result_key = ResultCache.key({
+            **score_parts,
+            'search_space': cls._get_param_grid(model_type, is_regression, search_options['strategy']),
+            'search_options': search_options,
+            'seed': split_data['random_state']
+        })
+        return {
+            'result_key': result_key,
+            'score_context': score_context,
+            'scores': ResultCache.load_scores(score_context)
+        }
+    
+    @classmethod
+    def _default_search_strategy(cls, model_type: ModelType, is_regression: bool) -> SearchStrategy:
+        """
+        Pick the tuner used when the request does not choose one.
+        
+        Args:
+            model_type: Type of model
+            is_regression: Whether this is a regression task
+            
+        Returns:
+            Default search strategy
+        """
+        if model_type == ModelType.LOGISTIC_REGRESSION and not is_regression:
+            # Warm-started C path: one path per fold instead of a full grid
+            return SearchStrategy.PATH
+        if model_type == ModelType.HIST_GRADIENT_BOOSTING:
+            # Boosting fits are the slowest: weed out candidates on subsamples
+            return SearchStrategy.HALVING
+        return SearchStrategy.GRID
+    
+    @classmethod
+    def _get_param_grid(
+        cls,
+        model_type: ModelType,
+        is_regression: bool,
+        strategy: Optional[SearchStrategy] = None
+    ) -> Dict[str, list]:
         """
         Get hyperparameter grid for tuning.
         
         Args:
             model_type: Type of model
             is_regression: Whether this is a regression task
+            strategy: Search strategy; the pruning tuner gets the tree grid
+                with splitter and max_features pinned to the values it supports
             
         Returns:
             Dictionary of parameter ranges to search
         """
+        if model_type == ModelType.DECISION_TREE and strategy == SearchStrategy.PRUNING:
+            grid = cls._get_param_grid(model_type, is_regression)
+            return {**grid, **{name: [value] for name, value in PRUNING_FIXED.items()}}
+        
         if model_type == ModelType.LOGISTIC_REGRESSION:
             if is_regression:
                 # Linear Regression (no hyperparameters to tune)
@@ -275,8 +921,76 @@ class ModelService:
                     'splitter': ['best', 'random']
                 }
         
+        elif model_type == ModelType.SGD_LINEAR:
+            # Scaled SGD linear model (parameters of the pipeline's model step)
+            return {
+                'model__alpha': [0.00001, 0.0001, 0.001, 0.01],
+                'model__penalty': ['l2', 'elasticnet']
+            }
+        
+        elif model_type == ModelType.NAIVE_BAYES:
+            return {
+                'var_smoothing': [1e-9, 1e-8, 1e-7, 1e-6, 1e-5]
+            }
+        
+        elif model_type == ModelType.HIST_GRADIENT_BOOSTING:
+            return {
+                'learning_rate': [0.05, 0.1, 0.2],
+                'max_leaf_nodes': [15, 31, 63],
+                'min_samples_leaf': [10, 20, 40],
+                'l2_regularization': [0.0, 1.0]
+            }
+        
         return {}
     
+    @classmethod
+    def _create_model(
+        cls,
+        model_type: ModelType,
+        is_regression: bool,
+        hyperparameters: Optional[Dict[str, Any]],
+        categorical_features: Optional[List[bool]] = None
+    ):
+        """
+        Create the unfitted estimator for a model type and task.
+        
+        Args:
+            model_type: Type of model
+            is_regression: Whether this is a regression task
+            hyperparameters: Optional model hyperparameters
+            categorical_features: Natively encoded categorical column flags
+                (used by models with built-in categorical support)
+            
+        Returns:
+            scikit-learn estimator
+            
+        Raises:
+            HTTPException: If the model type is not supported
+        """
+        if model_type == ModelType.LOGISTIC_REGRESSION:
+            if is_regression:
+                return cls._create_linear_regression(hyperparameters)
+            return cls._create_logistic_regression(hyperparameters)
+        elif model_type == ModelType.DECISION_TREE:
+            if is_regression:
+                return cls._create_decision_tree_regressor(hyperparameters)
+            return cls._create_decision_tree_classifier(hyperparameters)
+        elif model_type == ModelType.SGD_LINEAR:
+            return cls._create_sgd_linear(is_regression, hyperparameters)
+        elif model_type == ModelType.HIST_GRADIENT_BOOSTING:
+            return cls._create_hist_gradient_boosting(is_regression, hyperparameters, categorical_features)
+        elif model_type == ModelType.NAIVE_BAYES:
+            if is_regression:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Naive Bayes only supports classification targets"
+                )
+            return cls._create_naive_bayes(hyperparameters)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported model type: {model_type}"
+        )
+    
     @classmethod
     def _create_logistic_regression(
         cls,
@@ -326,6 +1040,71 @@ class ModelService:
             random_state=params.get('random_state', 42)
         )
     
+    @classmethod
+    def _create_sgd_linear(
+        cls,
+        is_regression: bool,
+        hyperparameters: Optional[Dict[str, Any]]
+    ) -> Pipeline:
+        """
+        Create a scaled SGD linear model.
+        
+        SGD is sensitive to feature scale, so features are standardized
+        first (without centering, which keeps hashed matrices sparse).
+        """
+        params = hyperparameters or {}
+        common = {
+            'alpha': params.get('alpha', 0.0001),
+            'penalty': params.get('penalty', 'l2'),
+            'max_iter': params.get('max_iter', 1000),
+            'tol': 1e-3,
+            'random_state': params.get('random_state', 42)
+        }
+        if is_regression:
+            model = SGDRegressor(**common)
+        else:
+            model = SGDClassifier(loss='log_loss', **common)
+        return Pipeline([('scale', StandardScaler(with_mean=False)), ('model', model)])
+    
+    @classmethod
+    def _create_hist_gradient_boosting(
+        cls,
+        is_regression: bool,
+        hyperparameters: Optional[Dict[str, Any]],
+        categorical_features: Optional[List[bool]] = None
+    ):
+        """
+        Create Histogram Gradient Boosting model.
+        
+        Boosting stops once the score on a held-out validation fraction of
+        the training rows stops improving, so max_iter is only a ceiling.
+        Missing values are handled natively; columns flagged in
+        categorical_features (native encoding) are split as categories.
+        """
+        params = hyperparameters or {}
+        estimator_class = HistGradientBoostingRegressor if is_regression else HistGradientBoostingClassifier
+        return estimator_class(
+            learning_rate=params.get('learning_rate', 0.1),
+            max_iter=params.get('max_iter', 500),
+            max_leaf_nodes=params.get('max_leaf_nodes', 31),
+            min_samples_leaf=params.get('min_samples_leaf', 20),
+            l2_regularization=params.get('l2_regularization', 0.0),
+            categorical_features=categorical_features if categorical_features and any(categorical_features) else None,
+            early_stopping=params.get('early_stopping', True),
+            validation_fraction=params.get('validation_fraction', 0.1),
+            n_iter_no_change=params.get('n_iter_no_change', 10),
+            random_state=params.get('random_state', 42)
+        )
+    
+    @classmethod
+    def _create_naive_bayes(
+        cls,
+        hyperparameters: Optional[Dict[str, Any]]
+    ) -> GaussianNB:
+        """Create Gaussian Naive Bayes model."""
+        params = hyperparameters or {}
+        return GaussianNB(var_smoothing=params.get('var_smoothing', 1e-9))
+    
     @classmethod
     def _is_regression_task(cls, y: pd.Series) -> bool:
         """
@@ -353,108 +1132,100 @@ class ModelService:
         return False
     
     @classmethod
-    def _calculate_classification_metrics(
-        cls,
-        y_true: np.ndarray,
-        y_pred: np.ndarray
-    ) -> Dict[str, Any]:
-        """Calculate classification metrics."""
-        metrics = {
-            'accuracy': float(accuracy_score(y_true, y_pred)),
-            'confusion_matrix': confusion_matrix(y_true, y_pred).tolist(),
-            'class_labels': [str(label) for label in sorted(np.unique(y_true))]
-        }
+    def get_model(cls, model_id: str) -> Dict[str, Any]:
+        """
+        Get a trained model's results and lineage.
         
-        # Calculate precision, recall, f1 (handle binary and multiclass)
-        try:
-            metrics['precision'] = float(precision_score(y_true, y_pred, average='binary'))
-            metrics['recall'] = float(recall_score(y_true, y_pred, average='binary'))
-            metrics['f1_score'] = float(f1_score(y_true, y_pred, average='binary'))
-        except:
-            metrics['precision'] = float(precision_score(y_true, y_pred, average='weighted'))
-            metrics['recall'] = float(recall_score(y_true, y_pred, average='weighted'))
-            metrics['f1_score'] = float(f1_score(y_true, y_pred, average='weighted'))
-        
-        return metrics
-    
-    @classmethod
-    def _calculate_regression_metrics(
-        cls,
-        y_true: np.ndarray,
-        y_pred: np.ndarray
-    ) -> Dict[str, Any]:
-        """Calculate regression metrics."""
-        mse = mean_squared_error(y_true, y_pred)
-        rmse = np.sqrt(mse)
-        mae = mean_absolute_error(y_true, y_pred)
-        r2 = r2_score(y_true, y_pred)
+        Only metadata is read; the estimator stays on disk.
         
-        return {
-            'accuracy': float(r2),  # Use R² as "accuracy" for consistency
-            'r2_score': float(r2),
-            'mse': float(mse),
-            'rmse': float(rmse),
-            'mae': float(mae),
-            'confusion_matrix': None,
-            'class_labels': None,
-            'precision': None,
-            'recall': None,
-            'f1_score': None
-        }
+        Args:
+            model_id: Model name (latest version) or name@version
+            
+        Returns:
+            Model metadata dictionary
+            
+        Raises:
+            HTTPException: If model not found
+        """
+        return ModelRegistry.get_metadata(model_id)
     
     @classmethod
-    def _calculate_metrics(
-        cls,
-        y_true: np.ndarray,
-        y_pred: np.ndarray
-    ) -> Dict[str, Any]:
+    def load_model(cls, model_id: str):
         """
-        Calculate evaluation metrics.
+        Load a trained model's fitted estimator.
         
         Args:
-            y_true: True labels
-            y_pred: Predicted labels
+            model_id: Model name (latest version) or name@version
             
         Returns:
-            Dictionary of metrics
+            Fitted estimator
+            
+        Raises:
+            HTTPException: If model not found
         """
-        metrics = {
-            'accuracy': float(accuracy_score(y_true, y_pred)),
-            'confusion_matrix': confusion_matrix(y_true, y_pred).tolist(),
-            'class_labels': [str(label) for label in sorted(np.unique(y_true))]
-        }
-        
-        # Calculate precision, recall, f1 (handle binary and multiclass)
-        try:
-            # Try binary first
-            metrics['precision'] = float(precision_score(y_true, y_pred, average='binary'))
-            metrics['recall'] = float(recall_score(y_true, y_pred, average='binary'))
-            metrics['f1_score'] = float(f1_score(y_true, y_pred, average='binary'))
-        except:
-            # Fall back to weighted average for multiclass
-            metrics['precision'] = float(precision_score(y_true, y_pred, average='weighted'))
-            metrics['recall'] = float(recall_score(y_true, y_pred, average='weighted'))
-            metrics['f1_score'] = float(f1_score(y_true, y_pred, average='weighted'))
-        
-        return metrics
+        return ModelRegistry.load_estimator(model_id)
     
     @classmethod
-    def get_model(cls, model_id: str) -> Dict[str, Any]:
+    def export_model(
+        cls,
+        model_id: str,
+        estimator=None,
+        required: bool = True
+    ) -> Optional[Dict[str, Any]]:
         """
-        Get trained model and its results.
+        Compile a model version into its array form and store it.
+        
+        Decision trees become flat node arrays and linear models weight
+        vectors; predictions then skip sklearn's per-call validation and
+        dispatch while returning identical results.
         
         Args:
-            model_id: Model identifier
+            model_id: Model name (latest version) or name@version
+            estimator: Fitted estimator of that version (loaded if omitted)
+            required: Raise instead of returning None if the model type has
+                no compiled form
             
         Returns:
-            Model data dictionary
+            Summary of the compiled form, or None if not compilable
             
         Raises:
-            HTTPException: If model not found
+            HTTPException: If the model is not found or cannot be compiled
         """
-        if model_id not in cls._models:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Model not found: {model_id}"
-            )
-        return cls._models[model_id]
+        if estimator is None:
+            estimator = ModelRegistry.load_estimator(model_id)
+        try:
+            compiled = compile_estimator(estimator)
+        except ValueError as e:
+            compiled = None
+            reason = str(e)
+        else:
+            reason = f"{type(estimator).__name__} has no compiled form"
+        if compiled is None:
+            if required:
+                raise HTTPException(status_code=400, detail=f"Model cannot be compiled: {reason}")
+            return None
+        
+        summary = compiled.summary()
+        ModelRegistry.add_artifact(model_id, 'compiled', compiled, {'compiled': summary})
+        logger.info(f"Compiled model ({summary['format']}, {summary['size_bytes']} bytes)")
+        return summary
+
+
+# Training runs as a background job: the split is resolved in the API
+# process, the search and fit run in a worker process
+JobService.register_handler(
+    'train',
+    prepare=lambda request: ModelService.prepare_training(**request),
+    run=ModelService.run_training,
+    finish=ModelService.store_training_result,
+    cached=ModelService.cached_training_result,
+    release=ModelService.release_training
+)
+JobService.register_handler(
+    'leaderboard',
+    prepare=lambda request: ModelService.prepare_leaderboard(**request),
+    run=ModelService.run_leaderboard,
+    finish=ModelService.store_leaderboard_result,
+    cached=ModelService.cached_leaderboard_result,
+    release=ModelService.release_leaderboard
+)
@@ -0,0 +1,208 @@
+"""
+Low-latency online prediction with request micro-batching.
+"""
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+from collections import Counter, OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+
+from app.services.executor import ServiceExecutor
+from app.services.model_registry import ModelRegistry
+from app.services.prediction_service import PredictionService
+from app.core.config import settings
+
+
+class MicroBatcher:
+    """
+    Request batcher for one resident model version.
+
+    The first request to arrive opens a window of ONLINE_BATCH_WINDOW_MS;
+    every request submitted before it closes (or until ONLINE_MAX_BATCH_SIZE
+    rows are waiting) is encoded and predicted in one vectorized call, and
+    each caller gets its own row back. At most one batch runs at a time, so
+    requests arriving during a prediction form the next batch immediately
+    instead of waiting for another window.
+    """
+
+    def __init__(self, loaded: Dict[str, Any]):
+        self.loaded = loaded
+        self.model_id = loaded['metadata']['model_id']
+        self.loop = asyncio.get_running_loop()
+        self._pending: List[Tuple[Dict[str, Any], bool, float, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running = False
+        self._tasks = set()
+        self.requests = 0
+        self.batch_sizes: Counter = Counter()
+        self.latencies = deque(maxlen=settings.ONLINE_STATS_WINDOW)
+
+    async def submit(self, features: Dict[str, Any], include_proba: bool = False) -> Dict[str, Any]:
+        """
+        Queue one row and wait for its batch to be predicted.
+
+        Args:
+            features: Raw input row
+            include_proba: Return class probabilities
+
+        Returns:
+            Dictionary with prediction, probabilities, batch_size and latency_ms
+        """
+        future = self.loop.create_future()
+        self._pending.append((features, include_proba, time.perf_counter(), future))
+        if len(self._pending) >= settings.ONLINE_MAX_BATCH_SIZE:
+            self._flush()
+        elif self._timer is None and not self._running:
+            self._timer = self.loop.call_later(settings.ONLINE_BATCH_WINDOW_MS / 1000, self._flush)
+        return await future
+
+    def _flush(self):
+        """Start predicting the waiting requests unless a batch is already running."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._running or not self._pending:
+            return
+        batch = self._pending[:settings.ONLINE_MAX_BATCH_SIZE]
+        del self._pending[:settings.ONLINE_MAX_BATCH_SIZE]
+        self._running = True
+        task = self.loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], bool, float, asyncio.Future]]):
+        """Predict one batch in the service pool and resolve its futures."""
+        try:
+            include_proba = any(entry[1] for entry in batch)
+            try:
+                outcomes = await ServiceExecutor.run(self._predict, [entry[0] for entry in batch], include_proba)
+            except HTTPException:
+                # One malformed row must not fail its neighbours: retry row by row
+                outcomes = []
+                for entry in batch:
+                    try:
+                        outcomes.extend(await ServiceExecutor.run(self._predict, [entry[0]], include_proba))
+                    except HTTPException as e:
+                        outcomes.append(e)
+            except Exception as e:
+                outcomes = [e] * len(batch)
+
+            finished = time.perf_counter()
+            self.requests += len(batch)
+            self.batch_sizes[len(batch)] += 1
+            for (_, wants_proba, started, future), outcome in zip(batch, outcomes):
+                latency_ms = (finished - started) * 1000
+                self.latencies.append(latency_ms)
+                if future.done():
+                    # The client went away while waiting
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                    continue
+                future.set_result({
+                    'prediction': outcome[0],
+                    'probabilities': outcome[1] if wants_proba else None,
+                    'batch_size': len(batch),
+                    'latency_ms': latency_ms
+                })
+        finally:
+            self._running = False
+            # Requests that queued up meanwhile have already waited long enough
+            self._flush()
+
+    def _predict(self, rows: List[Dict[str, Any]], include_proba: bool) -> List[Tuple[Any, Optional[Dict[str, float]]]]:
+        """Vectorized prediction of a batch of rows."""
+        result = PredictionService.predict_frame(self.loaded, pd.DataFrame.from_records(rows), include_proba)
+        predictions = result['prediction'].tolist()
+        proba_columns = [col for col in result.columns if col.startswith('proba_')]
+        if not proba_columns:
+            return [(prediction, None) for prediction in predictions]
+        labels = [col[len('proba_'):] for col in proba_columns]
+        proba = result[proba_columns].to_numpy()
+        return [
+            (prediction, dict(zip(labels, proba[i].tolist())))
+            for i, prediction in enumerate(predictions)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Latency percentiles and batch-size distribution."""
+        latencies = np.fromiter(self.latencies, dtype=float)
+        batches = sum(self.batch_sizes.values())
+        return {
+            'model_id': self.model_id,
+            'requests': self.requests,
+            'batches': batches,
+            'mean_batch_size': self.requests / batches if batches else 0.0,
+            'latency_ms': {
+                'p50': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+                'p99': float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+                'mean': float(latencies.mean()) if len(latencies) else 0.0
+            },
+            'batch_sizes': dict(sorted(self.batch_sizes.items()))
+        }
+
+
+class OnlinePredictionService:
+    """
+    Service for single-row predictions served through micro-batches.
+
+    Each model version that receives online traffic keeps its estimator,
+    encoder and batcher resident; the MODEL_CACHE_SIZE most recently used
+    versions are kept.
+    """
+
+    _batchers: "OrderedDict[str, MicroBatcher]" = OrderedDict()
+
+    @classmethod
+    async def predict(cls, model_id: str, features: Dict[str, Any], include_proba: bool = False) -> Dict[str, Any]:
+        """
+        Predict one row.
+
+        Args:
+            model_id: Model name (latest version) or name@version
+            features: Raw input row
+            include_proba: Return class probabilities
+
+        Returns:
+            Dictionary with model_id, prediction, probabilities, batch_size
+            and latency_ms
+        """
+        batcher = await cls._batcher(model_id)
+        result = await batcher.submit(features, include_proba)
+        return {'model_id': batcher.model_id, **result}
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Micro-batching statistics of every resident model version.
+
+        Returns:
+            Dictionary with batching settings and per-model statistics
+        """
+        return {
+            'window_ms': settings.ONLINE_BATCH_WINDOW_MS,
+            'max_batch_size': settings.ONLINE_MAX_BATCH_SIZE,
+            'models': [batcher.stats() for batcher in cls._batchers.values()]
+        }
+
+    @classmethod
+    async def _batcher(cls, model_id: str) -> MicroBatcher:
+        """Get (or load) the batcher of the resolved model version."""
+        # Resolving may read metadata.json; only a cache miss leaves the loop
+        version_id = ModelRegistry.cached_version_id(model_id)
+        if version_id is None:
+            version_id = (await ServiceExecutor.run(ModelRegistry.get_metadata, model_id))['model_id']
+        batcher = cls._batchers.get(version_id)
+        if batcher is None or batcher.loop is not asyncio.get_running_loop():
+            loaded = await ServiceExecutor.run(PredictionService.load, version_id)
+            # Another request may have loaded it while this one waited
+            batcher = cls._batchers.get(version_id)
+            if batcher is None or batcher.loop is not asyncio.get_running_loop():
+                batcher = MicroBatcher(loaded)
+                cls._batchers[version_id] = batcher
+        cls._batchers.move_to_end(version_id)
+        while len(cls._batchers) > settings.MODEL_CACHE_SIZE:
+            cls._batchers.popitem(last=False)
+        return batcher
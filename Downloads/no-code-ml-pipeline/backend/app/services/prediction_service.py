@@ -0,0 +1,195 @@
+"""
+Batch prediction service.
+"""
+import numpy as np
+import pandas as pd
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+from fastapi import HTTPException
+
+from app.services.model_registry import ModelRegistry
+from app.core.config import settings
+from app.core.metrics import Metrics
+
+
+class PredictionService:
+    """
+    Service for batch predictions with registered models.
+
+    Input rows use the columns of the training dataset (as it was when the
+    split was made; an extra target column is ignored). They go through the
+    model's stored FeatureEncoder and the estimator one fixed-size chunk at
+    a time, so memory stays bounded by the chunk size whatever the input
+    length.
+    """
+
+    @classmethod
+    def load(cls, model_id: str) -> Dict[str, Any]:
+        """
+        Load everything needed to predict with a model version.
+
+        Args:
+            model_id: Model name (latest version) or name@version
+
+        Returns:
+            Dictionary with metadata, estimator, encoder and the compiled
+            evaluator (None if the model has none or PREDICTION_COMPILED
+            is off)
+        """
+        metadata = ModelRegistry.get_metadata(model_id)
+        encoder = ModelRegistry.load_encoder(metadata['model_id'])
+        if encoder is None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Model {metadata['model_id']} has no stored preprocessing and cannot predict"
+            )
+        return {
+            'metadata': metadata,
+            'estimator': ModelRegistry.load_estimator(metadata['model_id']),
+            'encoder': encoder,
+            'compiled': (
+                ModelRegistry.load_compiled(metadata['model_id'])
+                if settings.PREDICTION_COMPILED else None
+            )
+        }
+
+    @classmethod
+    def predict_frame(
+        cls,
+        loaded: Dict[str, Any],
+        df: pd.DataFrame,
+        include_proba: bool = False
+    ) -> pd.DataFrame:
+        """
+        Predict one chunk of raw rows.
+
+        Args:
+            loaded: Result of load()
+            df: Raw input rows
+            include_proba: Add one probability column per class
+
+        Returns:
+            DataFrame with a prediction column (and probabilities)
+
+        Raises:
+            HTTPException: If the rows cannot be encoded or predicted
+        """
+        # The compiled form takes columns in training order without validation
+        estimator = loaded.get('compiled') or loaded['estimator']
+        try:
+            with Metrics.span('encode'):
+                X = loaded['encoder'].transform(df)
+                if isinstance(X, pd.DataFrame) and not hasattr(estimator, 'feature_names_in_'):
+                    # Trained on plain arrays (shared-memory training matrices)
+                    X = X.to_numpy(dtype=np.float64)
+            with Metrics.span('predict'):
+                result = pd.DataFrame({'prediction': estimator.predict(X)})
+                if include_proba and getattr(estimator, 'classes_', None) is not None and hasattr(estimator, 'predict_proba'):
+                    proba = estimator.predict_proba(X)
+                    for i, label in enumerate(estimator.classes_):
+                        result[f"proba_{label}"] = proba[:, i]
+        except (ValueError, TypeError, KeyError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid prediction input: {str(e)}")
+        return result
+
+    @classmethod
+    def records_chunks(cls, records: List[Dict[str, Any]], chunk_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Split a JSON batch into DataFrame chunks.
+
+        Args:
+            records: List of row objects
+            chunk_size: Rows per chunk
+
+        Returns:
+            Iterator of DataFrames
+        """
+        for start in range(0, len(records), chunk_size):
+            yield pd.DataFrame.from_records(records[start:start + chunk_size])
+
+    @classmethod
+    def csv_chunks(cls, loaded: Dict[str, Any], source: BinaryIO, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Read a CSV file incrementally.
+
+        Categorical columns are read as strings so a chunk that happens to
+        hold only numeric-looking values is encoded like the training data.
+
+        Args:
+            loaded: Result of load()
+            source: Binary file object positioned at the CSV header
+            chunk_size: Rows per chunk
+
+        Returns:
+            Iterator of DataFrames
+        """
+        dtypes = {col: str for col in loaded['encoder'].categorical_columns}
+        reader = None
+        try:
+            reader = pd.read_csv(source, chunksize=chunk_size, dtype=dtypes)
+            yield from reader
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV input: {str(e)}")
+        finally:
+            # Release the parser before the caller closes the source
+            if reader is not None:
+                reader.close()
+
+    @classmethod
+    def predict_chunks(
+        cls,
+        loaded: Dict[str, Any],
+        chunks: Iterable[pd.DataFrame],
+        include_proba: bool = False
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Predict a stream of chunks, numbering rows across chunks.
+
+        Args:
+            loaded: Result of load()
+            chunks: Raw input chunks
+            include_proba: Add class probability columns
+
+        Returns:
+            Iterator of prediction DataFrames with a leading row column
+        """
+        offset = 0
+        for chunk in chunks:
+            result = cls.predict_frame(loaded, chunk, include_proba)
+            result.insert(0, 'row', np.arange(offset, offset + len(result)))
+            offset += len(result)
+            yield result
+
+    @classmethod
+    def serialize(cls, predictions: Iterator[pd.DataFrame], output_format: str) -> Iterator[str]:
+        """
+        Render prediction chunks as CSV (one header) or NDJSON text.
+
+        Args:
+            predictions: Prediction DataFrames
+            output_format: 'csv' or 'ndjson'
+
+        Returns:
+            Iterator of text pieces
+        """
+        header = True
+        for result in predictions:
+            with Metrics.span('serialize'):
+                if output_format == 'csv':
+                    text = result.to_csv(index=False, header=header)
+                    header = False
+                elif len(result):
+                    text = result.to_json(orient='records', lines=True).rstrip('\n') + '\n'
+                else:
+                    continue
+            yield text
+
+    @classmethod
+    def chunk_size(cls, requested: Optional[int] = None) -> int:
+        """Rows per prediction chunk, bounded by PREDICTION_MAX_CHUNK_SIZE."""
+        size = requested or settings.PREDICTION_CHUNK_SIZE
+        if not 1 <= size <= settings.PREDICTION_MAX_CHUNK_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"chunk_size must be between 1 and {settings.PREDICTION_MAX_CHUNK_SIZE}"
+            )
+        return size
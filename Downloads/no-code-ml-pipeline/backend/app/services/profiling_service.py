@@ -0,0 +1,241 @@
+"""
+On-demand profiling of individual requests.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+
+
+PROFILE_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Values of the X-Profile header or profile query parameter that enable profiling
+PROFILE_FLAGS = {'1', 'true', 'yes', 'on'}
+
+# pstats sort keys accepted by the text report
+SORT_KEYS = {'cumulative', 'tottime', 'ncalls', 'filename', 'name'}
+
+
+class ProfilingService:
+    """
+    Service recording cProfile profiles of single requests.
+
+    With PROFILING_ENABLED on, a request sent with an ``X-Profile: 1``
+    header or ``?profile=1`` runs its service call under the profiler and
+    the response carries an ``X-Profile-Id`` header. Profiles are stored
+    as pstats files under TEMP_DIR/profiles, readable by snakeviz or
+    flameprof, and returned by GET /profiles/{profile_id}. Jobs profile
+    their preparation in the API process and their run in the worker
+    process; both segments are added into the same profile.
+
+    Requests without the flag, and every request while profiling is
+    disabled, call the service directly.
+    """
+
+    _lock = threading.Lock()
+
+    @classmethod
+    def requested(cls, request: Request) -> Optional[str]:
+        """
+        Dependency returning a new profile id when the request asks for one.
+
+        Args:
+            request: Incoming request
+
+        Returns:
+            Profile id, or None when profiling is off or not requested
+        """
+        if not settings.PROFILING_ENABLED:
+            return None
+        flag = request.headers.get('x-profile') or request.query_params.get('profile') or ''
+        return uuid.uuid4().hex if flag.lower() in PROFILE_FLAGS else None
+
+    @classmethod
+    @contextmanager
+    def profile(cls, profile_id: Optional[str], label: str):
+        """
+        Profile the enclosed block into a stored profile.
+
+        Only the calling thread is profiled. Blocks run under the same
+        profile id are added together.
+
+        Args:
+            profile_id: Profile to record into (None disables profiling)
+            label: Description of the profiled segment
+        """
+        if profile_id is None:
+            yield
+            return
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            cls._save(profile_id, label, profiler, time.perf_counter() - started)
+
+    @classmethod
+    def wrap(cls, fn: Callable[..., Any], profile_id: Optional[str], label: str) -> Callable[..., Any]:
+        """
+        Profile calls of fn in the thread they run in.
+
+        Args:
+            fn: Service callable (usually handed to ServiceExecutor)
+            profile_id: Profile to record into (None returns fn unchanged)
+            label: Description of the profiled call
+
+        Returns:
+            Callable with fn's signature
+        """
+        if profile_id is None:
+            return fn
+
+        def profiled(*args, **kwargs):
+            with cls.profile(profile_id, label):
+                return fn(*args, **kwargs)
+        return profiled
+
+    @classmethod
+    def list_profiles(cls) -> List[Dict[str, Any]]:
+        """
+        List stored profiles, newest first.
+
+        Returns:
+            Profile metadata records
+        """
+        if not os.path.isdir(cls._profiles_dir()):
+            return []
+        profiles = []
+        for filename in os.listdir(cls._profiles_dir()):
+            if filename.endswith('.json'):
+                try:
+                    profiles.append(cls.get_profile(filename[:-5]))
+                except HTTPException:
+                    continue
+        return sorted(profiles, key=lambda p: p['created_at'], reverse=True)
+
+    @classmethod
+    def get_profile(cls, profile_id: str) -> Dict[str, Any]:
+        """
+        Get a stored profile's metadata.
+
+        Args:
+            profile_id: Profile identifier
+
+        Returns:
+            Metadata with the profiled segments and total time
+
+        Raises:
+            HTTPException: If the profile does not exist
+        """
+        path = cls.profile_path(profile_id)
+        try:
+            with open(f"{path[:-5]}.json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+
+    @classmethod
+    def profile_path(cls, profile_id: str) -> str:
+        """
+        Path of a stored pstats file.
+
+        Args:
+            profile_id: Profile identifier
+
+        Returns:
+            Path of the .prof file
+
+        Raises:
+            HTTPException: If the id is malformed or the profile does not exist
+        """
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            raise HTTPException(status_code=400, detail=f"Invalid profile id: {profile_id}")
+        path = os.path.join(cls._profiles_dir(), f"{profile_id}.prof")
+        if not os.path.exists(path):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Profile {profile_id} not found (it may still be recording or was pruned)"
+            )
+        return path
+
+    @classmethod
+    def render(cls, profile_id: str, sort: str = 'cumulative', limit: int = 50) -> str:
+        """
+        Text report of a stored profile.
+
+        Args:
+            profile_id: Profile identifier
+            sort: pstats sort key
+            limit: Number of functions listed
+
+        Returns:
+            pstats report with the hottest functions first
+        """
+        if sort not in SORT_KEYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported sort key: {sort} (use one of {', '.join(sorted(SORT_KEYS))})"
+            )
+        path = cls.profile_path(profile_id)
+        stream = io.StringIO()
+        stats = pstats.Stats(path, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    @classmethod
+    def _save(cls, profile_id: str, label: str, profiler: cProfile.Profile, elapsed: float):
+        """Add a profiled segment to the stored profile and prune old ones."""
+        os.makedirs(cls._profiles_dir(), exist_ok=True)
+        path = os.path.join(cls._profiles_dir(), f"{profile_id}.prof")
+        meta_path = os.path.join(cls._profiles_dir(), f"{profile_id}.json")
+        with cls._lock:
+            stats = pstats.Stats(profiler)
+            meta = {'profile_id': profile_id, 'created_at': time.time(), 'elapsed_s': 0.0, 'segments': []}
+            if os.path.exists(path):
+                stats.add(path)
+                try:
+                    with open(meta_path) as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    pass
+            meta['elapsed_s'] += elapsed
+            meta['segments'].append({'label': label, 'pid': os.getpid(), 'elapsed_s': elapsed})
+
+            stats.dump_stats(f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+            with open(f"{meta_path}.tmp", 'w') as f:
+                json.dump(meta, f)
+            os.replace(f"{meta_path}.tmp", meta_path)
+            cls._prune()
+
+    @classmethod
+    def _prune(cls):
+        """Delete the oldest profiles beyond PROFILE_MAX_FILES."""
+        directory = cls._profiles_dir()
+        paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.prof')]
+        if len(paths) <= settings.PROFILE_MAX_FILES:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - settings.PROFILE_MAX_FILES]:
+            for stale in (path, f"{path[:-5]}.json"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+    @classmethod
+    def _profiles_dir(cls) -> str:
+        """Directory holding stored profiles."""
+        return os.path.join(settings.TEMP_DIR, 'profiles')
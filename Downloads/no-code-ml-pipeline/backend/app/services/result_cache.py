@@ -0,0 +1,174 @@
+"""
+Persistent cache of training results and candidate CV scores.
+"""
+import hashlib
+import json
+import os
+import threading
+import joblib
+import pandas as pd
+from scipy import sparse
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+
+class ResultCache:
+    """
+    Service caching training outcomes on disk.
+
+    Two levels are kept under TEMP_DIR/results: complete training results
+    (fitted model, metrics, search summary) keyed by everything that
+    determines a run, and per-candidate CV fold scores keyed by everything
+    that determines a score except the search space, so overlapping
+    searches reuse each other's candidates.
+    """
+
+    _lock = threading.Lock()
+
+    @classmethod
+    def fingerprint_split(cls, split_data: Dict[str, Any]) -> str:
+        """
+        Content hash of a split's matrices, targets and preprocessing.
+
+        Computed once per split entry. Unlike the split ID, it stays valid
+        across restarts because it hashes the data itself.
+
+        Args:
+            split_data: Split entry from SplitService
+
+        Returns:
+            Hex digest
+        """
+        if 'fingerprint' not in split_data:
+            digest = hashlib.sha256()
+            for name in ('X_train', 'X_test', 'y_train', 'y_test'):
+                values = split_data[name]
+                if sparse.issparse(values):
+                    matrix = values.tocsr()
+                    digest.update(repr(matrix.shape).encode())
+                    for part in (matrix.data, matrix.indices, matrix.indptr):
+                        digest.update(part.tobytes())
+                else:
+                    digest.update(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+            digest.update(cls._canonical({
+                'feature_names': split_data['feature_names'],
+                'preprocessing_plan': split_data['preprocessing_plan']
+            }).encode())
+            split_data['fingerprint'] = digest.hexdigest()
+        return split_data['fingerprint']
+
+    @classmethod
+    def key(cls, parts: Dict[str, Any]) -> str:
+        """
+        Cache key for a JSON-serializable description.
+
+        Args:
+            parts: Everything the cached value depends on
+
+        Returns:
+            Hex digest
+        """
+        return hashlib.sha256(cls._canonical(parts).encode()).hexdigest()[:32]
+
+    @classmethod
+    def load_result(cls, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a stored training result.
+
+        Args:
+            key: Result key
+
+        Returns:
+            Stored result, or None on a miss
+        """
+        path = cls._result_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception:
+            # A truncated or incompatible entry is just a miss
+            return None
+
+    @classmethod
+    def store_result(cls, key: str, result: Dict[str, Any]):
+        """
+        Store a training result, evicting the oldest beyond RESULT_CACHE_SIZE.
+
+        Args:
+            key: Result key
+            result: Picklable training result
+        """
+        directory = cls._root()
+        os.makedirs(directory, exist_ok=True)
+        path = cls._result_path(key)
+        with cls._lock:
+            joblib.dump(result, f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+
+            entries = [
+                os.path.join(directory, name) for name in os.listdir(directory)
+                if name.endswith('.joblib')
+            ]
+            if len(entries) > settings.RESULT_CACHE_SIZE:
+                entries.sort(key=os.path.getmtime)
+                for stale in entries[:len(entries) - settings.RESULT_CACHE_SIZE]:
+                    os.remove(stale)
+
+    @classmethod
+    def load_scores(cls, context_key: str) -> Dict[str, List[float]]:
+        """
+        Load the CV fold scores recorded for a scoring context.
+
+        Args:
+            context_key: Key of split, folds, estimator and scoring
+
+        Returns:
+            Candidate key to fold scores
+        """
+        path = cls._scores_path(context_key)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @classmethod
+    def store_scores(cls, context_key: str, scores: Dict[str, List[float]]):
+        """
+        Merge newly computed fold scores into a scoring context.
+
+        Args:
+            context_key: Key of split, folds, estimator and scoring
+            scores: Candidate key to fold scores
+        """
+        if not scores:
+            return
+        os.makedirs(os.path.join(cls._root(), 'scores'), exist_ok=True)
+        path = cls._scores_path(context_key)
+        with cls._lock:
+            merged = {**cls.load_scores(context_key), **scores}
+            with open(f"{path}.tmp", 'w') as f:
+                json.dump(merged, f)
+            os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def _canonical(cls, value: Any) -> str:
+        """Stable JSON text for hashing."""
+        return json.dumps(value, sort_keys=True, default=str)
+
+    @classmethod
+    def _root(cls) -> str:
+        """Directory holding cached results."""
+        return os.path.join(settings.TEMP_DIR, 'results')
+
+    @classmethod
+    def _result_path(cls, key: str) -> str:
+        return os.path.join(cls._root(), f"{key}.joblib")
+
+    @classmethod
+    def _scores_path(cls, context_key: str) -> str:
+        return os.path.join(cls._root(), 'scores', f"{context_key}.json")
@@ -0,0 +1,675 @@
+"""
+Hyperparameter search service with budgeted strategies.
+"""
+import logging
+import math
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone, is_classifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, get_scorer, r2_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from sklearn.tree import BaseDecisionTree
+from sklearn.utils import _safe_indexing
+from fastapi import HTTPException
+
+from app.models.model import SearchStrategy
+from app.utils.tree_utils import node_collapse_alphas, node_depths, padded_decision_paths
+from app.core.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# Metrics the pruning tuner can compute from predictions alone
+_PREDICTION_METRICS = {'accuracy': accuracy_score, 'r2': r2_score}
+
+# Parameters the pruning tuner can search; anything else needs real fits
+PRUNING_PARAMS = {'criterion', 'min_samples_leaf', 'max_depth', 'min_samples_split', 'ccp_alpha'}
+# Settings the pruning tuner fixes; a grid may only list these exact values
+PRUNING_FIXED = {'splitter': 'best', 'max_features': None}
+
+# Approximate pruning candidates re-scored with real fits
+PRUNING_REFITS = 3
+
+
+def _fit_and_score(estimator, params, X, y, train_idx, val_idx, scorer) -> float:
+    """Fit one candidate on one fold and score it on the validation rows."""
+    model = clone(estimator).set_params(**params)
+    try:
+        model.fit(_safe_indexing(X, train_idx), _safe_indexing(y, train_idx))
+        return float(scorer(model, _safe_indexing(X, val_idx), _safe_indexing(y, val_idx)))
+    except Exception:
+        # Mirror GridSearchCV(error_score=np.nan): a failing fit scores NaN
+        return float('nan')
+
+
+def _fit_logistic_path(estimator, C_values, X, y, train_idx, val_idx, scorer, deadline) -> List[float]:
+    """
+    Fit one fold's regularization path with warm starts.
+
+    C values are visited in increasing order and each fit starts from the
+    previous coefficients, so later fits converge in a few iterations.
+    """
+    model = clone(estimator).set_params(warm_start=True)
+    X_train, y_train = _safe_indexing(X, train_idx), _safe_indexing(y, train_idx)
+    X_val, y_val = _safe_indexing(X, val_idx), _safe_indexing(y, val_idx)
+
+    scores = []
+    for C in C_values:
+        if deadline is not None and time.time() >= deadline:
+            break
+        model.set_params(C=C)
+        try:
+            model.fit(X_train, y_train)
+            scores.append(float(scorer(model, X_val, y_val)))
+        except Exception:
+            scores.append(float('nan'))
+    return scores
+
+
+def _pruning_alphas(estimator, params, X, y, max_alphas) -> List[float]:
+    """Pick up to max_alphas ccp_alpha values from the full-data pruning path."""
+    try:
+        path = clone(estimator).set_params(**params).cost_complexity_pruning_path(X, y)
+    except Exception:
+        return []
+    # The last alpha prunes to the root; zero is the unpruned tree
+    alphas = np.unique(path.ccp_alphas[:-1])
+    alphas = alphas[alphas > 0]
+    if len(alphas) > max_alphas:
+        alphas = alphas[np.linspace(0, len(alphas) - 1, max_alphas).round().astype(int)]
+    return [float(a) for a in alphas]
+
+
+def _fit_tree_fold(estimator, candidates, X, y, train_idx, val_idx, scoring) -> List[float]:
+    """
+    Grow one fold's tree once and score every pruned sub-tree.
+
+    Each candidate is a (max_depth, min_samples_split, ccp_alpha) triple.
+    A validation row lands on the first node of its root-to-leaf path that
+    the candidate turns into a leaf, so all candidates are scored from one
+    padded path matrix without refitting.
+    """
+    model = clone(estimator)
+    y_val = _safe_indexing(y, val_idx)
+    try:
+        model.fit(_safe_indexing(X, train_idx), _safe_indexing(y, train_idx))
+    except Exception:
+        return [float('nan')] * len(candidates)
+
+    tree_ = model.tree_
+    paths, _ = padded_decision_paths(model, _safe_indexing(X, val_idx))
+    is_leaf = (tree_.children_left == -1)[paths]
+    depths = node_depths(tree_)[paths]
+    n_samples = tree_.n_node_samples[paths]
+    collapse = node_collapse_alphas(tree_)[paths]
+
+    if is_classifier(model):
+        node_values = model.classes_[tree_.value[:, 0, :].argmax(axis=1)]
+    else:
+        node_values = tree_.value[:, 0, 0]
+    metric = _PREDICTION_METRICS[scoring]
+    rows = np.arange(paths.shape[0])
+    n_train = len(train_idx)
+
+    scores = []
+    for max_depth, min_samples_split, ccp_alpha in candidates:
+        if isinstance(min_samples_split, float):
+            min_samples_split = math.ceil(min_samples_split * n_train)
+        stop = is_leaf | (collapse <= ccp_alpha) | (n_samples < min_samples_split)
+        if max_depth is not None:
+            stop |= depths >= max_depth
+        nodes = paths[rows, stop.argmax(axis=1)]
+        scores.append(float(metric(y_val, node_values[nodes])))
+    return scores
+
+
+class SearchBudget:
+    """Wall-clock and fit-count limits shared by a search run."""
+
+    def __init__(self, time_budget_s: Optional[float] = None, max_fits: Optional[int] = None):
+        self.time_budget_s = time_budget_s
+        self.max_fits = max_fits
+        self.started_at = time.perf_counter()
+        self.n_fits = 0
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def exhausted(self) -> bool:
+        if self.time_budget_s is not None and self.elapsed_s >= self.time_budget_s:
+            return True
+        return self.max_fits is not None and self.n_fits >= self.max_fits
+
+    def candidates_allowed(self, fits_per_candidate: int) -> Optional[int]:
+        """How many more candidates fit in the fit budget (None = unlimited)."""
+        if self.max_fits is None:
+            return None
+        return max(0, (self.max_fits - self.n_fits) // fits_per_candidate)
+
+
+class SearchService:
+    """
+    Service for hyperparameter search over a parameter grid.
+
+    Every strategy scores candidates on the same precomputed CV folds and
+    stops starting new work once the time or fit budget is spent. The best
+    candidate is refitted on the full training set.
+    """
+
+    @classmethod
+    def search(
+        cls,
+        estimator,
+        param_grid: Dict[str, list],
+        X,
+        y,
+        cv_folds: List[Tuple[np.ndarray, np.ndarray]],
+        scoring: str,
+        strategy: SearchStrategy = SearchStrategy.GRID,
+        time_budget_s: Optional[float] = None,
+        max_fits: Optional[int] = None,
+        n_candidates: Optional[int] = None,
+        random_state: int = 42,
+        n_jobs: Optional[int] = None,
+        score_cache: Optional[Dict[str, List[float]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Search the parameter grid and refit the best candidate.
+
+        Args:
+            estimator: Unfitted base estimator
+            param_grid: Parameter name to list of values
+            X: Training features (DataFrame, array or sparse matrix)
+            y: Training target
+            cv_folds: (train indices, validation indices) pairs
+            scoring: scikit-learn scorer name
+            strategy: Search strategy
+            time_budget_s: Stop starting new fits after this many seconds
+            max_fits: Stop after this many fold fits
+            n_candidates: Number of candidates for sampling strategies
+            random_state: Seed for candidate sampling
+            n_jobs: Parallel workers for fold fits (None = joblib's active
+                configuration, set by the compute scheduler in workers)
+            score_cache: Fold scores from earlier searches on the same folds,
+                keyed by candidate_key; matching candidates are not refitted
+
+        Returns:
+            Dictionary with best_estimator, best_params, best_score and
+            search statistics
+        """
+        strategy = SearchStrategy(strategy)
+        budget = SearchBudget(time_budget_s, max_fits)
+        scorer = get_scorer(scoring)
+        runner = {
+            SearchStrategy.GRID: cls._grid,
+            SearchStrategy.RANDOM: cls._random,
+            SearchStrategy.HALVING: cls._halving,
+            SearchStrategy.BAYESIAN: cls._bayesian,
+            SearchStrategy.PATH: cls._logistic_path,
+            SearchStrategy.PRUNING: cls._tree_pruning,
+        }[strategy]
+
+        with Parallel(n_jobs=n_jobs) as parallel:
+            context = {
+                'estimator': estimator,
+                'X': X,
+                'y': y,
+                'cv_folds': cv_folds,
+                'scoring': scoring,
+                'scorer': scorer,
+                'parallel': parallel,
+                'n_workers': max(1, effective_n_jobs(n_jobs)),
+                # Without a time budget all candidates go to the pool at once;
+                # with one, work is dispatched a worker-pool-sized batch at a time
+                'batch_size': max(1, effective_n_jobs(n_jobs)) if time_budget_s is not None else None,
+                'budget': budget,
+                'rng': np.random.RandomState(random_state),
+                'score_cache': score_cache or {},
+                'results': []
+            }
+            runner(context, param_grid, n_candidates)
+
+        results = context['results']
+        # Only real fits on the full training folds are comparable (halving
+        # rungs on row subsets and truncated pruning trees are not)
+        full_resources = len(cv_folds[0][0])
+        scored = [
+            r for r in results
+            if r['n_resources'] == full_resources and not r.get('approximate')
+            and not math.isnan(r['mean_score'])
+        ]
+        if not scored:
+            raise HTTPException(
+                status_code=400,
+                detail="Hyperparameter search could not fit any candidate within the budget"
+            )
+
+        # Ties keep evaluation order like GridSearchCV
+        best = max(scored, key=lambda r: r['mean_score'])
+        with Metrics.span('fit'):
+            best_estimator = clone(estimator).set_params(**best['params']).fit(X, y)
+
+        return {
+            'best_estimator': best_estimator,
+            'best_params': best['params'],
+            'best_score': best['mean_score'],
+            'strategy': context.get('strategy', strategy).value,
+            'n_candidates': len({cls.candidate_key(r['params']) for r in results}),
+            'n_fits': budget.n_fits,
+            'elapsed_s': budget.elapsed_s,
+            'budget_exhausted': budget.exhausted,
+            'n_cached': sum(1 for r in results if r.get('cached')),
+            'results': results
+        }
+
+    @classmethod
+    def candidate_key(cls, params: Dict[str, Any]) -> str:
+        """
+        Stable identity of a parameter combination.
+
+        Keys score_cache entries, so callers building a cache from earlier
+        search results must use it too.
+
+        Args:
+            params: Parameter name to value
+
+        Returns:
+            Key string, equal for equal combinations in any order
+        """
+        return repr(sorted(params.items()))
+
+    @classmethod
+    def _evaluate(
+        cls,
+        context: Dict[str, Any],
+        candidates: List[Dict[str, Any]],
+        n_resources: Optional[int] = None,
+        force: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Score candidates on every fold in budget-sized batches.
+
+        Args:
+            context: Search context
+            candidates: Parameter dictionaries to evaluate
+            n_resources: Training rows per fold (None = all rows)
+            force: Evaluate every candidate even when the budget is spent
+
+        Returns:
+            Results for the candidates that were evaluated
+        """
+        budget = context['budget']
+        folds = context['cv_folds']
+        if n_resources is not None:
+            folds = cls._subsample_folds(context, n_resources)
+
+        # Candidates already scored on the full folds are not refitted
+        reused = {} if n_resources is not None else cls._reuse_scores(context, candidates)
+        fresh = [params for params in candidates if cls.candidate_key(params) not in reused]
+
+        evaluated = []
+        batch_size = context['batch_size'] or max(1, len(fresh))
+        for start in range(0, len(fresh), batch_size):
+            if budget.exhausted and not force:
+                break
+            batch = fresh[start:start + batch_size]
+            allowed = None if force else budget.candidates_allowed(len(folds))
+            if allowed is not None:
+                batch = batch[:allowed]
+
+            scores = context['parallel'](
+                delayed(_fit_and_score)(
+                    context['estimator'], params, context['X'], context['y'],
+                    train_idx, val_idx, context['scorer']
+                )
+                for params in batch
+                for train_idx, val_idx in folds
+            )
+            budget.n_fits += len(scores)
+
+            for i, params in enumerate(batch):
+                fold_scores = scores[i * len(folds):(i + 1) * len(folds)]
+                evaluated.append({
+                    'params': params,
+                    'fold_scores': fold_scores,
+                    'mean_score': float(np.mean(fold_scores)),
+                    'n_resources': n_resources or len(folds[0][0])
+                })
+
+        if reused:
+            # Keep candidate order so ties resolve as without the cache
+            by_key = {**reused, **{cls.candidate_key(r['params']): r for r in evaluated}}
+            evaluated = [
+                by_key[cls.candidate_key(params)] for params in candidates
+                if cls.candidate_key(params) in by_key
+            ]
+        context['results'].extend(evaluated)
+        return evaluated
+
+    @classmethod
+    def _reuse_scores(
+        cls,
+        context: Dict[str, Any],
+        candidates: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Build results for candidates found in the score cache."""
+        cache = context['score_cache']
+        n_folds = len(context['cv_folds'])
+        reused = {}
+        for params in candidates:
+            fold_scores = cache.get(cls.candidate_key(params))
+            if fold_scores is not None and len(fold_scores) == n_folds:
+                reused[cls.candidate_key(params)] = {
+                    'params': params,
+                    'fold_scores': list(fold_scores),
+                    'mean_score': float(np.mean(fold_scores)),
+                    'n_resources': len(context['cv_folds'][0][0]),
+                    'cached': True
+                }
+        return reused
+
+    @classmethod
+    def _subsample_folds(
+        cls,
+        context: Dict[str, Any],
+        n_resources: int
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Limit each fold's training rows to a seeded random subset."""
+        if 'fold_permutations' not in context:
+            rng = context['rng']
+            context['fold_permutations'] = [
+                rng.permutation(train_idx) for train_idx, _ in context['cv_folds']
+            ]
+        return [
+            (np.sort(permuted[:n_resources]), val_idx)
+            for permuted, (_, val_idx) in zip(context['fold_permutations'], context['cv_folds'])
+        ]
+
+    @classmethod
+    def _logistic_path(cls, context: Dict[str, Any], param_grid: Dict[str, list], n_candidates: Optional[int]):
+        """
+        Warm-started regularization path over C for logistic regression.
+
+        Each fold fits the C values in increasing order, reusing the previous
+        coefficients, so the whole path costs little more than one cold fit.
+        The solver is fixed to lbfgs (liblinear cannot warm start) with the
+        largest max_iter of the grid; C values are the grid's C values.
+        """
+        if not isinstance(context['estimator'], LogisticRegression) or 'C' not in param_grid:
+            raise HTTPException(
+                status_code=400,
+                detail="The path search strategy only supports logistic regression"
+            )
+        budget = context['budget']
+        C_values = sorted(param_grid['C'])
+        n_folds = len(context['cv_folds'])
+        allowed = budget.candidates_allowed(n_folds)
+        if allowed is not None:
+            C_values = C_values[:allowed]
+
+        fixed = {
+            'solver': 'lbfgs',
+            'penalty': param_grid.get('penalty', ['l2'])[0],
+            'max_iter': max(param_grid.get('max_iter', [context['estimator'].max_iter]))
+        }
+        candidates = [{**fixed, 'C': C} for C in C_values]
+        reused = cls._reuse_scores(context, candidates)
+        if len(reused) == len(candidates):
+            # The whole path was scored before; warm starts need no partial reuse
+            context['results'].extend(reused[cls.candidate_key(params)] for params in candidates)
+            return
+
+        estimator = clone(context['estimator']).set_params(**fixed)
+        deadline = None
+        if budget.time_budget_s is not None:
+            deadline = time.time() + budget.time_budget_s - budget.elapsed_s
+
+        fold_paths = context['parallel'](
+            delayed(_fit_logistic_path)(
+                estimator, C_values, context['X'], context['y'],
+                train_idx, val_idx, context['scorer'], deadline
+            )
+            for train_idx, val_idx in context['cv_folds']
+        )
+        budget.n_fits += sum(len(path) for path in fold_paths)
+
+        # Only C values reached on every fold are comparable
+        n_complete = min(len(path) for path in fold_paths)
+        for i in range(n_complete):
+            fold_scores = [path[i] for path in fold_paths]
+            context['results'].append({
+                'params': {**fixed, 'C': C_values[i]},
+                'fold_scores': fold_scores,
+                'mean_score': float(np.mean(fold_scores)),
+                'n_resources': len(context['cv_folds'][0][0])
+            })
+
+    @classmethod
+    def _tree_pruning(cls, context: Dict[str, Any], param_grid: Dict[str, list], n_candidates: Optional[int]):
+        """
+        Sub-tree evaluation of one fully grown tree per fold.
+
+        Trees are only grown for each criterion x min_samples_leaf setting;
+        every max_depth x min_samples_split truncation and every ccp_alpha of
+        the full-data pruning path is scored by routing the validation rows
+        through that one tree. The splitter is fixed to best and
+        max_features to None, since truncating a tree only reproduces the
+        smaller trees when every split considers all features; a grid
+        searching anything else falls back to grid search rather than
+        silently dropping those values.
+
+        Truncated trees only approximate refitted ones (ties between equally
+        good splits may break differently), so their scores just rank the
+        candidates: the best PRUNING_REFITS are then fitted on every fold,
+        and only those real scores can become best_score.
+        """
+        estimator = context['estimator']
+        scoring = context['scoring']
+        if not isinstance(estimator, BaseDecisionTree) or scoring not in _PREDICTION_METRICS:
+            raise HTTPException(
+                status_code=400,
+                detail="The pruning search strategy only supports decision trees"
+            )
+        unsupported = sorted(
+            name for name, values in param_grid.items()
+            if name not in PRUNING_PARAMS
+            and not (name in PRUNING_FIXED and list(values) == [PRUNING_FIXED[name]])
+        )
+        if unsupported:
+            logger.warning(f"Pruning cannot search {unsupported}; using grid search instead")
+            context['strategy'] = SearchStrategy.GRID
+            cls._grid(context, param_grid, n_candidates)
+            return
+        budget = context['budget']
+        folds = context['cv_folds']
+        fixed = dict(PRUNING_FIXED)
+        estimator = clone(estimator).set_params(**fixed)
+
+        # Fit settings define the grown tree; the rest is evaluated on it
+        fit_grid = {name: param_grid[name] for name in ('criterion', 'min_samples_leaf') if name in param_grid}
+        truncations = [
+            (max_depth, min_samples_split, 0.0)
+            for max_depth in param_grid.get('max_depth', [None])
+            for min_samples_split in param_grid.get('min_samples_split', [2])
+        ]
+        smallest_split = min(param_grid.get('min_samples_split', [2]))
+
+        settings_list = list(ParameterGrid(fit_grid))
+        batch_size = max(1, (context['batch_size'] or len(settings_list) * len(folds)) // len(folds))
+        for start in range(0, len(settings_list), batch_size):
+            if budget.exhausted:
+                break
+            batch = settings_list[start:start + batch_size]
+            allowed = budget.candidates_allowed(len(folds) + 1)
+            if allowed is not None:
+                batch = batch[:allowed]
+
+            alpha_paths = context['parallel'](
+                delayed(_pruning_alphas)(estimator, fit_params, context['X'], context['y'], 30)
+                for fit_params in batch
+            )
+            batch_candidates = [
+                truncations + [(None, smallest_split, alpha) for alpha in alphas]
+                for alphas in alpha_paths
+            ]
+            scores = context['parallel'](
+                delayed(_fit_tree_fold)(
+                    clone(estimator).set_params(**fit_params), candidates,
+                    context['X'], context['y'], train_idx, val_idx, scoring
+                )
+                for fit_params, candidates in zip(batch, batch_candidates)
+                for train_idx, val_idx in folds
+            )
+            budget.n_fits += len(batch) + len(scores)
+
+            for i, (fit_params, candidates) in enumerate(zip(batch, batch_candidates)):
+                fold_paths = scores[i * len(folds):(i + 1) * len(folds)]
+                for j, (max_depth, min_samples_split, ccp_alpha) in enumerate(candidates):
+                    fold_scores = [path[j] for path in fold_paths]
+                    context['results'].append({
+                        'params': {
+                            **fixed, **fit_params,
+                            'max_depth': max_depth,
+                            'min_samples_split': min_samples_split,
+                            'ccp_alpha': ccp_alpha
+                        },
+                        'fold_scores': fold_scores,
+                        'mean_score': float(np.mean(fold_scores)),
+                        'n_resources': len(folds[0][0]),
+                        'approximate': True
+                    })
+
+        ranked = sorted(
+            (r for r in context['results'] if r.get('approximate') and not math.isnan(r['mean_score'])),
+            key=lambda r: r['mean_score'],
+            reverse=True
+        )
+        finalists = list({cls.candidate_key(r['params']): r['params'] for r in ranked}.values())[:PRUNING_REFITS]
+        # Like halving, the leading finalist is scored even past the budget
+        if finalists and not cls._evaluate(context, finalists):
+            cls._evaluate(context, finalists[:1], force=True)
+
+    @classmethod
+    def _grid(cls, context: Dict[str, Any], param_grid: Dict[str, list], n_candidates: Optional[int]):
+        """Exhaustive search in grid order (truncated by the budget)."""
+        cls._evaluate(context, list(ParameterGrid(param_grid)))
+
+    @classmethod
+    def _random(cls, context: Dict[str, Any], param_grid: Dict[str, list], n_candidates: Optional[int]):
+        """Randomized search over the grid values."""
+        cls._evaluate(context, cls._sample(context, param_grid, n_candidates or 60))
+
+    @classmethod
+    def _halving(cls, context: Dict[str, Any], param_grid: Dict[str, list], n_candidates: Optional[int]):
+        """
+        Successive halving over training-set size.
+
+        All candidates start on a small row subset of each fold; after every
+        rung only the best 1/eta survive and the subset grows eta-fold. There
+        are only as many rungs as the candidates can be divided by eta, and
+        the first rung is sized so the survivors always end on all rows.
+        """
+        eta = 3
+        max_resources = min(len(train_idx) for train_idx, _ in context['cv_folds'])
+        n_classes = len(np.unique(context['y'])) if is_classifier(context['estimator']) else 1
+        min_resources = min(max_resources, max(30, 4 * n_classes))
+        n_rungs = 1 + int(math.log(max_resources / min_resources, eta))
+
+        candidates = cls._sample(context, param_grid, n_candidates or eta ** n_rungs)
+        n_rungs = min(n_rungs, 1 + cls._floor_log(len(candidates), eta))
+        min_resources = max(min_resources, max_resources // eta ** (n_rungs - 1))
+
+        for rung in range(n_rungs - 1):
+            evaluated = cls._evaluate(context, candidates, min_resources * eta ** rung)
+            if evaluated:
+                ranked = sorted(
+                    evaluated,
+                    key=lambda r: -np.inf if math.isnan(r['mean_score']) else r['mean_score'],
+                    reverse=True
+                )
+                candidates = [r['params'] for r in ranked[:max(1, math.ceil(len(ranked) / eta))]]
+            if context['budget'].exhausted or len(candidates) <= 1:
+                break
+
+        # The survivors are always scored on all rows; if the budget is already
+        # spent, the leading survivor still is, so best_score is never a
+        # subsample score
+        if not cls._evaluate(context, candidates):
+            cls._evaluate(context, candidates[:1], force=True)
+
+    @staticmethod
+    def _floor_log(n: int, base: int) -> int:
+        """Largest k with base ** k <= n (exact, unlike math.log)."""
+        k = 0
+        while base ** (k + 1) <= n:
+            k += 1
+        return k
+
+    @classmethod
+    def _bayesian(cls, context: Dict[str, Any], param_grid: Dict[str, list], n_candidates: Optional[int]):
+        """
+        Tree-structured Parzen-style sequential search over discrete values.
+
+        After a random warm-up, candidates are split into a good (top quarter)
+        and bad group; each new batch maximizes the ratio of smoothed value
+        frequencies in the good group to those in the bad group.
+        """
+        n_candidates = n_candidates or 40
+        grid = ParameterGrid(param_grid)
+        n_total = min(n_candidates, len(grid))
+        n_initial = min(n_total, max(5, n_total // 4))
+        cls._evaluate(context, cls._sample(context, param_grid, n_initial))
+
+        seen = {cls.candidate_key(r['params']) for r in context['results']}
+        while len(seen) < n_total and not context['budget'].exhausted:
+            results = [r for r in context['results'] if not math.isnan(r['mean_score'])]
+            results.sort(key=lambda r: r['mean_score'], reverse=True)
+            n_good = max(1, int(math.ceil(0.25 * len(results))))
+            good, bad = results[:n_good], results[n_good:]
+
+            pool = [
+                params for params in cls._sample(context, param_grid, min(len(grid), 256))
+                if cls.candidate_key(params) not in seen
+            ]
+            if not pool:
+                break
+            pool.sort(key=lambda params: cls._tpe_ratio(params, param_grid, good, bad), reverse=True)
+            batch = pool[:min(context['n_workers'], n_total - len(seen))]
+            cls._evaluate(context, batch)
+            seen.update(cls.candidate_key(params) for params in batch)
+
+    @classmethod
+    def _tpe_ratio(
+        cls,
+        params: Dict[str, Any],
+        param_grid: Dict[str, list],
+        good: List[Dict[str, Any]],
+        bad: List[Dict[str, Any]]
+    ) -> float:
+        """Product of l(x)/g(x) over parameters with Laplace smoothing."""
+        log_ratio = 0.0
+        for name, values in param_grid.items():
+            value = repr(params[name])
+            in_good = sum(repr(r['params'][name]) == value for r in good)
+            in_bad = sum(repr(r['params'][name]) == value for r in bad)
+            log_ratio += math.log((in_good + 1) / (len(good) + len(values)))
+            log_ratio -= math.log((in_bad + 1) / (len(bad) + len(values)))
+        return log_ratio
+
+    @classmethod
+    def _sample(
+        cls,
+        context: Dict[str, Any],
+        param_grid: Dict[str, list],
+        n_candidates: int
+    ) -> List[Dict[str, Any]]:
+        """Sample distinct candidates from the grid (all of them if it is small)."""
+        grid = ParameterGrid(param_grid)
+        if n_candidates >= len(grid):
+            return list(grid)
+        seed = context['rng'].randint(np.iinfo(np.int32).max)
+        return list(ParameterSampler(param_grid, n_iter=n_candidates, random_state=seed))
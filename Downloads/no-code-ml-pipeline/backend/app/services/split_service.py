@@ -1,20 +1,39 @@
 """
 Train-test split service.
 """
+import hashlib
+import json
+import logging
+import threading
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from typing import Tuple, Dict, Any
+from scipy import sparse
 from sklearn.model_selection import train_test_split
 from fastapi import HTTPException
 
+from app.models.model import CategoricalEncoding
 from app.services.dataset_service import DatasetService
+from app.services.array_store import ArrayStore
+from app.utils.encoders import FeatureEncoder
 from app.core.config import settings
+from app.core.metrics import Metrics
+
+
+logger = logging.getLogger(__name__)
 
 
 class SplitService:
     """Service for train-test split operations."""
     
-    # Store split data for each dataset
-    _splits: Dict[str, Dict[str, Any]] = {}
+    # Split data keyed by split ID (a hash of everything that determines it),
+    # kept in least-recently-used order
+    _splits: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    # Most recent split ID for each dataset
+    _latest: Dict[str, str] = {}
+    # Guards the two dicts above; splits of different datasets run concurrently
+    _lock = threading.RLock()
     
     @classmethod
     def perform_split(
@@ -22,42 +41,64 @@ class SplitService:
         dataset_id: str,
         target_column: str,
         test_size: float = 0.3,
-        random_state: int = None
-    ) -> Tuple[int, int]:
+        random_state: int = None,
+        categorical_encoding: CategoricalEncoding = CategoricalEncoding.LABEL,
+        hash_n_features: int = 1024
+    ) -> Tuple[str, int, int]:
         """
         Perform train-test split on dataset.
         
+        Splits are cached by content: repeating a request with the same
+        dataset contents, target, test size, seed and preprocessing plan
+        returns the cached split without recomputing it.
+        
         Args:
             dataset_id: Dataset identifier
             target_column: Name of the target column
             test_size: Proportion of dataset for testing (0.1 to 0.5)
             random_state: Random seed for reproducibility
+            categorical_encoding: Strategy for encoding categorical columns
+            hash_n_features: Width of the hashed block for hashing encoding
             
         Returns:
-            Tuple of (train_size, test_size)
+            Tuple of (split_id, train_size, test_size)
             
         Raises:
             HTTPException: If split fails
         """
         try:
-            print(f"\n--- TRAIN-TEST SPLIT ---")
-            print(f"Dataset ID: {dataset_id}")
-            print(f"Target Column: {target_column}")
-            print(f"Test Size: {test_size}")
+            # Use default random state if not provided
+            if random_state is None:
+                random_state = settings.RANDOM_STATE
+            categorical_encoding = CategoricalEncoding(categorical_encoding)
+            preprocessing_plan = cls._preprocessing_plan(categorical_encoding, hash_n_features)
+            
+            split_id = cls.get_split_id(
+                dataset_id, target_column, test_size, random_state, preprocessing_plan
+            )
+            with cls._lock:
+                if split_id in cls._splits:
+                    cls._splits.move_to_end(split_id)
+                    cls._latest[dataset_id] = split_id
+                    cached = cls._splits[split_id]
+                    logger.info(f"Using cached split {split_id} for dataset {dataset_id}")
+                    Metrics.cache_lookup('split', hit=True)
+                    return split_id, cached['train_size'], cached['test_size_rows']
+            Metrics.cache_lookup('split', hit=False)
+            
+            logger.info(f"Train-test split of dataset {dataset_id}: target {target_column}, test size {test_size}")
             
             # Get dataset
-            print(f"Loading dataset...")
             df = DatasetService.get_dataset(dataset_id)
-            print(f"✓ Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+            logger.debug(f"Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
             
             # Validate target column exists
             if target_column not in df.columns:
-                print(f"✗ Target column '{target_column}' not found!")
+                logger.warning(f"Target column '{target_column}' not found in dataset {dataset_id}")
                 raise HTTPException(
                     status_code=400,
                     detail=f"Target column '{target_column}' not found in dataset. Available: {list(df.columns)}"
                 )
-            print(f"✓ Target column '{target_column}' found")
             
             # Validate test_size
             if not 0.1 <= test_size <= 0.5:
@@ -69,95 +110,76 @@ class SplitService:
             # Separate features and target
             X = df.drop(columns=[target_column])
             y = df[target_column]
-            print(f"✓ Features shape: {X.shape}, Target shape: {y.shape}")
-            
-            # Automatic preprocessing: encode categorical columns
-            print(f"\nStep: Preprocessing categorical columns...")
-            categorical_cols = X.select_dtypes(include=['object']).columns.tolist()
-            
-            if categorical_cols:
-                print(f"✓ Found {len(categorical_cols)} categorical columns: {categorical_cols}")
-                from sklearn.preprocessing import LabelEncoder
-                
-                for col in categorical_cols:
-                    try:
-                        le = LabelEncoder()
-                        # Handle NaN values by converting to string first
-                        X[col] = X[col].fillna('missing')
-                        X[col] = le.fit_transform(X[col].astype(str))
-                        print(f"  ✓ Encoded '{col}' ({len(le.classes_)} unique values)")
-                    except Exception as e:
-                        print(f"  ✗ Failed to encode '{col}': {str(e)}")
-                        raise
-            else:
-                print(f"✓ No categorical columns found")
-            
-            # Handle missing values in numeric columns
-            numeric_cols = X.select_dtypes(include=['number']).columns.tolist()
-            if numeric_cols:
-                missing_counts = X[numeric_cols].isna().sum()
-                if missing_counts.sum() > 0:
-                    print(f"\nStep: Handling missing values...")
-                    print(f"  Found missing values in: {missing_counts[missing_counts > 0].to_dict()}")
-                    # Fill numeric missing values with median
-                    for col in numeric_cols:
-                        if X[col].isna().sum() > 0:
-                            median_val = X[col].median()
-                            X[col] = X[col].fillna(median_val)
-                            print(f"  ✓ Filled '{col}' missing values with median: {median_val}")
+            logger.debug(f"Features shape: {X.shape}, target shape: {y.shape}")
             
             # Handle missing values in target
             if y.isna().sum() > 0:
-                print(f"\nWarning: Target column has {y.isna().sum()} missing values. Dropping these rows...")
+                logger.warning(f"Target column has {y.isna().sum()} missing values; dropping these rows")
                 valid_indices = ~y.isna()
                 X = X[valid_indices]
                 y = y[valid_indices]
-                print(f"✓ New shape after dropping NaN targets: {X.shape}")
+                logger.debug(f"New shape after dropping missing targets: {X.shape}")
             
-            print(f"\n✓ Preprocessing completed. All data is now numeric.")
-            print(f"Final X dtypes:\n{X.dtypes}")
+            # Split row positions first so encoders are fitted on training rows only
+            is_classification = cls._is_classification_target(y)
+            with Metrics.span('split'):
+                train_idx, test_idx = cls._split_indices(y, test_size, random_state, is_classification)
+            X_train_raw, X_test_raw = X.iloc[train_idx], X.iloc[test_idx]
+            y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
             
-            # Use default random state if not provided
-            if random_state is None:
-                random_state = settings.RANDOM_STATE
+            # Automatic preprocessing: encode categorical columns, impute numeric columns
+            logger.debug(f"Encoding features ({categorical_encoding.value})")
+            encoder = FeatureEncoder(
+                encoding=categorical_encoding,
+                hash_n_features=hash_n_features,
+                is_classification=is_classification,
+                random_state=random_state
+            )
+            with Metrics.span('encode'):
+                try:
+                    X_train = encoder.fit_transform(X_train_raw, y_train)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                X_test = encoder.transform(X_test_raw)
+            logger.info(f"Encoded {len(encoder.categorical_columns)} categorical columns: {encoder.categorical_columns}")
+            if encoder.medians:
+                logger.debug("Filled missing values with training medians: %s", encoder.medians)
             
-            # Perform split - try stratified first, fall back to non-stratified
-            try:
-                # Try stratified split for classification
-                if cls._is_classification_target(y):
-                    X_train, X_test, y_train, y_test = train_test_split(
-                        X, y,
-                        test_size=test_size,
-                        random_state=random_state,
-                        stratify=y
-                    )
-                else:
-                    # Non-stratified for regression
-                    X_train, X_test, y_train, y_test = train_test_split(
-                        X, y,
-                        test_size=test_size,
-                        random_state=random_state
-                    )
-            except ValueError:
-                # If stratified fails (too few samples), use non-stratified
-                X_train, X_test, y_train, y_test = train_test_split(
-                    X, y,
-                    test_size=test_size,
-                    random_state=random_state
-                )
+            if sparse.issparse(X_train):
+                logger.debug(f"Final X: sparse {X_train.shape}, {X_train.nnz} non-zero training entries")
+            else:
+                logger.debug("Final X dtypes:\n%s", X_train.dtypes)
             
             # Store split data
-            cls._splits[dataset_id] = {
-                'X_train': X_train,
-                'X_test': X_test,
-                'y_train': y_train,
-                'y_test': y_test,
-                'target_column': target_column,
-                'test_size': test_size,
-                'random_state': random_state
-            }
-            
-            return len(X_train), len(X_test)
+            with cls._lock:
+                cls._splits[split_id] = {
+                    'split_id': split_id,
+                    'dataset_id': dataset_id,
+                    'dataset_fingerprint': DatasetService.get_dataset_fingerprint(dataset_id),
+                    'X_train': X_train,
+                    'X_test': X_test,
+                    'y_train': y_train,
+                    'y_test': y_test,
+                    'feature_names': encoder.feature_names,
+                    'encoder': encoder,
+                    'target_column': target_column,
+                    'test_size': test_size,
+                    'random_state': random_state,
+                    'categorical_encoding': categorical_encoding.value,
+                    'preprocessing_plan': preprocessing_plan,
+                    'train_size': X_train.shape[0],
+                    'test_size_rows': X_test.shape[0]
+                }
+                cls._latest[dataset_id] = split_id
+            
+                # Evict least recently used splits beyond the cache size
+                while len(cls._splits) > settings.SPLIT_CACHE_SIZE:
+                    evicted_id, evicted = cls._splits.popitem(last=False)
+                    ArrayStore.release_split(evicted)
+                    if cls._latest.get(evicted['dataset_id']) == evicted_id:
+                        del cls._latest[evicted['dataset_id']]
+            
+            return split_id, X_train.shape[0], X_test.shape[0]
             
         except HTTPException:
             raise
@@ -167,10 +189,45 @@ class SplitService:
                 detail=f"Error performing train-test split: {str(e)}"
             )
     
+    @classmethod
+    def get_split_id(
+        cls,
+        dataset_id: str,
+        target_column: str,
+        test_size: float,
+        random_state: int,
+        preprocessing_plan: Dict[str, Any]
+    ) -> str:
+        """
+        Compute the content key of a split.
+        
+        The key hashes the dataset's contents rather than its in-memory
+        version, so a model's split can be found again after a restart.
+        
+        Args:
+            dataset_id: Dataset identifier
+            target_column: Name of the target column
+            test_size: Proportion of dataset for testing
+            random_state: Random seed
+            preprocessing_plan: Encoding settings applied to the features
+            
+        Returns:
+            Split identifier
+        """
+        key = json.dumps({
+            'dataset_id': dataset_id,
+            'dataset_fingerprint': DatasetService.get_dataset_fingerprint(dataset_id),
+            'target_column': target_column,
+            'test_size': float(test_size),
+            'random_state': int(random_state),
+            'preprocessing_plan': preprocessing_plan
+        }, sort_keys=True)
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+    
     @classmethod
     def get_split_data(cls, dataset_id: str) -> Dict[str, Any]:
         """
-        Get split data for a dataset.
+        Get the most recent split data for a dataset.
         
         Args:
             dataset_id: Dataset identifier
@@ -181,12 +238,141 @@ class SplitService:
         Raises:
             HTTPException: If split data not found
         """
-        if dataset_id not in cls._splits:
+        with cls._lock:
+            if dataset_id not in cls._latest:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"No split data found for dataset: {dataset_id}. Please perform split first."
+                )
+            return cls.get_split(cls._latest[dataset_id])
+    
+    @classmethod
+    def get_split(cls, split_id: str) -> Dict[str, Any]:
+        """
+        Get split data by split ID.
+        
+        Args:
+            split_id: Split identifier
+            
+        Returns:
+            Dictionary containing split data
+            
+        Raises:
+            HTTPException: If split not found
+        """
+        with cls._lock:
+            if split_id not in cls._splits:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Split not found: {split_id}. Please perform split first."
+                )
+            cls._splits.move_to_end(split_id)
+            return cls._splits[split_id]
+    
+    @classmethod
+    def get_model_split(cls, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the split a registered model was trained and evaluated on.
+        
+        The split is taken from the cache, or recomputed with the settings
+        recorded at training time if the dataset is unchanged.
+        
+        Args:
+            metadata: Model version metadata from the registry
+            
+        Returns:
+            Dictionary containing split data
+            
+        Raises:
+            HTTPException: If the model has no stored split (400) or its
+                dataset changed since training (409)
+        """
+        split_id = metadata.get('split_id')
+        if not split_id:
             raise HTTPException(
-                status_code=404,
-                detail=f"No split data found for dataset: {dataset_id}. Please perform split first."
+                status_code=400,
+                detail=f"Model {metadata['model_id']} was not trained on a stored split"
             )
-        return cls._splits[dataset_id]
+        try:
+            return cls.get_split(split_id)
+        except HTTPException:
+            pass
+        
+        split = metadata['split']
+        plan = split['preprocessing_plan']
+        resolved_id, _, _ = cls.perform_split(
+            dataset_id=metadata['dataset_id'],
+            target_column=split['target_column'],
+            test_size=split['test_size'],
+            random_state=split['random_state'],
+            categorical_encoding=plan['categorical_encoding'],
+            hash_n_features=plan.get('hash_n_features', 1024)
+        )
+        if resolved_id != split_id:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Dataset {metadata['dataset_id']} changed since model {metadata['model_id']} was trained"
+            )
+        return cls.get_split(resolved_id)
+    
+    @classmethod
+    def metrics(cls):
+        """Gauge samples for /metrics."""
+        with cls._lock:
+            return [('split_cache_entries', {}, len(cls._splits))]
+    
+    @classmethod
+    def _preprocessing_plan(
+        cls,
+        categorical_encoding: CategoricalEncoding,
+        hash_n_features: int
+    ) -> Dict[str, Any]:
+        """Describe the feature preprocessing applied by a split."""
+        plan = {'categorical_encoding': categorical_encoding.value}
+        if categorical_encoding == CategoricalEncoding.HASHING:
+            plan['hash_n_features'] = int(hash_n_features)
+        return plan
+    
+    @classmethod
+    def _split_indices(
+        cls,
+        y: pd.Series,
+        test_size: float,
+        random_state: int,
+        is_classification: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Split row positions into train and test sets.
+        
+        Args:
+            y: Target series
+            test_size: Proportion of rows for testing
+            random_state: Random seed
+            is_classification: Whether to try a stratified split
+            
+        Returns:
+            Tuple of (train positions, test positions)
+        """
+        positions = np.arange(len(y))
+        
+        # Try stratified split first, fall back to non-stratified
+        if is_classification:
+            try:
+                return train_test_split(
+                    positions,
+                    test_size=test_size,
+                    random_state=random_state,
+                    stratify=y
+                )
+            except ValueError:
+                # If stratified fails (too few samples), use non-stratified
+                pass
+        
+        return train_test_split(
+            positions,
+            test_size=test_size,
+            random_state=random_state
+        )
     
     @classmethod
     def _is_classification_target(cls, y: pd.Series) -> bool:
@@ -208,3 +394,6 @@ class SplitService:
         total_count = len(y)
         
         return unique_count < 20 or unique_count / total_count < 0.05
+
+
+Metrics.register_collector(SplitService.metrics)
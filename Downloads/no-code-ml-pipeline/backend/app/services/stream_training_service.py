@@ -0,0 +1,501 @@
+"""
+Out-of-core incremental training over streamed dataset chunks.
+"""
+import logging
+import os
+import shutil
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+from sklearn.naive_bayes import GaussianNB
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, MaxAbsScaler
+from fastapi import HTTPException
+
+from app.models.model import ModelType
+from app.services.model_registry import ModelRegistry
+from app.services.evaluation_service import EvaluationService
+from app.services.job_service import JobService
+from app.utils.encoders import FeatureEncoder
+from app.utils.file_handler import get_dataset_path
+from app.core.config import settings
+from app.core.metrics import Metrics
+
+
+logger = logging.getLogger(__name__)
+
+STREAMING_MODEL_TYPES = (ModelType.SGD_LINEAR, ModelType.NAIVE_BAYES)
+
+# Distinct target values tracked while scanning; more means a continuous target
+MAX_TRACKED_TARGETS = 10000
+
+# Hashed indicator columns are mostly zero within a class, so Gaussian naive
+# Bayes needs far more variance smoothing than on dense numeric features
+NAIVE_BAYES_VAR_SMOOTHING = 0.1
+
+
+def _densify(X):
+    """Dense array from a sparse matrix (for estimators without sparse support)."""
+    return X.toarray() if sparse.issparse(X) else X
+
+
+class StreamTrainingService:
+    """
+    Service training ``partial_fit`` estimators without loading the dataset.
+
+    The uploaded CSV is read twice in STREAM_CHUNK_SIZE-row pieces: a scan
+    collects column roles, numeric fill values and the target's classes; a
+    sharding pass hashes each chunk (FeatureEncoder hashing, which needs no
+    fitted vocabulary), splits off a seeded holdout, writes train and
+    holdout shards to TEMP_DIR/streams and fits a max-abs scaler
+    incrementally. Max-abs scaling leaves hashed indicators at 0/1, where
+    standard scaling would blow rare buckets up. Every epoch then feeds the
+    train shards, in shuffled order with shuffled rows, to ``partial_fit``
+    and scores the streamed holdout. Memory is bounded by the chunk size,
+    not the dataset.
+
+    Preprocessing applied through the API works on the in-memory copy of a
+    dataset and is not seen here: the uploaded file is streamed as is.
+    """
+
+    @classmethod
+    def prepare(
+        cls,
+        dataset_id: str,
+        target_column: str,
+        model_type: ModelType,
+        epochs: int = 5,
+        chunk_size: Optional[int] = None,
+        holdout_fraction: float = 0.2,
+        hash_n_features: int = 1024,
+        hyperparameters: Optional[Dict[str, Any]] = None,
+        random_state: int = 42
+    ) -> Dict[str, Any]:
+        """
+        Validate a streaming training request and build its payload.
+
+        Args:
+            dataset_id: Dataset identifier
+            target_column: Name of the target column
+            model_type: sgd_linear or naive_bayes
+            epochs: Passes over the training shards
+            chunk_size: Rows per chunk (defaults to STREAM_CHUNK_SIZE)
+            holdout_fraction: Share of rows held out for evaluation
+            hash_n_features: Width of the hashed categorical block
+            hyperparameters: Estimator parameters (alpha, penalty, var_smoothing)
+            random_state: Seed for the holdout split and shuffling
+
+        Returns:
+            Self-contained payload for run()
+
+        Raises:
+            HTTPException: If the model type or dataset cannot be streamed
+        """
+        model_type = ModelType(model_type)
+        if model_type not in STREAMING_MODEL_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Streaming training supports {[t.value for t in STREAMING_MODEL_TYPES]}, not {model_type.value}"
+            )
+        chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+        if not 100 <= chunk_size <= settings.STREAM_MAX_CHUNK_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"chunk_size must be between 100 and {settings.STREAM_MAX_CHUNK_SIZE}"
+            )
+        path = get_dataset_path(dataset_id)
+        if not path.endswith('.csv'):
+            raise HTTPException(status_code=400, detail="Streaming training needs a CSV dataset")
+        return {
+            'dataset_id': dataset_id,
+            'target_column': target_column,
+            'model_type': model_type,
+            'path': path,
+            'epochs': epochs,
+            'chunk_size': chunk_size,
+            'holdout_fraction': holdout_fraction,
+            'hash_n_features': hash_n_features,
+            'hyperparameters': hyperparameters or {},
+            'random_state': random_state
+        }
+
+    @classmethod
+    def run(cls, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Scan, shard and train (runs in a worker process).
+
+        Args:
+            payload: Payload from prepare()
+
+        Returns:
+            Dictionary with the fitted pipeline, encoder, metrics and
+            per-epoch holdout scores
+        """
+        shard_dir = os.path.join(settings.TEMP_DIR, 'streams', uuid.uuid4().hex)
+        try:
+            started = time.perf_counter()
+            logger.info(f"Streaming training on {payload['path']} ({payload['chunk_size']} rows per chunk)")
+
+            schema = cls._scan(payload)
+            task = 'regression' if schema['is_regression'] else f"{len(schema['classes'])} classes"
+            logger.info(
+                f"Scanned {schema['n_rows']} rows: {len(schema['categorical_columns'])} categorical, "
+                f"{len(schema['input_columns']) - len(schema['categorical_columns'])} numeric columns, {task}"
+            )
+
+            encoder = FeatureEncoder.from_schema(
+                schema['input_columns'],
+                schema['categorical_columns'],
+                schema['fill_values'],
+                hash_n_features=payload['hash_n_features'],
+                is_classification=not schema['is_regression']
+            )
+            os.makedirs(shard_dir)
+            scaler = MaxAbsScaler()
+            with Metrics.span('encode'):
+                shards = cls._write_shards(payload, schema, encoder, scaler, shard_dir)
+            n_train = sum(n for _, n in shards['train'])
+            n_holdout = sum(n for _, n in shards['holdout'])
+            if not n_train or not n_holdout:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Not enough rows for both training and holdout; adjust holdout_fraction"
+                )
+            logger.info(f"Wrote {len(shards['train'])} train shards ({n_train} rows), {n_holdout} holdout rows")
+
+            model_type = payload['model_type']
+            model = cls._create_estimator(model_type, schema['is_regression'], payload['hyperparameters'], payload['random_state'])
+            # Naive Bayes accumulates sufficient statistics: more passes would only recount rows
+            epochs = 1 if model_type == ModelType.NAIVE_BAYES else payload['epochs']
+            dense = model_type == ModelType.NAIVE_BAYES
+            classes = None if schema['is_regression'] else np.asarray(schema['classes'])
+            rng = np.random.RandomState(payload['random_state'])
+
+            history = []
+            metrics = None
+            for epoch in range(1, epochs + 1):
+                epoch_started = time.perf_counter()
+                with Metrics.span('fit'):
+                    for index in rng.permutation(len(shards['train'])):
+                        X, y = cls._load_shard(shards['train'][index][0], classes)
+                        order = rng.permutation(len(y))
+                        X = scaler.transform(X[order])
+                        if dense:
+                            X = X.toarray()
+                        if classes is None:
+                            model.partial_fit(X, y[order])
+                        else:
+                            model.partial_fit(X, y[order], classes=classes)
+                with Metrics.span('predict'):
+                    metrics = cls._evaluate(model, scaler, shards['holdout'], classes, dense)
+                history.append({
+                    'epoch': epoch,
+                    'holdout_score': metrics['accuracy'],
+                    'elapsed_s': time.perf_counter() - epoch_started
+                })
+                logger.info(f"Epoch {epoch}: holdout {'R²' if classes is None else 'accuracy'} {metrics['accuracy']:.4f}")
+
+            steps = [('scale', scaler), ('model', model)]
+            if dense:
+                steps.insert(1, ('densify', FunctionTransformer(_densify, accept_sparse=True)))
+            pipeline = Pipeline(steps)
+            Metrics.increment('model_fits_total', {'model_type': model_type.value})
+            logger.info(f"Streaming training completed in {time.perf_counter() - started:.1f}s")
+            return {
+                'model': pipeline,
+                'encoder': encoder,
+                'metrics': metrics,
+                'is_regression': schema['is_regression'],
+                'feature_names': list(encoder.feature_names),
+                'hyperparameters': model.get_params(),
+                'streaming': {
+                    'epochs': history,
+                    'n_rows': schema['n_rows'],
+                    'n_skipped_rows': schema['n_skipped_rows'],
+                    'n_train_rows': n_train,
+                    'n_holdout_rows': n_holdout,
+                    'n_chunks': len(shards['train']),
+                    'chunk_size': payload['chunk_size'],
+                    'holdout_fraction': payload['holdout_fraction'],
+                    'elapsed_s': time.perf_counter() - started
+                }
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error in streaming training: {str(e)}"
+            )
+        finally:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+
+    @classmethod
+    def store_result(cls, payload: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Register a streamed model and build the training response.
+
+        Args:
+            payload: Payload from prepare()
+            result: Result from run()
+
+        Returns:
+            Dictionary with training results, metrics and streaming details
+        """
+        model_type = payload['model_type']
+        metrics = result['metrics']
+        model_id = f"{payload['dataset_id']}_{model_type.value}"
+        record = ModelRegistry.register(
+            model_id,
+            estimator=result['model'],
+            encoder=result['encoder'],
+            metadata={
+                'model_type': model_type.value,
+                'dataset_id': payload['dataset_id'],
+                'target_column': payload['target_column'],
+                'is_regression': result['is_regression'],
+                'feature_names': result['feature_names'],
+                'metrics': metrics,
+                'feature_importance': None,
+                'hyperparameters': result['hyperparameters'],
+                'search': None,
+                'split_id': None,
+                'cv': None,
+                'split': {
+                    'streamed': True,
+                    'holdout_fraction': payload['holdout_fraction'],
+                    'random_state': payload['random_state'],
+                    'preprocessing_plan': {
+                        'categorical_encoding': 'hashing',
+                        'hash_n_features': payload['hash_n_features']
+                    }
+                },
+                'streaming': result['streaming'],
+                'cached': False
+            }
+        )
+        logger.info(f"Model stored with ID: {record['model_id']}")
+
+        return {
+            'model_id': model_id,
+            'version': record['version'],
+            'model_type': model_type.value,
+            'split_id': None,
+            'accuracy': metrics['accuracy'],
+            'cv_score': None,
+            'precision': metrics.get('precision'),
+            'recall': metrics.get('recall'),
+            'f1_score': metrics.get('f1_score'),
+            'confusion_matrix': metrics['confusion_matrix'],
+            'class_labels': metrics['class_labels'],
+            'feature_importance': None,
+            'search': None,
+            'cached': False,
+            'streaming': result['streaming']
+        }
+
+    @classmethod
+    def _chunks(cls, payload: Dict[str, Any], dtypes: Optional[Dict[str, Any]] = None) -> Iterator[pd.DataFrame]:
+        """Read the dataset file chunk by chunk."""
+        reader = pd.read_csv(payload['path'], chunksize=payload['chunk_size'], dtype=dtypes)
+        try:
+            yield from reader
+        finally:
+            reader.close()
+
+    @classmethod
+    def _scan(cls, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        First pass: column roles, numeric fill values and target classes.
+
+        A column is categorical if any chunk parses it as text. Missing
+        numeric values are filled with the column mean (a median would need
+        the whole column).
+        """
+        target = payload['target_column']
+        input_columns: Optional[List[str]] = None
+        categorical = set()
+        sums: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        has_missing = set()
+        targets = set()
+        target_numeric = True
+        target_integer = True
+        n_rows = 0
+        n_skipped = 0
+
+        for chunk in cls._chunks(payload):
+            if target not in chunk.columns:
+                raise HTTPException(status_code=400, detail=f"Target column '{target}' not found")
+            if input_columns is None:
+                input_columns = [col for col in chunk.columns if col != target]
+            labelled = chunk[target].notna()
+            n_skipped += int((~labelled).sum())
+            chunk = chunk[labelled]
+            n_rows += len(chunk)
+
+            for col in input_columns:
+                values = chunk[col]
+                if values.dtype == object:
+                    categorical.add(col)
+                    continue
+                if values.isna().any():
+                    has_missing.add(col)
+                sums[col] = sums.get(col, 0.0) + float(values.sum())
+                counts[col] = counts.get(col, 0) + int(values.count())
+
+            y = chunk[target]
+            target_numeric &= pd.api.types.is_numeric_dtype(y)
+            target_integer &= pd.api.types.is_integer_dtype(y)
+            if len(targets) <= MAX_TRACKED_TARGETS:
+                targets.update(y.unique().tolist())
+
+        if not n_rows:
+            raise HTTPException(status_code=400, detail=f"No rows with a value for target '{target}'")
+
+        # Same rule as ModelService._is_regression_task, on the tracked values
+        if not target_numeric:
+            is_regression = False
+        elif target_integer:
+            is_regression = len(targets) > 20
+        else:
+            is_regression = len(targets) > MAX_TRACKED_TARGETS or len(targets) / n_rows > 0.05
+        if not is_regression and len(targets) > MAX_TRACKED_TARGETS:
+            raise HTTPException(status_code=400, detail=f"Target '{target}' has too many classes to stream")
+
+        return {
+            'input_columns': input_columns,
+            'categorical_columns': sorted(categorical),
+            'fill_values': {
+                col: sums[col] / counts[col] if counts.get(col) else 0.0
+                for col in has_missing - categorical
+            },
+            'is_regression': is_regression,
+            'classes': None if is_regression else sorted(targets, key=None if target_numeric else str),
+            'n_rows': n_rows,
+            'n_skipped_rows': n_skipped
+        }
+
+    @classmethod
+    def _write_shards(
+        cls,
+        payload: Dict[str, Any],
+        schema: Dict[str, Any],
+        encoder: FeatureEncoder,
+        scaler: MaxAbsScaler,
+        shard_dir: str
+    ) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Second pass: encode each chunk and write its train and holdout shards.
+
+        Holdout rows are drawn with a per-chunk seed, so the assignment is
+        reproducible; the scaler is fitted on the training rows only.
+        """
+        target = payload['target_column']
+        classes = schema['classes']
+        shards = {'train': [], 'holdout': []}
+        dtypes = {col: str for col in schema['categorical_columns']}
+
+        for i, chunk in enumerate(cls._chunks(payload, dtypes)):
+            chunk = chunk[chunk[target].notna()]
+            if not len(chunk):
+                continue
+            X = encoder.transform(chunk)
+            if classes is None:
+                y = chunk[target].to_numpy(dtype=np.float64)
+            else:
+                # Classes are stored as indices so shards never hold objects
+                y = pd.Categorical(chunk[target], categories=classes).codes.astype(np.int32)
+            holdout = np.random.RandomState(payload['random_state'] + i).random_sample(len(chunk)) < payload['holdout_fraction']
+
+            for part, mask in (('train', ~holdout), ('holdout', holdout)):
+                if not mask.any():
+                    continue
+                base = os.path.join(shard_dir, f"{part}_{i}")
+                sparse.save_npz(f"{base}_X.npz", X[mask], compressed=False)
+                np.save(f"{base}_y.npy", y[mask])
+                shards[part].append((base, int(mask.sum())))
+            if (~holdout).any():
+                scaler.partial_fit(X[~holdout])
+        return shards
+
+    @classmethod
+    def _load_shard(cls, base: str, classes: Optional[np.ndarray]) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        """Read one shard, mapping class indices back to labels."""
+        X = sparse.load_npz(f"{base}_X.npz").tocsr()
+        y = np.load(f"{base}_y.npy")
+        return X, (y if classes is None else classes[y])
+
+    @classmethod
+    def _evaluate(
+        cls,
+        model,
+        scaler: MaxAbsScaler,
+        holdout: List[Tuple[str, int]],
+        classes: Optional[np.ndarray],
+        dense: bool
+    ) -> Dict[str, Any]:
+        """
+        Score the holdout shards with running totals.
+
+        Classification accumulates a confusion matrix and regression the
+        sums behind MSE, MAE and R², so memory does not grow with the
+        holdout size.
+        """
+        if classes is not None:
+            confusion = np.zeros((len(classes), len(classes)), dtype=np.int64)
+        totals = np.zeros(5)  # n, sum y, sum y², squared error, absolute error
+
+        for base, _ in holdout:
+            X, y = cls._load_shard(base, classes)
+            X = scaler.transform(X)
+            y_pred = model.predict(X.toarray() if dense else X)
+            if classes is not None:
+                true_idx = np.searchsorted(classes, y) if classes.dtype != object else pd.Categorical(y, categories=classes).codes
+                pred_idx = np.searchsorted(classes, y_pred) if classes.dtype != object else pd.Categorical(y_pred, categories=classes).codes
+                confusion += np.bincount(
+                    true_idx * len(classes) + pred_idx, minlength=len(classes) ** 2
+                ).reshape(len(classes), len(classes))
+            else:
+                error = y - y_pred
+                totals += (len(y), y.sum(), (y ** 2).sum(), (error ** 2).sum(), np.abs(error).sum())
+
+        if classes is not None:
+            return EvaluationService.classification_from_confusion(confusion, classes)
+        return EvaluationService.regression_from_totals(*totals)
+
+    @classmethod
+    def _create_estimator(
+        cls,
+        model_type: ModelType,
+        is_regression: bool,
+        hyperparameters: Dict[str, Any],
+        random_state: int
+    ):
+        """Create the incremental estimator for a model type and task."""
+        if model_type == ModelType.NAIVE_BAYES:
+            if is_regression:
+                raise HTTPException(status_code=400, detail="Naive Bayes only supports classification targets")
+            return GaussianNB(var_smoothing=hyperparameters.get('var_smoothing', NAIVE_BAYES_VAR_SMOOTHING))
+        params = {
+            'alpha': hyperparameters.get('alpha', 0.0001),
+            'penalty': hyperparameters.get('penalty', 'l2'),
+            'random_state': random_state
+        }
+        if is_regression:
+            return SGDRegressor(**params)
+        return SGDClassifier(loss='log_loss', **params)
+
+
+# Streaming training runs as a background job like regular training
+JobService.register_handler(
+    'stream_train',
+    prepare=lambda request: StreamTrainingService.prepare(**request),
+    run=StreamTrainingService.run,
+    finish=StreamTrainingService.store_result
+)
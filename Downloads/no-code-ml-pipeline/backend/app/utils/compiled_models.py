@@ -0,0 +1,222 @@
+"""
+Array-form evaluators for fitted decision trees and linear models.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.special import expit
+from typing import Any, Dict, Optional
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+
+def _as_matrix(X):
+    """Plain 2-D array (or CSR matrix) without sklearn's input validation."""
+    if isinstance(X, pd.DataFrame):
+        return X.to_numpy(dtype=np.float64)
+    if sparse.issparse(X):
+        return X.tocsr()
+    X = np.asarray(X, dtype=np.float64)
+    return X.reshape(1, -1) if X.ndim == 1 else X
+
+
+class CompiledTree:
+    """
+    Decision tree flattened into node arrays.
+
+    Only the features the tree splits on are kept, renumbered densely.
+    Thresholds are float32 and rounded down, so comparing float32 inputs
+    with them takes exactly the branches sklearn takes. Leaves point to
+    themselves, which lets batches descend a fixed number of levels with
+    no per-row bookkeeping; single rows walk the tree directly.
+    """
+
+    def __init__(self, estimator):
+        tree_ = estimator.tree_
+        if tree_.n_outputs != 1:
+            raise ValueError("multi-output trees are not supported")
+        is_leaf = tree_.children_left == -1
+        nodes = np.arange(tree_.node_count)
+
+        self.features = np.unique(tree_.feature[~is_leaf]).astype(np.intp)
+        feature = np.searchsorted(self.features, tree_.feature)
+        self.feature = np.where(is_leaf, 0, feature).astype(np.intp)
+
+        threshold = tree_.threshold.astype(np.float32)
+        too_high = threshold.astype(np.float64) > tree_.threshold
+        threshold[too_high] = np.nextafter(threshold[too_high], np.float32(-np.inf))
+        self.threshold = np.where(is_leaf, np.float32(np.inf), threshold).astype(np.float32)
+
+        self.left = np.where(is_leaf, nodes, tree_.children_left).astype(np.intp)
+        self.right = np.where(is_leaf, nodes, tree_.children_right).astype(np.intp)
+        self.missing_left = np.asarray(
+            getattr(tree_, 'missing_go_to_left', np.zeros(tree_.node_count)), dtype=bool
+        )
+        self.max_depth = int(tree_.max_depth)
+        self.n_features_in = int(estimator.n_features_in_)
+
+        value = tree_.value[:, 0, :]
+        if isinstance(estimator, DecisionTreeClassifier):
+            self.classes_ = estimator.classes_
+            self.leaf_class = np.argmax(value, axis=1)
+            # Normalized the way DecisionTreeClassifier.predict_proba does it
+            self.leaf_proba = np.ascontiguousarray(value[:, :len(self.classes_)])
+            normalizer = self.leaf_proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            self.leaf_proba /= normalizer
+        else:
+            self.classes_ = None
+            self.leaf_value = value[:, 0].copy()
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Leaf index of every row.
+
+        Args:
+            X: 2-D array, DataFrame or sparse matrix in training column order
+
+        Returns:
+            Array of leaf node indices
+        """
+        X = _as_matrix(X)
+        if X.shape[1] != self.n_features_in:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features_in}")
+        X = X[:, self.features]
+        X = (X.toarray() if sparse.issparse(X) else X).astype(np.float32)
+
+        if len(X) == 1:
+            row = X[0]
+            node = 0
+            while self.left[node] != node:
+                value = row[self.feature[node]]
+                if value <= self.threshold[node] or (value != value and self.missing_left[node]):
+                    node = self.left[node]
+                else:
+                    node = self.right[node]
+            return np.array([node], dtype=np.intp)
+
+        rows = np.arange(len(X))
+        node = np.zeros(len(X), dtype=np.intp)
+        for _ in range(self.max_depth):
+            value = X[rows, self.feature[node]]
+            go_left = (value <= self.threshold[node]) | (np.isnan(value) & self.missing_left[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict(self, X) -> np.ndarray:
+        """Predicted class labels or values."""
+        leaves = self.apply(X)
+        if self.classes_ is None:
+            return self.leaf_value[leaves]
+        return self.classes_.take(self.leaf_class[leaves])
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities (classifiers only)."""
+        if self.classes_ is None:
+            raise ValueError("predict_proba is only available for classifiers")
+        return self.leaf_proba[self.apply(X)]
+
+    def summary(self) -> Dict[str, Any]:
+        """Shape and size of the compiled form."""
+        arrays = [self.feature, self.threshold, self.left, self.right, self.missing_left]
+        arrays.append(self.leaf_value if self.classes_ is None else self.leaf_proba)
+        return {
+            'format': 'tree',
+            'n_nodes': len(self.left),
+            'max_depth': self.max_depth,
+            'n_features_used': len(self.features),
+            'size_bytes': int(sum(a.nbytes for a in arrays))
+        }
+
+
+class CompiledLinear:
+    """
+    Linear model reduced to its weights and intercepts.
+
+    Scores are computed with the same matrix product sklearn uses, and
+    probabilities with the same link (one-vs-rest logistic or softmax), so
+    results match the estimator bit for bit.
+    """
+
+    def __init__(self, estimator):
+        self.coef = np.ascontiguousarray(estimator.coef_, dtype=np.float64)
+        self.intercept = np.asarray(estimator.intercept_, dtype=np.float64)
+        self.n_features_in = int(estimator.n_features_in_)
+        if isinstance(estimator, LogisticRegression):
+            self.classes_ = estimator.classes_
+            self.multinomial = not (
+                estimator.multi_class in ('ovr', 'warn')
+                or (estimator.multi_class == 'auto'
+                    and (len(self.classes_) <= 2 or estimator.solver == 'liblinear'))
+            )
+        else:
+            self.classes_ = None
+            self.multinomial = False
+
+    def decision_function(self, X) -> np.ndarray:
+        """Raw linear scores (one column per class for multiclass models)."""
+        X = _as_matrix(X)
+        if X.shape[1] != self.n_features_in:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features_in}")
+        scores = X @ self.coef.T + self.intercept
+        if self.classes_ is not None and scores.ndim == 2 and scores.shape[1] == 1:
+            return scores.reshape(-1)
+        return np.asarray(scores)
+
+    def predict(self, X) -> np.ndarray:
+        """Predicted class labels or values."""
+        scores = self.decision_function(X)
+        if self.classes_ is None:
+            return scores
+        if scores.ndim == 1:
+            return self.classes_.take((scores > 0).astype(int))
+        return self.classes_.take(scores.argmax(axis=1))
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities (classifiers only)."""
+        if self.classes_ is None:
+            raise ValueError("predict_proba is only available for classifiers")
+        scores = self.decision_function(X)
+        if self.multinomial:
+            if scores.ndim == 1:
+                scores = np.c_[-scores, scores]
+            scores -= scores.max(axis=1).reshape(-1, 1)
+            np.exp(scores, scores)
+            scores /= scores.sum(axis=1).reshape(-1, 1)
+            return scores
+        expit(scores, out=scores)
+        if scores.ndim == 1:
+            return np.vstack([1 - scores, scores]).T
+        scores /= scores.sum(axis=1).reshape(scores.shape[0], -1)
+        return scores
+
+    def summary(self) -> Dict[str, Any]:
+        """Shape and size of the compiled form."""
+        return {
+            'format': 'linear',
+            'n_outputs': int(self.coef.shape[0]) if self.coef.ndim == 2 else 1,
+            'n_features_used': int(np.count_nonzero(np.any(self.coef.reshape(-1, self.n_features_in) != 0, axis=0))),
+            'size_bytes': int(self.coef.nbytes + self.intercept.nbytes)
+        }
+
+
+def compile_estimator(estimator) -> Optional[Any]:
+    """
+    Compile a fitted estimator into its array form.
+
+    Args:
+        estimator: Fitted scikit-learn estimator
+
+    Returns:
+        CompiledTree or CompiledLinear, or None if the estimator type has
+        no compiled form
+
+    Raises:
+        ValueError: If the estimator type is supported but this instance
+            cannot be compiled
+    """
+    if isinstance(estimator, (DecisionTreeClassifier, DecisionTreeRegressor)):
+        return CompiledTree(estimator)
+    if isinstance(estimator, (LogisticRegression, LinearRegression)):
+        return CompiledLinear(estimator)
+    return None
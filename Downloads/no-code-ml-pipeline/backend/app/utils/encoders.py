@@ -0,0 +1,308 @@
+"""
+Feature encoding utilities for train-test splits.
+"""
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Union
+from scipy import sparse
+from sklearn.preprocessing import TargetEncoder
+from sklearn.utils import murmurhash3_32
+
+from app.models.model import CategoricalEncoding
+from app.core.metrics import Metrics
+
+
+class FeatureEncoder:
+    """
+    Encode categorical columns and impute numeric columns.
+
+    The encoder is fitted on the training rows only and then applied to
+    the test rows (and later to new data), so no statistics leak from the
+    test set into training.
+
+    Native encoding is for estimators with built-in categorical and
+    missing-value support: categories become integer codes, and missing
+    or unseen values (categorical or numeric) are left as NaN.
+
+    String, category and boolean columns are treated as categorical.
+    Datetime columns become numeric seconds since the Unix epoch (UTC);
+    any other column type is rejected rather than silently dropped.
+    """
+
+    CATEGORICAL_DTYPES = ['object', 'string', 'category', 'bool']
+    DATETIME_DTYPES = ['datetime', 'datetimetz']
+
+    def __init__(
+        self,
+        encoding: CategoricalEncoding = CategoricalEncoding.LABEL,
+        hash_n_features: int = 1024,
+        is_classification: bool = True,
+        random_state: int = 42,
+        cv: int = 5
+    ):
+        self.encoding = CategoricalEncoding(encoding)
+        self.hash_n_features = hash_n_features
+        self.is_classification = is_classification
+        self.random_state = random_state
+        self.cv = cv
+
+        self.input_columns: List[str] = []
+        self.categorical_columns: List[str] = []
+        self.datetime_columns: List[str] = []
+        self.numeric_columns: List[str] = []
+        self.medians: dict = {}
+        self.label_categories: dict = {}
+        self.target_encoder: Optional[TargetEncoder] = None
+        self.feature_names: List[str] = []
+
+    @classmethod
+    def from_schema(
+        cls,
+        input_columns: List[str],
+        categorical_columns: List[str],
+        fill_values: dict,
+        hash_n_features: int = 1024,
+        is_classification: bool = True
+    ) -> "FeatureEncoder":
+        """
+        Build a fitted hashing encoder from statistics gathered elsewhere.
+
+        Hashing needs no fitted state beyond the column roles and the
+        numeric fill values, so a dataset streamed in chunks can be encoded
+        without ever holding it in memory.
+
+        Args:
+            input_columns: Feature columns in input order
+            categorical_columns: Columns hashed as categories
+            fill_values: Fill value per numeric column with missing values
+            hash_n_features: Width of the hashed feature block
+            is_classification: Whether the target is categorical
+
+        Returns:
+            FeatureEncoder ready to transform
+        """
+        encoder = cls(
+            encoding=CategoricalEncoding.HASHING,
+            hash_n_features=hash_n_features,
+            is_classification=is_classification
+        )
+        encoder.input_columns = list(input_columns)
+        encoder.categorical_columns = [col for col in input_columns if col in categorical_columns]
+        encoder.numeric_columns = [col for col in input_columns if col not in categorical_columns]
+        encoder.medians = dict(fill_values)
+        return encoder
+
+    def fit_transform(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series
+    ) -> Union[pd.DataFrame, sparse.csr_matrix]:
+        """
+        Fit the encoder on training rows and transform them.
+
+        Args:
+            X: Training features
+            y: Training target
+
+        Returns:
+            Encoded training matrix (DataFrame, or CSR matrix for hashing)
+
+        Raises:
+            ValueError: If a column is neither numeric, categorical nor datetime
+        """
+        self.input_columns = X.columns.tolist()
+        self.categorical_columns = X.select_dtypes(include=self.CATEGORICAL_DTYPES).columns.tolist()
+        self.datetime_columns = X.select_dtypes(include=self.DATETIME_DTYPES).columns.tolist()
+        typed = set(self.categorical_columns) | set(self.datetime_columns)
+        # Timedelta and complex dtypes count as numbers to pandas but not to estimators
+        unsupported = [
+            col for col in X.columns
+            if col not in typed and not (
+                pd.api.types.is_numeric_dtype(X[col])
+                and not pd.api.types.is_timedelta64_dtype(X[col])
+                and not pd.api.types.is_complex_dtype(X[col])
+            )
+        ]
+        if unsupported:
+            raise ValueError(
+                "Unsupported column types: "
+                + ", ".join(f"{col} ({X[col].dtype})" for col in unsupported)
+            )
+        X = self._prepare(X)
+        self.numeric_columns = X.select_dtypes(include=['number']).columns.tolist()
+        self.medians = {}
+        if self.encoding != CategoricalEncoding.NATIVE:
+            self.medians = {
+                col: X[col].median()
+                for col in self.numeric_columns
+                if X[col].isna().any()
+            }
+
+        if self.encoding == CategoricalEncoding.LABEL:
+            for col in self.categorical_columns:
+                values = X[col].fillna('missing').astype(str)
+                self.label_categories[col] = np.sort(values.unique())
+
+        elif self.encoding == CategoricalEncoding.NATIVE:
+            for col in self.categorical_columns:
+                self.label_categories[col] = np.sort(X[col].dropna().astype(str).unique())
+
+        elif self.encoding == CategoricalEncoding.TARGET and self.categorical_columns:
+            self.target_encoder = TargetEncoder(
+                target_type='auto' if self.is_classification else 'continuous',
+                cv=self.cv,
+                shuffle=True,
+                random_state=self.random_state
+            )
+            # fit_transform cross-fits: each training row is encoded with
+            # statistics from the other folds only (out-of-fold encoding)
+            encoded = self.target_encoder.fit_transform(self._categorical_frame(X), y)
+            return self._assemble(X, encoded)
+
+        return self._assemble(X)
+
+    def transform(self, X: pd.DataFrame) -> Union[pd.DataFrame, sparse.csr_matrix]:
+        """
+        Transform rows with the fitted encoding state.
+
+        Args:
+            X: Features with the same columns seen during fit
+
+        Returns:
+            Encoded matrix (DataFrame, or CSR matrix for hashing)
+        """
+        missing_cols = set(self.input_columns) - set(X.columns)
+        if missing_cols:
+            raise ValueError(f"Columns missing from input: {sorted(missing_cols)}")
+        X = self._prepare(X)
+
+        encoded = None
+        if self.encoding == CategoricalEncoding.TARGET and self.categorical_columns:
+            encoded = self.target_encoder.transform(self._categorical_frame(X))
+        return self._assemble(X, encoded)
+
+    def native_categorical_mask(self, max_categories: int = 255) -> Optional[List[bool]]:
+        """
+        Flag the output columns an estimator can treat as categorical.
+
+        Only natively encoded columns with at most ``max_categories``
+        levels qualify; codes of wider columns stay ordinal numbers.
+
+        Args:
+            max_categories: Most levels the estimator supports per feature
+
+        Returns:
+            One flag per output column, or None for other encodings
+        """
+        if self.encoding != CategoricalEncoding.NATIVE:
+            return None
+        return [
+            col in self.label_categories and len(self.label_categories[col]) <= max_categories
+            for col in self.feature_names
+        ]
+
+    def _prepare(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Turn datetime columns into epoch seconds and category columns into objects."""
+        # Encoders pickled before datetime support have no datetime_columns
+        datetime_columns = getattr(self, 'datetime_columns', [])
+        category_columns = [
+            col for col in self.categorical_columns
+            if isinstance(X[col].dtype, pd.CategoricalDtype)
+        ]
+        if not datetime_columns and not category_columns:
+            return X
+        X = X.copy()
+        for col in datetime_columns:
+            # Strings are parsed too, since CSV input at prediction time is not typed
+            stamps = pd.to_datetime(X[col], errors='coerce', utc=True)
+            X[col] = (stamps - pd.Timestamp(0, tz='UTC')).dt.total_seconds()
+        for col in category_columns:
+            X[col] = X[col].astype(object)
+        return X
+
+    def _categorical_frame(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Categorical columns with NaN replaced by a 'missing' level."""
+        return X[self.categorical_columns].fillna('missing').astype(str)
+
+    def _numeric_frame(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Numeric columns with missing values filled by training medians."""
+        numeric = X[self.numeric_columns]
+        if self.medians:
+            with Metrics.span('impute'):
+                numeric = numeric.fillna(self.medians)
+        return numeric
+
+    def _assemble(
+        self,
+        X: pd.DataFrame,
+        target_encoded: Optional[np.ndarray] = None
+    ) -> Union[pd.DataFrame, sparse.csr_matrix]:
+        """Combine numeric and encoded categorical columns."""
+        if self.encoding == CategoricalEncoding.HASHING:
+            numeric = sparse.csr_matrix(self._numeric_frame(X).to_numpy(dtype=np.float64))
+            self.feature_names = list(self.numeric_columns)
+            if not self.categorical_columns:
+                return numeric
+            self.feature_names += [f"hash_{i}" for i in range(self.hash_n_features)]
+            return sparse.hstack([numeric, self._hash_categoricals(X)], format='csr')
+
+        if self.encoding == CategoricalEncoding.TARGET:
+            result = self._numeric_frame(X).copy()
+            if target_encoded is not None:
+                names = self.target_encoder.get_feature_names_out()
+                encoded_df = pd.DataFrame(target_encoded, columns=names, index=X.index)
+                result = pd.concat([result, encoded_df], axis=1)
+            self.feature_names = result.columns.tolist()
+            return result
+
+        if self.encoding == CategoricalEncoding.NATIVE:
+            result = X[self.input_columns].copy()
+            for col in self.categorical_columns:
+                values = X[col].astype(str).where(X[col].notna())
+                codes = pd.Categorical(values, categories=self.label_categories[col]).codes
+                result[col] = np.where(codes >= 0, codes, np.nan)
+            self.feature_names = result.columns.tolist()
+            return result
+
+        # Label encoding keeps the original column layout
+        result = X[self.input_columns].copy()
+        for col in self.categorical_columns:
+            values = X[col].fillna('missing').astype(str)
+            categories = self.label_categories[col]
+            # Values unseen during fit are encoded as -1
+            result[col] = pd.Categorical(values, categories=categories).codes.astype(np.int64)
+        if self.medians:
+            with Metrics.span('impute'):
+                result = result.fillna(self.medians)
+        self.feature_names = result.columns.tolist()
+        return result
+
+    def _hash_categoricals(self, X: pd.DataFrame) -> sparse.csr_matrix:
+        """
+        Hash every categorical value into a fixed-width sparse block.
+
+        Only the distinct values of each column are hashed; rows are then
+        mapped to buckets with vectorized lookups.
+        """
+        n_rows = len(X)
+        n_cols = len(self.categorical_columns)
+        buckets = np.empty((n_rows, n_cols), dtype=np.int64)
+
+        for j, col in enumerate(self.categorical_columns):
+            codes, uniques = pd.factorize(X[col].fillna('missing').astype(str))
+            unique_buckets = np.fromiter(
+                (murmurhash3_32(f"{col}={value}", positive=True) % self.hash_n_features
+                 for value in uniques),
+                dtype=np.int64,
+                count=len(uniques)
+            )
+            buckets[:, j] = unique_buckets[codes]
+
+        rows = np.repeat(np.arange(n_rows), n_cols)
+        data = np.ones(n_rows * n_cols, dtype=np.float64)
+        hashed = sparse.csr_matrix(
+            (data, (rows, buckets.ravel())),
+            shape=(n_rows, self.hash_n_features)
+        )
+        hashed.sum_duplicates()
+        return hashed
@@ -0,0 +1,203 @@
+"""
+Array utilities for fitted scikit-learn decision trees.
+"""
+import numpy as np
+from scipy import sparse
+from typing import Optional, Tuple
+
+
+def node_parents(tree_) -> np.ndarray:
+    """
+    Parent index of every node (-1 for the root).
+
+    Args:
+        tree_: Fitted ``estimator.tree_`` object
+
+    Returns:
+        Array of parent node indices
+    """
+    parents = np.full(tree_.node_count, -1, dtype=np.int64)
+    internal = np.flatnonzero(tree_.children_left != -1)
+    parents[tree_.children_left[internal]] = internal
+    parents[tree_.children_right[internal]] = internal
+    return parents
+
+
+def node_depths(tree_) -> np.ndarray:
+    """
+    Depth of every node (0 for the root).
+
+    Nodes are numbered depth-first, so a parent always precedes its
+    children and one forward pass suffices.
+
+    Args:
+        tree_: Fitted ``estimator.tree_`` object
+
+    Returns:
+        Array of node depths
+    """
+    parents = node_parents(tree_)
+    depths = np.zeros(tree_.node_count, dtype=np.int64)
+    for node in range(1, tree_.node_count):
+        depths[node] = depths[parents[node]] + 1
+    return depths
+
+
+def node_collapse_alphas(tree_) -> np.ndarray:
+    """
+    Smallest ccp_alpha at which each node becomes a leaf.
+
+    Runs minimal cost-complexity (weakest link) pruning on the tree
+    arrays. Pruning the grown tree with ``ccp_alpha=a`` keeps exactly the
+    nodes whose ancestors all have a collapse alpha greater than ``a``.
+
+    Args:
+        tree_: Fitted ``estimator.tree_`` object
+
+    Returns:
+        Array of collapse alphas (-inf for leaves of the grown tree)
+    """
+    n_nodes = tree_.node_count
+    left, right = tree_.children_left, tree_.children_right
+    is_leaf = left == -1
+    parents = node_parents(tree_)
+
+    # Risk of each node as a leaf, weighted by its share of the samples
+    weights = tree_.weighted_n_node_samples
+    node_risk = tree_.impurity * weights / weights[0]
+
+    # Subtree risk, leaf count and size, bottom-up (children follow parents)
+    subtree_risk = np.where(is_leaf, node_risk, 0.0)
+    n_leaves = is_leaf.astype(np.int64)
+    subtree_size = np.ones(n_nodes, dtype=np.int64)
+    for node in range(n_nodes - 1, -1, -1):
+        if not is_leaf[node]:
+            subtree_risk[node] = subtree_risk[left[node]] + subtree_risk[right[node]]
+            n_leaves[node] = n_leaves[left[node]] + n_leaves[right[node]]
+            subtree_size[node] = 1 + subtree_size[left[node]] + subtree_size[right[node]]
+
+    own_alpha = np.full(n_nodes, np.inf)
+    own_alpha[is_leaf] = -np.inf
+    active = ~is_leaf
+    current_alpha = 0.0
+    while active.any():
+        candidates = np.flatnonzero(active)
+        effective = (node_risk[candidates] - subtree_risk[candidates]) / (n_leaves[candidates] - 1)
+        current_alpha = max(current_alpha, float(effective.min()))
+
+        # Prune every weakest link at this alpha; ancestors come first, and
+        # their subtrees (contiguous in depth-first numbering) go with them
+        for node in candidates[effective <= current_alpha + 1e-12]:
+            if not active[node]:
+                continue
+            own_alpha[node] = current_alpha
+            active[node:node + subtree_size[node]] = False
+
+            risk_delta = node_risk[node] - subtree_risk[node]
+            leaves_delta = n_leaves[node] - 1
+            subtree_risk[node] = node_risk[node]
+            n_leaves[node] = 1
+            ancestor = parents[node]
+            while ancestor != -1:
+                subtree_risk[ancestor] += risk_delta
+                n_leaves[ancestor] -= leaves_delta
+                ancestor = parents[ancestor]
+
+    # A node also disappears when any ancestor collapses
+    collapse = own_alpha.copy()
+    for node in range(1, n_nodes):
+        collapse[node] = min(collapse[node], collapse[parents[node]])
+    return collapse
+
+
+def padded_decision_paths(estimator, X) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Root-to-leaf node sequences for a batch of rows.
+
+    Args:
+        estimator: Fitted decision tree
+        X: Rows to route through the tree
+
+    Returns:
+        Tuple of (paths, lengths): ``paths`` is (n_rows, max_depth + 1)
+        with node indices in root-to-leaf order, padded by repeating the
+        leaf; ``lengths`` is the number of nodes on each path
+    """
+    indicator = estimator.decision_path(X).tocsr()
+    # Ancestors have smaller indices than descendants, so sorted = root first
+    indicator.sort_indices()
+    lengths = np.diff(indicator.indptr)
+    steps = np.arange(lengths.max())
+    positions = indicator.indptr[:-1, None] + np.minimum(steps[None, :], lengths[:, None] - 1)
+    return indicator.indices[positions], lengths
+
+
+def node_predictions(estimator) -> np.ndarray:
+    """
+    Prediction each node would make as a leaf.
+
+    Args:
+        estimator: Fitted decision tree (single output)
+
+    Returns:
+        Array of shape (n_nodes, n_classes) with class probabilities for
+        classifiers, or (n_nodes, 1) with the mean target for regressors
+    """
+    value = estimator.tree_.value[:, 0, :].astype(np.float64)
+    if getattr(estimator, 'classes_', None) is None:
+        return value
+    totals = value.sum(axis=1, keepdims=True)
+    return value / np.where(totals > 0, totals, 1.0)
+
+
+def path_contributions(
+    estimator,
+    X,
+    outputs: Optional[np.ndarray] = None
+) -> Tuple[sparse.csr_matrix, np.ndarray, np.ndarray, sparse.csr_matrix]:
+    """
+    Decompose a batch of tree predictions into per-feature contributions.
+
+    Every split on a row's path moves the prediction from the parent's
+    value to the child's; that change is credited to the split feature.
+    The root value plus a row's contributions equals its leaf value. All
+    rows are handled at once from the sparse decision-path indicator and
+    one array of parent-to-child value differences.
+
+    Args:
+        estimator: Fitted decision tree (single output)
+        X: Rows to explain
+        outputs: Column of ``node_predictions`` to explain for each row;
+            None explains the largest leaf value (the predicted class)
+
+    Returns:
+        Tuple of (indicator, outputs, bias, contributions): the (n_rows,
+        n_nodes) decision-path indicator with sorted (root-first) indices,
+        the explained column per row, the root value per row, and a sparse
+        (n_rows, n_features) contribution matrix
+    """
+    tree_ = estimator.tree_
+    values = node_predictions(estimator)
+    parents = node_parents(tree_)
+    # Change in value from each node's parent, credited to the parent's split feature
+    deltas = values - values[np.maximum(parents, 0)]
+    split_feature = tree_.feature[np.maximum(parents, 0)]
+
+    indicator = estimator.decision_path(X).tocsr()
+    indicator.sort_indices()
+    n_rows = indicator.shape[0]
+    if outputs is None:
+        # Each row's last (deepest) node is its leaf
+        leaves = indicator.indices[indicator.indptr[1:] - 1]
+        outputs = values[leaves].argmax(axis=1)
+
+    rows = np.repeat(np.arange(n_rows), np.diff(indicator.indptr))
+    nodes = indicator.indices
+    below_root = parents[nodes] != -1
+    rows, nodes = rows[below_root], nodes[below_root]
+    # Duplicate (row, feature) entries, from features split more than once, are summed
+    contributions = sparse.csr_matrix(
+        (deltas[nodes, outputs[rows]], (rows, split_feature[nodes])),
+        shape=(n_rows, estimator.n_features_in_)
+    )
+    return indicator, outputs, values[0, outputs], contributions
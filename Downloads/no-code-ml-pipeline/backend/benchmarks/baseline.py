@@ -0,0 +1,139 @@
+"""
+Baseline comparison for benchmark results.
+
+Every benchmark writes a flat ``metrics`` mapping of metric name to
+seconds next to its detailed results. A run is compared to a stored
+baseline metric by metric; a metric regresses when it is slower by more
+than the relative tolerance and by more than an absolute floor (so
+millisecond stages do not flap on timer noise).
+"""
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_MIN_DELTA_S = 0.05
+
+
+def load(path: str) -> Dict[str, Any]:
+    """Read a results JSON file."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(
+    current: Dict[str, float],
+    baseline: Dict[str, float],
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta_s: float = DEFAULT_MIN_DELTA_S
+) -> List[Dict[str, Any]]:
+    """
+    Compare metrics with a baseline.
+
+    Args:
+        current: Metric name -> seconds of this run
+        baseline: Metric name -> seconds of the baseline
+        tolerance: Allowed relative slowdown (0.2 = 20%)
+        min_delta_s: Slowdowns below this many seconds never count
+
+    Returns:
+        One row per metric with both values, the ratio and a status of
+        ok, regression, improvement, new or missing
+    """
+    rows = []
+    for name in sorted(set(current) | set(baseline)):
+        now, before = current.get(name), baseline.get(name)
+        row = {'metric': name, 'current_s': now, 'baseline_s': before, 'ratio': None}
+        if now is None:
+            row['status'] = 'missing'
+        elif before is None:
+            row['status'] = 'new'
+        else:
+            row['ratio'] = now / before if before > 0 else None
+            if now > before * (1 + tolerance) and now - before > min_delta_s:
+                row['status'] = 'regression'
+            elif now < before / (1 + tolerance) and before - now > min_delta_s:
+                row['status'] = 'improvement'
+            else:
+                row['status'] = 'ok'
+        rows.append(row)
+    return rows
+
+
+def report(rows: List[Dict[str, Any]], stream=None) -> bool:
+    """
+    Print a comparison table.
+
+    Args:
+        rows: Result of compare()
+        stream: Output stream (stderr by default)
+
+    Returns:
+        True when no metric regressed
+    """
+    stream = stream or sys.stderr
+    width = max([len(row['metric']) for row in rows] + [6])
+    stream.write(f"{'metric':<{width}}  {'baseline':>10}  {'current':>10}  {'ratio':>6}  status\n")
+    for row in rows:
+        before = f"{row['baseline_s']:.3f}" if row['baseline_s'] is not None else '-'
+        now = f"{row['current_s']:.3f}" if row['current_s'] is not None else '-'
+        ratio = f"{row['ratio']:.2f}" if row['ratio'] is not None else '-'
+        stream.write(f"{row['metric']:<{width}}  {before:>10}  {now:>10}  {ratio:>6}  {row['status']}\n")
+    regressions = [row['metric'] for row in rows if row['status'] == 'regression']
+    if regressions:
+        stream.write(f"{len(regressions)} regression(s): {', '.join(regressions)}\n")
+    return not regressions
+
+
+def check(
+    results: Dict[str, Any],
+    baseline_path: Optional[str],
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta_s: float = DEFAULT_MIN_DELTA_S
+) -> bool:
+    """
+    Compare results with a baseline file, if one is given, and report.
+
+    Args:
+        results: Benchmark results with a ``metrics`` mapping
+        baseline_path: Baseline results file (None skips the comparison)
+        tolerance: Allowed relative slowdown
+        min_delta_s: Slowdowns below this many seconds never count
+
+    Returns:
+        True when there is no baseline or nothing regressed
+    """
+    if not baseline_path:
+        return True
+    baseline = load(baseline_path)
+    return report(compare(results['metrics'], baseline.get('metrics', {}), tolerance, min_delta_s))
+
+
+def add_arguments(parser):
+    """Add the --output/--baseline/--tolerance/--min-delta options to a CLI."""
+    parser.add_argument('--output', help="write the JSON results here as well as to stdout")
+    parser.add_argument('--baseline', help="results JSON of an earlier run to compare with")
+    parser.add_argument(
+        '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+        help="relative slowdown counted as a regression (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--min-delta', type=float, default=DEFAULT_MIN_DELTA_S,
+        help="slowdowns below this many seconds are ignored (default: %(default)s)"
+    )
+
+
+def finish(results: Dict[str, Any], args) -> int:
+    """
+    Write results as parsed by add_arguments() and compare with the baseline.
+
+    Returns:
+        Process exit code: 1 when a metric regressed
+    """
+    text = json.dumps(results, indent=2, default=str)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0 if check(results, args.baseline, args.tolerance, args.min_delta) else 1
@@ -0,0 +1,164 @@
+"""
+Seeded synthetic dataset generator for the benchmarks.
+
+Run from the backend directory:
+
+    python -m benchmarks.datagen --rows 1000000 --output data.csv
+
+Rows are generated and written in blocks, so 10M-row files do not need
+10M rows in memory. Each block has its own seed derived from the base seed,
+so a file is fully determined by its spec.
+"""
+import argparse
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+# Row counts of the standard benchmark scales
+SCALES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+
+# Rows generated per block; blocks are the unit of seeding
+BLOCK_ROWS = 100_000
+
+TARGET_COLUMN = 'target'
+
+
+def dataset_spec(
+    rows: int,
+    numeric: int = 8,
+    categorical: int = 4,
+    cardinality: int = 50,
+    missing_rate: float = 0.05,
+    task: str = 'classification',
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Describe a synthetic dataset.
+
+    Args:
+        rows: Number of rows
+        numeric: Number of numeric feature columns
+        categorical: Number of categorical feature columns
+        cardinality: Distinct values per categorical column
+        missing_rate: Share of feature cells left empty
+        task: 'classification' (binary string target) or 'regression'
+        seed: Base random seed
+
+    Returns:
+        Specification accepted by generate()
+    """
+    if task not in ('classification', 'regression'):
+        raise ValueError(f"task must be 'classification' or 'regression', not {task}")
+    if not 0 <= missing_rate < 1:
+        raise ValueError("missing_rate must be in [0, 1)")
+    return {
+        'rows': int(rows),
+        'numeric': int(numeric),
+        'categorical': int(categorical),
+        'cardinality': int(cardinality),
+        'missing_rate': float(missing_rate),
+        'task': task,
+        'seed': int(seed)
+    }
+
+
+def feature_columns(spec: Dict[str, Any]) -> List[str]:
+    """Names of the feature columns, numeric first."""
+    return (
+        [f"num_{i}" for i in range(spec['numeric'])] +
+        [f"cat_{i}" for i in range(spec['categorical'])]
+    )
+
+
+def _effects(spec: Dict[str, Any]):
+    """Fixed per-column weights and per-category offsets shared by every block."""
+    rng = np.random.default_rng(spec['seed'])
+    weights = rng.normal(size=spec['numeric'])
+    offsets = rng.normal(scale=0.5, size=(spec['categorical'], spec['cardinality']))
+    # Zipf-like category frequencies: a few common values and a long tail
+    frequencies = 1.0 / np.arange(1, spec['cardinality'] + 1)
+    return weights, offsets, frequencies / frequencies.sum()
+
+
+def generate_block(spec: Dict[str, Any], block: int, n_rows: int) -> pd.DataFrame:
+    """
+    Generate one block of rows.
+
+    Args:
+        spec: Dataset specification
+        block: Block index (selects the block's seed)
+        n_rows: Rows in the block
+
+    Returns:
+        DataFrame with the feature columns and the target
+    """
+    weights, offsets, frequencies = _effects(spec)
+    rng = np.random.default_rng([spec['seed'], block])
+
+    numeric = rng.normal(size=(n_rows, spec['numeric']))
+    codes = rng.choice(spec['cardinality'], size=(n_rows, spec['categorical']), p=frequencies)
+    signal = numeric @ weights + offsets[np.arange(spec['categorical']), codes].sum(axis=1)
+    signal += rng.normal(scale=0.5, size=n_rows)
+
+    columns = {f"num_{i}": numeric[:, i] for i in range(spec['numeric'])}
+    for i in range(spec['categorical']):
+        labels = np.array([f"c{i}_{k}" for k in range(spec['cardinality'])], dtype=object)
+        columns[f"cat_{i}"] = labels[codes[:, i]]
+    df = pd.DataFrame(columns)
+
+    if spec['missing_rate'] > 0:
+        missing = rng.random(size=df.shape) < spec['missing_rate']
+        df = df.mask(missing)
+
+    if spec['task'] == 'classification':
+        df[TARGET_COLUMN] = np.where(signal > np.median(signal), 'yes', 'no')
+    else:
+        df[TARGET_COLUMN] = signal
+    return df
+
+
+def generate(spec: Dict[str, Any], path: str) -> str:
+    """
+    Write a dataset to CSV block by block.
+
+    Args:
+        spec: Dataset specification
+        path: Output CSV path
+
+    Returns:
+        The output path
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', newline='') as f:
+        for block, start in enumerate(range(0, spec['rows'], BLOCK_ROWS)):
+            n_rows = min(BLOCK_ROWS, spec['rows'] - start)
+            generate_block(spec, block, n_rows).to_csv(f, index=False, header=block == 0)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic CSV dataset.")
+    parser.add_argument('--rows', default='10k', help=f"row count or a scale ({', '.join(SCALES)})")
+    parser.add_argument('--numeric', type=int, default=8)
+    parser.add_argument('--categorical', type=int, default=4)
+    parser.add_argument('--cardinality', type=int, default=50)
+    parser.add_argument('--missing-rate', type=float, default=0.05)
+    parser.add_argument('--task', choices=('classification', 'regression'), default='classification')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    rows = SCALES.get(args.rows.lower()) or int(args.rows)
+    spec = dataset_spec(
+        rows, args.numeric, args.categorical, args.cardinality, args.missing_rate, args.task, args.seed
+    )
+    print(generate(spec, args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Startup benchmark: app import time, time to /health and time to /ready.
+
+Run from the backend directory:
+
+    python -m benchmarks.startup --repeats 5 --output startup.json
+    python -m benchmarks.startup --baseline startup.json  # exits 1 on a regression
+
+Every measurement starts a fresh interpreter, so module caches of earlier
+runs do not hide import cost (the OS file cache still warms up after the
+first run; the median is reported next to the minimum for that reason).
+"""
+import argparse
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+from benchmarks import baseline
+
+
+IMPORT_SNIPPET = (
+    "import sys, time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started); "
+    "print(','.join(m for m in ('numpy', 'pandas', 'sklearn', 'scipy', 'matplotlib') if m in sys.modules))"
+)
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    """Min, median and max of repeated timings in seconds."""
+    return {'min_s': min(samples), 'median_s': statistics.median(samples), 'max_s': max(samples)}
+
+
+def measure_import(repeats: int) -> Dict[str, Any]:
+    """
+    Time ``import app.main`` in fresh interpreters.
+
+    Args:
+        repeats: Number of interpreters started
+
+    Returns:
+        Timing summary and the heavy modules loaded by the import
+    """
+    samples = []
+    heavy_modules: List[str] = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-W', 'ignore', '-c', IMPORT_SNIPPET],
+            check=True, capture_output=True, text=True
+        ).stdout.split('\n')
+        samples.append(float(output[0]))
+        heavy_modules = [m for m in output[1].split(',') if m]
+    return {**_summary(samples), 'samples_s': samples, 'heavy_modules_loaded': heavy_modules}
+
+
+def _free_port() -> int:
+    """An unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, deadline: float) -> Optional[float]:
+    """Poll url until it answers 200; return the time it did (None on timeout)."""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except OSError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def measure_server(repeats: int, timeout_s: float = 120.0) -> Dict[str, Any]:
+    """
+    Time a uvicorn server from process start to /health and to /ready.
+
+    Args:
+        repeats: Number of servers started
+        timeout_s: Give up on a server after this long
+
+    Returns:
+        Timing summaries for both endpoints
+    """
+    health, ready = [], []
+    for _ in range(repeats):
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, '-W', 'ignore', '-m', 'uvicorn', 'app.main:app', '--port', str(port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            deadline = started + timeout_s
+            health_at = _wait_for(f"{base}/health", deadline)
+            ready_at = _wait_for(f"{base}/ready", deadline)
+            if health_at is None or ready_at is None:
+                raise RuntimeError(f"Server did not become ready within {timeout_s}s")
+            health.append(health_at - started)
+            ready.append(ready_at - started)
+        finally:
+            server.terminate()
+            server.wait()
+    return {'health': _summary(health), 'ready': _summary(ready)}
+
+
+def run(repeats: int = 5, server: bool = True) -> Dict[str, Any]:
+    """
+    Run the startup benchmark.
+
+    Args:
+        repeats: Repetitions of each measurement
+        server: Also time a real server to /health and /ready
+
+    Returns:
+        JSON-serializable results
+    """
+    results = {
+        'benchmark': 'startup',
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'import_app': measure_import(repeats)
+    }
+    metrics = {'startup.import_app': results['import_app']['median_s']}
+    if server:
+        results['server'] = measure_server(repeats)
+        metrics['startup.health'] = results['server']['health']['median_s']
+        metrics['startup.ready'] = results['server']['ready']['median_s']
+    results['metrics'] = metrics
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeats', type=int, default=5, help="repetitions of each measurement")
+    parser.add_argument('--no-server', action='store_true', help="only time the import")
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    sys.exit(baseline.finish(run(args.repeats, server=not args.no_server), args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,478 @@
+"""
+End-to-end pipeline benchmark on synthetic data.
+
+Run from the backend directory:
+
+    python -m benchmarks.suite --scale 10k --output bench-10k.json
+    python -m benchmarks.suite --scale 1m --models decision_tree,hist_gradient_boosting \\
+        --baseline bench-1m.json  # exits 1 on a regression
+
+Every stage of the pipeline (upload, profile, preview, preprocess, split,
+train, predict) is timed twice: through the service classes, and through
+the FastAPI app in-process over ASGI, which adds routing, validation,
+serialization and the training job queue. Training covers every selected
+model type with every selected search strategy it supports.
+
+The benchmark points UPLOAD_DIR, TEMP_DIR and MODEL_DIR at a scratch
+directory, lifts MAX_UPLOAD_SIZE to fit the dataset and turns the
+training result cache off, all through environment variables so the
+training worker processes see the same settings. At 10m rows, restrict
+--models: an exhaustive search over every model type takes hours.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks import baseline, datagen
+
+
+MODEL_TYPES = (
+    'logistic_regression', 'decision_tree', 'sgd_linear', 'hist_gradient_boosting', 'naive_bayes'
+)
+SEARCH_STRATEGIES = ('grid', 'random', 'halving', 'bayesian', 'path', 'pruning')
+
+# Rows sent to the predict stage (the head of the dataset, without the target)
+DEFAULT_PREDICT_ROWS = 100_000
+
+
+def _strategy_supported(model_type: str, strategy: str, task: str) -> bool:
+    """Whether ModelService accepts a search strategy for a model type."""
+    if strategy == 'path':
+        return model_type == 'logistic_regression' and task == 'classification'
+    if strategy == 'pruning':
+        return model_type == 'decision_tree'
+    return True
+
+
+def training_matrix(models: List[str], strategies: List[str], task: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Model type and search strategy pairs to train.
+
+    Args:
+        models: Model types
+        strategies: Search strategies, or ['default'] for each model's default
+        task: 'classification' or 'regression'
+
+    Returns:
+        (model_type, strategy) pairs; strategy None means the default
+    """
+    if strategies == ['default']:
+        return [(model_type, None) for model_type in models]
+    return [
+        (model_type, strategy)
+        for model_type in models
+        for strategy in strategies
+        if _strategy_supported(model_type, strategy, task)
+    ]
+
+
+class Timings:
+    """Per-stage timings of one benchmark mode."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, stage: str, seconds: float, rows: Optional[int] = None, error: Optional[str] = None):
+        """Store a stage's duration (or its error) and report progress on stderr."""
+        entry: Dict[str, Any] = {'status': 'error' if error else 'ok', 'seconds': seconds}
+        if rows:
+            entry['rows'] = rows
+            entry['rows_per_s'] = rows / seconds if seconds > 0 else None
+        if error:
+            entry['error'] = error
+        self.stages[stage] = entry
+        outcome = f"error: {error}" if error else f"{seconds:.3f}s"
+        sys.stderr.write(f"[{self.mode}] {stage}: {outcome}\n")
+
+    def metrics(self) -> Dict[str, float]:
+        """Flat metric name -> seconds of the stages that succeeded."""
+        return {
+            f"{self.mode}.{stage}": entry['seconds']
+            for stage, entry in self.stages.items()
+            if entry['status'] == 'ok'
+        }
+
+
+def _time(timings: Timings, stage: str, fn: Callable[[], Any], rows: Optional[int] = None) -> Any:
+    """Run fn, recording its duration or failure; failures return None."""
+    started = time.perf_counter()
+    try:
+        result = fn()
+    except Exception as e:
+        timings.record(stage, time.perf_counter() - started, error=_describe(e))
+        return None
+    timings.record(stage, time.perf_counter() - started, rows)
+    return result
+
+
+async def _time_async(timings: Timings, stage: str, fn, rows: Optional[int] = None) -> Any:
+    """Async counterpart of _time for ASGI requests."""
+    started = time.perf_counter()
+    try:
+        result = await fn()
+    except Exception as e:
+        timings.record(stage, time.perf_counter() - started, error=_describe(e))
+        return None
+    timings.record(stage, time.perf_counter() - started, rows)
+    return result
+
+
+def _describe(error: Exception) -> str:
+    """Readable error text (HTTPException keeps its detail in .detail)."""
+    detail = getattr(error, 'detail', None)
+    return f"{type(error).__name__}: {detail if detail is not None else error}"
+
+
+def _hyperparameters(strategy: Optional[str], args) -> Dict[str, Any]:
+    """Training hyperparameters carrying the search options."""
+    options: Dict[str, Any] = {'cv_folds': args.cv_folds}
+    if strategy:
+        options['search_strategy'] = strategy
+    if args.max_fits:
+        options['max_fits'] = args.max_fits
+    if args.time_budget:
+        options['time_budget_s'] = args.time_budget
+    return options
+
+
+def _train_stage(model_type: str, strategy: Optional[str]) -> str:
+    """Stage name of a training run."""
+    return f"train.{model_type}.{strategy or 'default'}"
+
+
+def run_services(data_path: str, predict_path: str, spec: Dict[str, Any], args) -> Timings:
+    """
+    Time the pipeline through the service classes in this process.
+
+    Args:
+        data_path: Dataset CSV
+        predict_path: CSV of rows to predict
+        spec: Dataset specification
+        args: Parsed command line
+
+    Returns:
+        Stage timings
+    """
+    from app.core.config import settings
+    from app.models.model import CategoricalEncoding, ModelType
+    from app.models.preprocess import ScalerType
+    from app.services.dataset_service import DatasetService
+    from app.services.model_service import ModelService
+    from app.services.prediction_service import PredictionService
+    from app.services.preprocess_service import PreprocessService
+    from app.services.split_service import SplitService
+
+    timings = Timings('service')
+    rows = spec['rows']
+    dataset_id = str(uuid.uuid4())
+    upload_path = os.path.join(settings.UPLOAD_DIR, f"{dataset_id}.csv")
+
+    def upload():
+        shutil.copyfile(data_path, upload_path)
+        return DatasetService.load_dataset(dataset_id, upload_path)
+
+    if _time(timings, 'upload', upload, rows) is None:
+        return timings
+    _time(timings, 'profile', lambda: DatasetService.get_target_recommendations(dataset_id), rows)
+    _time(timings, 'preview', lambda: DatasetService.get_dataset_preview(dataset_id), rows)
+
+    _time(
+        timings, 'preprocess',
+        lambda: PreprocessService.apply_scaling(dataset_id, ScalerType.STANDARD, target_column=datagen.TARGET_COLUMN),
+        rows
+    )
+    split = _time(
+        timings, 'split',
+        lambda: SplitService.perform_split(
+            dataset_id, datagen.TARGET_COLUMN, categorical_encoding=CategoricalEncoding(args.encoding)
+        ),
+        rows
+    )
+    if split is None:
+        return timings
+
+    predict_models: Dict[str, str] = {}
+    for model_type, strategy in training_matrix(args.models, args.strategies, spec['task']):
+        result = _time(
+            timings, _train_stage(model_type, strategy),
+            lambda: ModelService.train_model(
+                dataset_id, ModelType(model_type), datagen.TARGET_COLUMN,
+                _hyperparameters(strategy, args), split_id=split[0]
+            ),
+            rows
+        )
+        if result is not None:
+            predict_models.setdefault(model_type, result['model_id'])
+
+    for model_type, model_id in predict_models.items():
+        def predict():
+            loaded = PredictionService.load(model_id)
+            size = PredictionService.chunk_size()
+            with open(predict_path, 'rb') as source:
+                chunks = PredictionService.csv_chunks(loaded, source, size)
+                for _ in PredictionService.serialize(PredictionService.predict_chunks(loaded, chunks, False), 'csv'):
+                    pass
+
+        _time(timings, f"predict.{model_type}", predict, args.predict_rows)
+    return timings
+
+
+async def run_asgi(data_path: str, predict_path: str, spec: Dict[str, Any], args) -> Timings:
+    """
+    Time the pipeline through the FastAPI app, in-process over ASGI.
+
+    Args:
+        data_path: Dataset CSV
+        predict_path: CSV of rows to predict
+        spec: Dataset specification
+        args: Parsed command line
+
+    Returns:
+        Stage timings
+    """
+    import httpx
+    from app.main import app
+    from app.core.config import settings
+
+    timings = Timings('asgi')
+    rows = spec['rows']
+    api = settings.API_PREFIX
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=None) as client:
+        async def call(method: str, url: str, **kwargs) -> Dict[str, Any]:
+            response = await client.request(method, url, **kwargs)
+            if response.status_code != 200:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:300]}")
+            return response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
+
+        async def upload():
+            with open(data_path, 'rb') as f:
+                return await call('POST', f"{api}/upload", files={'file': ('benchmark.csv', f, 'text/csv')})
+
+        uploaded = await _time_async(timings, 'upload', upload, rows)
+        if uploaded is None:
+            return timings
+        dataset_id = uploaded['dataset_id']
+
+        await _time_async(
+            timings, 'profile', lambda: call('GET', f"{api}/dataset/{dataset_id}/target-recommendations"), rows
+        )
+        await _time_async(timings, 'preview', lambda: call('GET', f"{api}/dataset/{dataset_id}/preview"), rows)
+        await _time_async(
+            timings, 'preprocess',
+            lambda: call('POST', f"{api}/preprocess", json={
+                'dataset_id': dataset_id, 'scaler_type': 'standard', 'target_column': datagen.TARGET_COLUMN
+            }),
+            rows
+        )
+        split = await _time_async(
+            timings, 'split',
+            lambda: call('POST', f"{api}/train-test-split", json={
+                'dataset_id': dataset_id, 'target_column': datagen.TARGET_COLUMN,
+                'categorical_encoding': args.encoding
+            }),
+            rows
+        )
+        if split is None:
+            return timings
+
+        predict_models: Dict[str, str] = {}
+        for model_type, strategy in training_matrix(args.models, args.strategies, spec['task']):
+            result = await _time_async(
+                timings, _train_stage(model_type, strategy),
+                lambda: call('POST', f"{api}/train-model", json={
+                    'dataset_id': dataset_id, 'model_type': model_type, 'target_column': datagen.TARGET_COLUMN,
+                    'hyperparameters': _hyperparameters(strategy, args), 'split_id': split['split_id']
+                }),
+                rows
+            )
+            if result is not None:
+                predict_models.setdefault(model_type, result['model_id'])
+
+        with open(predict_path, 'rb') as f:
+            body = f.read()
+        for model_type, model_id in predict_models.items():
+            await _time_async(
+                timings, f"predict.{model_type}",
+                lambda: call(
+                    'POST', f"{api}/model/{model_id}/predict?format=csv",
+                    content=body, headers={'content-type': 'text/csv'}
+                ),
+                args.predict_rows
+            )
+    return timings
+
+
+def _configure_environment(workdir: str, data_path: str):
+    """Point the app at scratch directories before it reads its settings."""
+    if 'app.core.config' in sys.modules:
+        raise RuntimeError("Settings were loaded before the benchmark configured them")
+    os.environ.update({
+        'UPLOAD_DIR': os.path.join(workdir, 'uploads'),
+        'TEMP_DIR': os.path.join(workdir, 'temp'),
+        'MODEL_DIR': os.path.join(workdir, 'models'),
+        'MAX_UPLOAD_SIZE': str(os.path.getsize(data_path) + 1),
+        'RESULT_CACHE_ENABLED': 'false',
+        'WARMUP_ON_STARTUP': 'false',
+        'LOG_LEVEL': os.environ.get('LOG_LEVEL', 'WARNING')
+    })
+    for name in ('uploads', 'temp', 'models'):
+        os.makedirs(os.path.join(workdir, name), exist_ok=True)
+
+
+def _dataset(spec: Dict[str, Any], data_dir: str, predict_rows: int) -> Tuple[str, str]:
+    """Generate (or reuse) the dataset and the predict file for a spec."""
+    import pandas as pd
+
+    digest = hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+    data_path = os.path.join(data_dir, f"synthetic-{spec['rows']}-{digest}.csv")
+    predict_path = os.path.join(data_dir, f"synthetic-{spec['rows']}-{digest}-predict-{predict_rows}.csv")
+    if not os.path.exists(data_path):
+        sys.stderr.write(f"Generating {spec['rows']} rows into {data_path}\n")
+        datagen.generate(spec, data_path)
+    if not os.path.exists(predict_path):
+        head = pd.read_csv(data_path, nrows=predict_rows)
+        head.drop(columns=[datagen.TARGET_COLUMN]).to_csv(predict_path, index=False)
+    return data_path, predict_path
+
+
+def _environment() -> Dict[str, Any]:
+    """Versions and hardware the results were measured on."""
+    import numpy
+    import pandas
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'commit': commit
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    """
+    Run the benchmark in the selected modes.
+
+    Args:
+        args: Parsed command line
+
+    Returns:
+        JSON-serializable results with a flat ``metrics`` mapping
+    """
+    rows = datagen.SCALES.get(args.scale.lower()) or int(args.scale)
+    spec = datagen.dataset_spec(
+        rows, args.numeric, args.categorical, args.cardinality, args.missing_rate, args.task, args.seed
+    )
+    args.predict_rows = min(args.predict_rows, rows)
+    data_path, predict_path = _dataset(spec, args.data_dir, args.predict_rows)
+
+    workdir = tempfile.mkdtemp(prefix='pipeline-benchmark-')
+    _configure_environment(workdir, data_path)
+    results: Dict[str, Any] = {
+        'benchmark': 'pipeline',
+        'scale': args.scale,
+        'dataset': spec,
+        'options': {
+            'models': args.models,
+            'strategies': args.strategies,
+            'encoding': args.encoding,
+            'cv_folds': args.cv_folds,
+            'max_fits': args.max_fits,
+            'time_budget_s': args.time_budget,
+            'predict_rows': args.predict_rows
+        },
+        'environment': _environment(),
+        'modes': {},
+        'metrics': {}
+    }
+    try:
+        for mode in args.modes:
+            if mode == 'service':
+                timings = run_services(data_path, predict_path, spec, args)
+            else:
+                timings = asyncio.run(run_asgi(data_path, predict_path, spec, args))
+            results['modes'][mode] = timings.stages
+            results['metrics'].update({f"{args.scale}.{name}": s for name, s in timings.metrics().items()})
+    finally:
+        if 'app.services.job_service' in sys.modules:
+            from app.services.job_service import JobService
+            from app.services.executor import ServiceExecutor
+            JobService.shutdown()
+            ServiceExecutor.shutdown()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def _choices(value: str, allowed, extra=()) -> List[str]:
+    """Parse a comma-separated list, accepting 'all' for every allowed value."""
+    if value == 'all':
+        return list(allowed)
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    unknown = [item for item in items if item not in allowed and item not in extra]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown value(s): {', '.join(unknown)}")
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on synthetic data.")
+    parser.add_argument('--scale', default='10k', help=f"row count or a scale ({', '.join(datagen.SCALES)})")
+    parser.add_argument('--numeric', type=int, default=8, help="numeric feature columns")
+    parser.add_argument('--categorical', type=int, default=4, help="categorical feature columns")
+    parser.add_argument('--cardinality', type=int, default=50, help="distinct values per categorical column")
+    parser.add_argument('--missing-rate', type=float, default=0.05, help="share of empty feature cells")
+    parser.add_argument('--task', choices=('classification', 'regression'), default='classification')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+        '--models', type=lambda v: _choices(v, MODEL_TYPES), default=list(MODEL_TYPES),
+        help="comma-separated model types or 'all' (default: all)"
+    )
+    parser.add_argument(
+        '--strategies', type=lambda v: _choices(v, SEARCH_STRATEGIES, ('default',)), default=['default'],
+        help="comma-separated search strategies, 'all', or 'default' for each model's default"
+    )
+    parser.add_argument('--encoding', default='label', help="categorical encoding of the split")
+    parser.add_argument('--cv-folds', type=int, default=3)
+    parser.add_argument('--max-fits', type=int, help="cap on candidate fits per search")
+    parser.add_argument('--time-budget', type=float, help="search time budget in seconds")
+    parser.add_argument('--predict-rows', type=int, default=DEFAULT_PREDICT_ROWS)
+    parser.add_argument(
+        '--modes', type=lambda v: _choices(v, ('service', 'asgi')), default=['service', 'asgi'],
+        help="service, asgi or both (default)"
+    )
+    parser.add_argument(
+        '--data-dir', default=os.path.join(tempfile.gettempdir(), 'pipeline-benchmark-data'),
+        help="where generated datasets are kept and reused"
+    )
+    parser.add_argument('--keep', action='store_true', help="keep the scratch upload/model directories")
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    sys.exit(baseline.finish(run(args), args))
+
+
+if __name__ == '__main__':
+    main()
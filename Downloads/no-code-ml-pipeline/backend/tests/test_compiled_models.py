@@ -0,0 +1,135 @@
+"""
+Tests for the array-form evaluators in app.utils.compiled_models.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from sklearn.datasets import make_classification, make_regression
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+from app.utils.compiled_models import CompiledLinear, CompiledTree, compile_estimator
+
+
+def _classification(n_classes=2, seed=0):
+    X, y = make_classification(
+        n_samples=400, n_features=8, n_informative=5, n_classes=n_classes, random_state=seed
+    )
+    return X, y
+
+
+def _with_nans(X, seed=0):
+    X = X.copy()
+    rng = np.random.default_rng(seed)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    return X
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize("nan", [False, True])
+def test_tree_classifier_matches_sklearn(n_classes, nan):
+    X, y = _classification(n_classes)
+    if nan:
+        X = _with_nans(X)
+    estimator = DecisionTreeClassifier(random_state=0).fit(X, y)
+    compiled = compile_estimator(estimator)
+
+    assert isinstance(compiled, CompiledTree)
+    np.testing.assert_array_equal(compiled.apply(X), estimator.apply(X))
+    np.testing.assert_array_equal(compiled.predict(X), estimator.predict(X))
+    np.testing.assert_array_equal(compiled.predict_proba(X), estimator.predict_proba(X))
+
+
+@pytest.mark.parametrize("nan", [False, True])
+def test_tree_regressor_matches_sklearn(nan):
+    X, y = make_regression(n_samples=400, n_features=6, noise=5.0, random_state=0)
+    if nan:
+        X = _with_nans(X)
+    estimator = DecisionTreeRegressor(max_depth=8, random_state=0).fit(X, y)
+    compiled = compile_estimator(estimator)
+
+    np.testing.assert_array_equal(compiled.predict(X), estimator.predict(X))
+    with pytest.raises(ValueError):
+        compiled.predict_proba(X)
+
+
+def test_tree_nan_only_at_prediction_time():
+    X, y = _classification(3)
+    estimator = DecisionTreeClassifier(random_state=0).fit(X, y)
+    X_missing = _with_nans(X, seed=1)
+
+    compiled = CompiledTree(estimator)
+    np.testing.assert_array_equal(compiled.predict(X_missing), estimator.predict(X_missing))
+
+
+def test_tree_single_row_matches_batch():
+    X, y = _classification(3)
+    X = _with_nans(X)
+    estimator = DecisionTreeClassifier(random_state=0).fit(X, y)
+    compiled = CompiledTree(estimator)
+
+    for row in X[:50]:
+        np.testing.assert_array_equal(compiled.predict(row), estimator.predict(row.reshape(1, -1)))
+        np.testing.assert_array_equal(
+            compiled.predict_proba(row.reshape(1, -1)), estimator.predict_proba(row.reshape(1, -1))
+        )
+
+
+def test_tree_accepts_dataframe_and_sparse_input():
+    X, y = _classification()
+    estimator = DecisionTreeClassifier(max_depth=5, random_state=0).fit(X, y)
+    compiled = CompiledTree(estimator)
+    expected = estimator.predict(X)
+
+    np.testing.assert_array_equal(compiled.predict(pd.DataFrame(X)), expected)
+    np.testing.assert_array_equal(compiled.predict(sparse.csr_matrix(X)), expected)
+
+
+def test_tree_rejects_wrong_width():
+    X, y = _classification()
+    compiled = CompiledTree(DecisionTreeClassifier(random_state=0).fit(X, y))
+    with pytest.raises(ValueError):
+        compiled.predict(X[:, :3])
+
+
+@pytest.mark.parametrize("n_classes,kwargs", [
+    (2, {}),
+    (3, {}),
+    (3, {'solver': 'liblinear'}),
+])
+def test_logistic_regression_matches_sklearn(n_classes, kwargs):
+    X, y = _classification(n_classes)
+    estimator = LogisticRegression(max_iter=1000, **kwargs).fit(X, y)
+    compiled = compile_estimator(estimator)
+
+    assert isinstance(compiled, CompiledLinear)
+    assert compiled.multinomial == (n_classes > 2 and not kwargs)
+    np.testing.assert_array_equal(compiled.predict(X), estimator.predict(X))
+    np.testing.assert_allclose(compiled.predict_proba(X), estimator.predict_proba(X), rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(compiled.predict_proba(X[:1]), estimator.predict_proba(X[:1]), rtol=1e-12)
+
+
+def test_logistic_regression_string_labels():
+    X, y = _classification(3)
+    labels = np.array(['low', 'mid', 'high'])[y]
+    estimator = LogisticRegression(max_iter=1000).fit(X, labels)
+
+    np.testing.assert_array_equal(CompiledLinear(estimator).predict(X), estimator.predict(X))
+
+
+def test_linear_regression_matches_sklearn():
+    X, y = make_regression(n_samples=300, n_features=6, noise=1.0, random_state=0)
+    estimator = LinearRegression().fit(X, y)
+    compiled = compile_estimator(estimator)
+
+    np.testing.assert_allclose(compiled.predict(X), estimator.predict(X), rtol=1e-12)
+    np.testing.assert_allclose(compiled.predict(X[0]), estimator.predict(X[:1]), rtol=1e-12)
+    with pytest.raises(ValueError):
+        compiled.predict_proba(X)
+
+
+def test_unsupported_estimator_is_not_compiled():
+    X, y = _classification()
+    assert compile_estimator(GaussianNB().fit(X, y)) is None
@@ -0,0 +1,108 @@
+"""
+Tests for FeatureEncoder column handling.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from app.models.model import CategoricalEncoding
+from app.utils.encoders import FeatureEncoder
+
+
+def _frame():
+    return pd.DataFrame({
+        'num': [1.0, np.nan, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0],
+        'flag': [True, False, True, True, False, False, True, False],
+        'cat': pd.Categorical(['a', 'b', None, 'a', 'b', 'a', 'c', 'c']),
+        'when': pd.to_datetime([
+            '2024-01-01', '2024-01-02', None, '2024-03-01',
+            '2024-01-05', '2024-02-01', '2024-02-02', '2024-02-03'
+        ]),
+        'text': ['x', 'y', 'x', None, 'y', 'x', 'y', 'x'],
+    })
+
+
+def _target():
+    return pd.Series([0, 1, 0, 1, 0, 1, 0, 1])
+
+
+def _dense(matrix):
+    return matrix.toarray() if sparse.issparse(matrix) else matrix.to_numpy(dtype=np.float64)
+
+
+@pytest.mark.parametrize("encoding", list(CategoricalEncoding))
+def test_column_roles(encoding):
+    encoder = FeatureEncoder(encoding, hash_n_features=16, cv=2)
+    encoded = encoder.fit_transform(_frame(), _target())
+
+    assert encoder.categorical_columns == ['flag', 'cat', 'text']
+    assert encoder.datetime_columns == ['when']
+    assert encoder.numeric_columns == ['num', 'when']
+    assert encoded.shape[0] == 8
+
+
+@pytest.mark.parametrize("encoding", list(CategoricalEncoding))
+def test_untyped_input_encodes_like_typed_input(encoding):
+    X = _frame()
+    encoder = FeatureEncoder(encoding, hash_n_features=16, cv=2)
+    encoder.fit_transform(X, _target())
+
+    # CSV input at prediction time arrives as strings and plain objects
+    untyped = X.astype({'when': object, 'cat': object})
+    untyped['when'] = [None if pd.isna(v) else v.isoformat() for v in X['when']]
+    np.testing.assert_allclose(_dense(encoder.transform(untyped)), _dense(encoder.transform(X)))
+
+
+def test_label_encoding_of_bool_and_category():
+    encoder = FeatureEncoder(CategoricalEncoding.LABEL)
+    encoded = encoder.fit_transform(_frame(), _target())
+
+    assert encoded['flag'].tolist() == [1, 0, 1, 1, 0, 0, 1, 0]
+    assert encoded['cat'].tolist() == [0, 1, 3, 0, 1, 0, 2, 2]  # 'missing' sorts after 'c'
+
+
+def test_datetimes_become_epoch_seconds_with_median_fill():
+    encoder = FeatureEncoder(CategoricalEncoding.LABEL)
+    encoded = encoder.fit_transform(_frame(), _target())
+
+    assert encoded['when'][0] == pd.Timestamp('2024-01-01', tz='UTC').timestamp()
+    assert encoded['when'][2] == encoder.medians['when']
+
+
+def test_timezone_aware_datetimes():
+    X = pd.DataFrame({'when': pd.to_datetime(['2024-01-01 01:00'] * 2).tz_localize('Europe/Paris')})
+    encoder = FeatureEncoder(CategoricalEncoding.LABEL)
+    encoded = encoder.fit_transform(X, pd.Series([0, 1]))
+
+    assert encoded['when'].tolist() == [pd.Timestamp('2024-01-01 00:00', tz='UTC').timestamp()] * 2
+
+
+def test_unsupported_columns_are_named():
+    X = _frame().assign(gap=pd.to_timedelta([1] * 8, unit='D'))
+    with pytest.raises(ValueError, match=r"gap \(timedelta64\[ns\]\)"):
+        FeatureEncoder().fit_transform(X, _target())
+
+
+def test_transform_requires_training_columns():
+    encoder = FeatureEncoder()
+    encoder.fit_transform(_frame(), _target())
+    with pytest.raises(ValueError, match='text'):
+        encoder.transform(_frame().drop(columns=['text']))
+
+
+def test_unseen_label_is_minus_one():
+    encoder = FeatureEncoder(CategoricalEncoding.LABEL)
+    encoder.fit_transform(_frame(), _target())
+    encoded = encoder.transform(_frame().assign(text='unseen'))
+
+    assert (encoded['text'] == -1).all()
+
+
+def test_native_encoding_keeps_missing_values():
+    encoder = FeatureEncoder(CategoricalEncoding.NATIVE)
+    encoded = encoder.fit_transform(_frame(), _target())
+
+    assert np.isnan(encoded['cat'][2])
+    assert np.isnan(encoded['num'][1])
+    assert encoder.native_categorical_mask() == [False, True, True, False, True]
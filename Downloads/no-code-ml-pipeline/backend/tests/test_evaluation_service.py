@@ -0,0 +1,181 @@
+"""
+Tests comparing EvaluationService metrics with scikit-learn.
+"""
+import numpy as np
+import pytest
+from sklearn import metrics as skm
+from sklearn.preprocessing import label_binarize
+
+from app.core.config import settings
+from app.services.evaluation_service import EvaluationService
+
+
+def _binary(n_rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = rng.integers(0, 2, n_rows)
+    # Rounded scores leave plenty of ties for the curve code to handle
+    positive = np.clip(0.3 * y_true + rng.random(n_rows) * 0.7, 0, 1).round(1)
+    y_score = np.column_stack([1 - positive, positive])
+    return y_true, (positive >= 0.5).astype(int), y_score
+
+
+def _multiclass(n_rows=300, n_classes=3, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = rng.integers(0, n_classes, n_rows)
+    logits = rng.normal(size=(n_rows, n_classes))
+    logits[np.arange(n_rows), y_true] += 1.0
+    y_score = np.exp(logits.round(1))
+    y_score /= y_score.sum(axis=1, keepdims=True)
+    return y_true, y_score.argmax(axis=1), y_score
+
+
+def _bootstrap_reference(rounds, n_rows, random_state, score):
+    """Percentile interval of score over resamples drawn like EvaluationService draws them."""
+    draws = np.random.RandomState(random_state).randint(0, n_rows, size=(rounds, n_rows))
+    values = np.array([score(rows) for rows in draws])
+    tail = (1 - settings.EVALUATION_CONFIDENCE) / 2 * 100
+    return [np.percentile(values, tail), np.percentile(values, 100 - tail)]
+
+
+def test_binary_metrics_match_sklearn():
+    y_true, y_pred, y_score = _binary()
+    result = EvaluationService.classification_metrics(y_true, y_pred, y_score, np.array([0, 1]))
+
+    assert result['accuracy'] == pytest.approx(skm.accuracy_score(y_true, y_pred))
+    assert result['precision'] == pytest.approx(skm.precision_score(y_true, y_pred))
+    assert result['recall'] == pytest.approx(skm.recall_score(y_true, y_pred))
+    assert result['f1_score'] == pytest.approx(skm.f1_score(y_true, y_pred))
+    assert result['confusion_matrix'] == skm.confusion_matrix(y_true, y_pred).tolist()
+    assert result['roc_auc'] == pytest.approx(skm.roc_auc_score(y_true, y_score[:, 1]))
+    assert result['pr_auc'] == pytest.approx(skm.average_precision_score(y_true, y_score[:, 1]))
+
+
+def test_binary_curves_match_sklearn():
+    y_true, y_pred, y_score = _binary()
+    result = EvaluationService.classification_metrics(y_true, y_pred, y_score, np.array([0, 1]))
+
+    fpr, tpr, _ = skm.roc_curve(y_true, y_score[:, 1], drop_intermediate=False)
+    np.testing.assert_allclose(result['curves']['roc']['fpr'], fpr)
+    np.testing.assert_allclose(result['curves']['roc']['tpr'], tpr)
+
+
+def test_multiclass_metrics_match_sklearn():
+    y_true, y_pred, y_score = _multiclass()
+    classes = np.arange(3)
+    result = EvaluationService.classification_metrics(y_true, y_pred, y_score, classes)
+
+    assert result['accuracy'] == pytest.approx(skm.accuracy_score(y_true, y_pred))
+    assert result['precision'] == pytest.approx(skm.precision_score(y_true, y_pred, average='weighted'))
+    assert result['recall'] == pytest.approx(skm.recall_score(y_true, y_pred, average='weighted'))
+    assert result['f1_score'] == pytest.approx(skm.f1_score(y_true, y_pred, average='weighted'))
+    assert result['roc_auc'] == pytest.approx(
+        skm.roc_auc_score(y_true, y_score, multi_class='ovr', average='macro')
+    )
+    assert result['pr_auc'] == pytest.approx(
+        skm.average_precision_score(label_binarize(y_true, classes=classes), y_score, average='macro')
+    )
+
+
+def test_weighted_f1_with_unpredicted_class_matches_sklearn():
+    y_true = np.array(['a', 'b', 'c', 'a', 'b', 'c', 'a'])
+    y_pred = np.array(['a', 'b', 'a', 'a', 'b', 'a', 'b'])
+    result = EvaluationService.classification_metrics(y_true, y_pred)
+
+    assert result['f1_score'] == pytest.approx(
+        skm.f1_score(y_true, y_pred, average='weighted', zero_division=0)
+    )
+    assert result['precision'] == pytest.approx(
+        skm.precision_score(y_true, y_pred, average='weighted', zero_division=0)
+    )
+
+
+def test_regression_metrics_match_sklearn():
+    rng = np.random.default_rng(0)
+    y_true = rng.normal(size=200)
+    y_pred = y_true + rng.normal(scale=0.5, size=200)
+    result = EvaluationService.regression_metrics(y_true, y_pred)
+
+    assert result['r2_score'] == pytest.approx(skm.r2_score(y_true, y_pred))
+    assert result['mse'] == pytest.approx(skm.mean_squared_error(y_true, y_pred))
+    assert result['rmse'] == pytest.approx(np.sqrt(skm.mean_squared_error(y_true, y_pred)))
+    assert result['mae'] == pytest.approx(skm.mean_absolute_error(y_true, y_pred))
+
+
+def test_regression_from_totals_matches_regression_metrics():
+    rng = np.random.default_rng(1)
+    y_true = rng.normal(size=100)
+    y_pred = y_true + rng.normal(scale=0.3, size=100)
+    errors = y_true - y_pred
+    totals = EvaluationService.regression_from_totals(
+        len(y_true), y_true.sum(), (y_true ** 2).sum(), (errors ** 2).sum(), np.abs(errors).sum()
+    )
+    direct = EvaluationService.regression_metrics(y_true, y_pred)
+
+    for name in ('r2_score', 'mse', 'rmse', 'mae'):
+        assert totals[name] == pytest.approx(direct[name])
+
+
+def test_binary_bootstrap_intervals_match_sklearn_resamples():
+    y_true, y_pred, y_score = _binary(n_rows=200)
+    rounds, seed = 200, 7
+    result = EvaluationService.classification_metrics(
+        y_true, y_pred, y_score, np.array([0, 1]), bootstrap_rounds=rounds, random_state=seed
+    )
+    intervals = result['confidence_intervals']
+
+    assert intervals['rounds'] == rounds
+    assert intervals['level'] == settings.EVALUATION_CONFIDENCE
+    references = {
+        'accuracy': lambda rows: skm.accuracy_score(y_true[rows], y_pred[rows]),
+        'f1_score': lambda rows: skm.f1_score(y_true[rows], y_pred[rows], zero_division=0),
+        'roc_auc': lambda rows: skm.roc_auc_score(y_true[rows], y_score[rows, 1]),
+        'pr_auc': lambda rows: skm.average_precision_score(y_true[rows], y_score[rows, 1]),
+    }
+    for name, score in references.items():
+        np.testing.assert_allclose(
+            intervals[name], _bootstrap_reference(rounds, len(y_true), seed, score), err_msg=name
+        )
+
+
+def test_multiclass_bootstrap_f1_interval_matches_sklearn_resamples():
+    y_true, y_pred, y_score = _multiclass(n_rows=150)
+    rounds, seed = 100, 3
+    result = EvaluationService.classification_metrics(
+        y_true, y_pred, y_score, np.arange(3), bootstrap_rounds=rounds, random_state=seed
+    )
+
+    expected = _bootstrap_reference(
+        rounds, len(y_true), seed,
+        lambda rows: skm.f1_score(y_true[rows], y_pred[rows], average='weighted', zero_division=0)
+    )
+    np.testing.assert_allclose(result['confidence_intervals']['f1_score'], expected)
+
+
+def test_regression_bootstrap_intervals_match_sklearn_resamples():
+    rng = np.random.default_rng(2)
+    y_true = rng.normal(size=150)
+    y_pred = y_true + rng.normal(scale=0.5, size=150)
+    rounds, seed = 200, 11
+    result = EvaluationService.regression_metrics(y_true, y_pred, bootstrap_rounds=rounds, random_state=seed)
+    intervals = result['confidence_intervals']
+
+    references = {
+        'r2_score': lambda rows: skm.r2_score(y_true[rows], y_pred[rows]),
+        'mse': lambda rows: skm.mean_squared_error(y_true[rows], y_pred[rows]),
+        'mae': lambda rows: skm.mean_absolute_error(y_true[rows], y_pred[rows]),
+    }
+    for name, score in references.items():
+        np.testing.assert_allclose(
+            intervals[name], _bootstrap_reference(rounds, len(y_true), seed, score), err_msg=name
+        )
+
+
+def test_bootstrap_is_reproducible():
+    y_true, y_pred, y_score = _binary(n_rows=100)
+    first = EvaluationService.classification_metrics(
+        y_true, y_pred, y_score, np.array([0, 1]), bootstrap_rounds=50, random_state=5
+    )
+    second = EvaluationService.classification_metrics(
+        y_true, y_pred, y_score, np.array([0, 1]), bootstrap_rounds=50, random_state=5
+    )
+    assert first['confidence_intervals'] == second['confidence_intervals']
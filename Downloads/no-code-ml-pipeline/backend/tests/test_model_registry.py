@@ -0,0 +1,69 @@
+"""
+Tests for model version resolution in the registry.
+"""
+import json
+import os
+import shutil
+
+import pytest
+from sklearn.dummy import DummyClassifier
+
+from app.core.config import settings
+from app.services.model_registry import ModelRegistry
+
+
+@pytest.fixture(autouse=True)
+def model_dir(tmp_path, monkeypatch):
+    """Give every test an empty registry under a temporary MODEL_DIR."""
+    monkeypatch.setattr(settings, 'MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(ModelRegistry, '_metadata', {})
+    monkeypatch.setattr(ModelRegistry, '_mtimes', {})
+    return tmp_path
+
+
+def _register(name='churn'):
+    estimator = DummyClassifier().fit([[0], [1]], [0, 1])
+    return ModelRegistry.register(name, estimator, None, {'model_type': 'dummy'})
+
+
+def _publish_elsewhere(model_dir, name, version):
+    """Publish a version the way another process would, bypassing this process's cache."""
+    source = os.path.join(model_dir, name, '1')
+    target = os.path.join(model_dir, name, str(version))
+    shutil.copytree(source, target)
+    with open(os.path.join(target, 'metadata.json')) as f:
+        record = json.load(f)
+    record.update(version=version, model_id=f"{name}@{version}")
+    with open(os.path.join(target, 'metadata.json'), 'w') as f:
+        json.dump(record, f)
+    # Bump the directory time explicitly in case the clock tick is coarse
+    stat = os.stat(os.path.join(model_dir, name))
+    os.utime(os.path.join(model_dir, name), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+
+def test_cached_version_id_resolves_from_memory():
+    _register()
+    assert ModelRegistry.get_metadata('churn')['model_id'] == 'churn@1'
+
+    assert ModelRegistry.cached_version_id('churn') == 'churn@1'
+    assert ModelRegistry.cached_version_id('churn@1') == 'churn@1'
+    assert ModelRegistry.cached_version_id('churn@2') is None
+    assert ModelRegistry.cached_version_id('unknown') is None
+
+
+def test_version_published_by_another_process_is_picked_up(model_dir):
+    _register()
+    assert ModelRegistry.get_metadata('churn')['model_id'] == 'churn@1'
+
+    _publish_elsewhere(model_dir, 'churn', 2)
+    assert ModelRegistry.cached_version_id('churn') is None
+    assert ModelRegistry.get_metadata('churn')['model_id'] == 'churn@2'
+    assert ModelRegistry.cached_version_id('churn') == 'churn@2'
+
+
+def test_versions_accumulate():
+    _register()
+    second = _register()
+
+    assert second['model_id'] == 'churn@2'
+    assert [v['version'] for v in ModelRegistry.list_versions('churn')] == [2, 1]
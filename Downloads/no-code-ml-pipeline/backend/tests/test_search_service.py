@@ -0,0 +1,179 @@
+"""
+Tests for the hyperparameter search strategies.
+"""
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from sklearn.base import clone
+from sklearn.datasets import make_classification
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+from sklearn.tree import DecisionTreeClassifier
+
+from app.models.model import ModelType, SearchStrategy
+from app.services.model_service import ModelService
+from app.services.search_service import PRUNING_FIXED, PRUNING_PARAMS, PRUNING_REFITS, SearchService
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_classification(n_samples=600, n_features=8, n_informative=4, random_state=0)
+    folds = list(StratifiedKFold(n_splits=3, shuffle=True, random_state=0).split(X, y))
+    return X, y, folds
+
+
+def _cv_score(estimator, params, X, y, folds, scoring='accuracy'):
+    """Mean validation score of params refitted on every fold."""
+    scorer = get_scorer(scoring)
+    return np.mean([
+        scorer(clone(estimator).set_params(**params).fit(X[train], y[train]), X[val], y[val])
+        for train, val in folds
+    ])
+
+
+def test_grid_matches_grid_search_cv(data):
+    X, y, folds = data
+    estimator = DecisionTreeClassifier(random_state=0)
+    grid = {'max_depth': [2, 4, 8], 'min_samples_leaf': [1, 5]}
+    result = SearchService.search(estimator, grid, X, y, folds, 'accuracy', n_jobs=1)
+    reference = GridSearchCV(estimator, grid, cv=folds, scoring='accuracy').fit(X, y)
+
+    assert result['strategy'] == 'grid'
+    assert result['best_params'] == reference.best_params_
+    assert result['best_score'] == pytest.approx(reference.best_score_)
+    assert result['n_fits'] == 6 * len(folds)
+
+
+def test_halving_best_score_is_a_full_data_score(data):
+    X, y, folds = data
+    estimator = HistGradientBoostingClassifier(max_iter=20, random_state=0)
+    grid = {'learning_rate': [0.01, 0.05, 0.1, 0.3], 'max_depth': [2, 3, 4], 'min_samples_leaf': [5, 20]}
+    result = SearchService.search(
+        estimator, grid, X, y, folds, 'accuracy', strategy=SearchStrategy.HALVING, n_jobs=1
+    )
+
+    full = len(folds[0][0])
+    assert {r['n_resources'] for r in result['results']} > {full}
+    best = [r for r in result['results'] if r['params'] == result['best_params'] and r['n_resources'] == full]
+    assert best and best[0]['mean_score'] == result['best_score']
+    assert result['best_score'] == pytest.approx(_cv_score(estimator, result['best_params'], X, y, folds))
+
+
+def test_halving_rungs_follow_candidate_count(data):
+    X, y, folds = data
+    estimator = DecisionTreeClassifier(random_state=0)
+    result = SearchService.search(
+        estimator, {'max_depth': [2, 3, 4, 5]}, X, y, folds, 'accuracy',
+        strategy=SearchStrategy.HALVING, n_jobs=1
+    )
+
+    # Four candidates can be divided by eta=3 only once: two rungs
+    rungs = sorted({r['n_resources'] for r in result['results']})
+    assert len(rungs) == 2
+    assert rungs[-1] == len(folds[0][0])
+
+
+def test_halving_scores_a_survivor_on_all_rows_past_the_budget(data):
+    X, y, folds = data
+    estimator = DecisionTreeClassifier(random_state=0)
+    grid = {'max_depth': list(range(1, 10)), 'min_samples_leaf': [1, 5, 10]}
+    result = SearchService.search(
+        estimator, grid, X, y, folds, 'accuracy',
+        strategy=SearchStrategy.HALVING, max_fits=len(folds), n_jobs=1
+    )
+
+    assert result['budget_exhausted']
+    assert result['best_score'] == pytest.approx(_cv_score(estimator, result['best_params'], X, y, folds))
+
+
+def test_floor_log_is_exact():
+    assert SearchService._floor_log(243, 3) == 5
+    assert SearchService._floor_log(242, 3) == 4
+    assert SearchService._floor_log(1, 3) == 0
+
+
+@pytest.mark.parametrize("strategy", [SearchStrategy.RANDOM, SearchStrategy.BAYESIAN])
+def test_sampling_strategies_report_refittable_scores(data, strategy):
+    X, y, folds = data
+    estimator = DecisionTreeClassifier(random_state=0)
+    grid = {'max_depth': [2, 3, 4, 6, 8], 'min_samples_leaf': [1, 5, 10]}
+    result = SearchService.search(
+        estimator, grid, X, y, folds, 'accuracy', strategy=strategy, n_candidates=6, n_jobs=1
+    )
+
+    assert result['strategy'] == strategy.value
+    assert result['n_candidates'] <= 6
+    assert result['best_score'] == pytest.approx(_cv_score(estimator, result['best_params'], X, y, folds))
+
+
+def test_score_cache_skips_refits(data):
+    X, y, folds = data
+    estimator = DecisionTreeClassifier(random_state=0)
+    grid = {'max_depth': [2, 4]}
+    first = SearchService.search(estimator, grid, X, y, folds, 'accuracy', n_jobs=1)
+    cache = {SearchService.candidate_key(r['params']): r['fold_scores'] for r in first['results']}
+    second = SearchService.search(estimator, grid, X, y, folds, 'accuracy', n_jobs=1, score_cache=cache)
+
+    assert second['n_cached'] == 2
+    assert second['n_fits'] == 0
+    assert second['best_score'] == first['best_score']
+
+
+def test_pruning_best_params_reproduce_best_score(data):
+    X, y, folds = data
+    estimator = DecisionTreeClassifier(random_state=0)
+    grid = {'max_depth': [3, 5, None], 'min_samples_leaf': [1, 5], 'ccp_alpha': [0.0]}
+    result = SearchService.search(
+        estimator, grid, X, y, folds, 'accuracy', strategy=SearchStrategy.PRUNING, n_jobs=1
+    )
+
+    assert result['strategy'] == 'pruning'
+    for name, value in PRUNING_FIXED.items():
+        assert result['best_params'][name] == value
+    assert result['best_score'] == pytest.approx(_cv_score(estimator, result['best_params'], X, y, folds))
+    assert result['best_estimator'].get_params()['splitter'] == 'best'
+
+
+def test_pruning_refits_only_finalists(data):
+    X, y, folds = data
+    result = SearchService.search(
+        DecisionTreeClassifier(random_state=0), {'max_depth': [2, 3, 4, 5, 6]}, X, y, folds,
+        'accuracy', strategy=SearchStrategy.PRUNING, n_jobs=1
+    )
+
+    refits = [r for r in result['results'] if not r.get('approximate')]
+    assert 0 < len(refits) <= PRUNING_REFITS
+    assert result['best_params'] in [r['params'] for r in refits]
+
+
+def test_pruning_falls_back_to_grid_for_other_parameters(data):
+    X, y, folds = data
+    estimator = DecisionTreeClassifier(random_state=0)
+    grid = {'max_depth': [3, 5], 'max_features': ['sqrt', None]}
+    result = SearchService.search(
+        estimator, grid, X, y, folds, 'accuracy', strategy=SearchStrategy.PRUNING, n_jobs=1
+    )
+
+    assert result['strategy'] == 'grid'
+    assert {r['params']['max_features'] for r in result['results']} == {'sqrt', None}
+    assert not any(r.get('approximate') for r in result['results'])
+
+
+def test_pruning_rejects_other_estimators(data):
+    X, y, folds = data
+    with pytest.raises(HTTPException) as excinfo:
+        SearchService.search(
+            HistGradientBoostingClassifier(max_iter=5), {'max_depth': [2]}, X, y, folds,
+            'accuracy', strategy=SearchStrategy.PRUNING, n_jobs=1
+        )
+    assert excinfo.value.status_code == 400
+
+
+def test_decision_tree_default_strategy_is_grid():
+    assert ModelService._default_search_strategy(ModelType.DECISION_TREE, False) == SearchStrategy.GRID
+    assert ModelService._default_search_strategy(ModelType.DECISION_TREE, True) == SearchStrategy.GRID
+
+    grid = ModelService._get_param_grid(ModelType.DECISION_TREE, False, SearchStrategy.PRUNING)
+    assert set(grid) - PRUNING_PARAMS <= set(PRUNING_FIXED)
+    assert all(grid[name] == [value] for name, value in PRUNING_FIXED.items() if name in grid)
@@ -0,0 +1,138 @@
+"""
+Tests for the content-keyed split cache.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.dataset_service import DatasetService
+from app.services.split_service import SplitService
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """Give every test empty dataset and split caches."""
+    for name in ('_datasets', '_metadata', '_versions', '_fingerprints', '_memory'):
+        monkeypatch.setattr(DatasetService, name, {})
+    monkeypatch.setattr(SplitService, '_splits', OrderedDict())
+    monkeypatch.setattr(SplitService, '_latest', {})
+
+
+@pytest.fixture
+def dataset_file(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'num': rng.normal(size=200),
+        'city': rng.choice(['paris', 'oslo', 'rome'], size=200),
+        'target': rng.integers(0, 2, size=200),
+    })
+    path = tmp_path / 'data.csv'
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def _model_metadata(split_id, dataset_id='ds'):
+    split = SplitService.get_split(split_id)
+    return {
+        'model_id': 'model@1',
+        'dataset_id': dataset_id,
+        'split_id': split_id,
+        'split': {
+            'target_column': split['target_column'],
+            'test_size': split['test_size'],
+            'random_state': split['random_state'],
+            'preprocessing_plan': split['preprocessing_plan'],
+        },
+    }
+
+
+def test_repeated_split_is_served_from_cache(dataset_file):
+    DatasetService.load_dataset('ds', dataset_file)
+    split_id, train_size, test_size = SplitService.perform_split('ds', 'target')
+    entry = SplitService.get_split(split_id)
+
+    assert SplitService.perform_split('ds', 'target') == (split_id, train_size, test_size)
+    assert SplitService.get_split(split_id) is entry
+    assert SplitService.get_split_data('ds') is entry
+
+
+def test_split_id_depends_on_settings(dataset_file):
+    DatasetService.load_dataset('ds', dataset_file)
+    base, _, _ = SplitService.perform_split('ds', 'target')
+
+    assert SplitService.perform_split('ds', 'target', test_size=0.2)[0] != base
+    assert SplitService.perform_split('ds', 'target', random_state=7)[0] != base
+    assert SplitService.perform_split('ds', 'target', categorical_encoding='hashing')[0] != base
+
+
+def test_split_id_survives_reload(dataset_file):
+    DatasetService.load_dataset('ds', dataset_file)
+    split_id, _, _ = SplitService.perform_split('ds', 'target')
+
+    # Reloading bumps the in-memory version; a restart resets it
+    DatasetService.load_dataset('ds', dataset_file)
+    assert SplitService.perform_split('ds', 'target')[0] == split_id
+    for name in ('_datasets', '_versions', '_fingerprints'):
+        getattr(DatasetService, name).clear()
+    DatasetService.load_dataset('ds', dataset_file)
+    assert SplitService.perform_split('ds', 'target')[0] == split_id
+
+
+def test_split_id_changes_with_content(dataset_file):
+    DatasetService.load_dataset('ds', dataset_file)
+    split_id, _, _ = SplitService.perform_split('ds', 'target')
+
+    df = DatasetService.get_dataset('ds').copy()
+    df.loc[0, 'num'] += 1.0
+    DatasetService.update_dataset('ds', df)
+    assert SplitService.perform_split('ds', 'target')[0] != split_id
+
+
+def test_model_split_is_rebuilt_after_eviction(dataset_file):
+    DatasetService.load_dataset('ds', dataset_file)
+    split_id, _, _ = SplitService.perform_split('ds', 'target')
+    metadata = _model_metadata(split_id)
+    expected = SplitService.get_split(split_id)['X_test'].copy()
+
+    SplitService._splits.clear()
+    rebuilt = SplitService.get_model_split(metadata)
+    assert rebuilt['split_id'] == split_id
+    pd.testing.assert_frame_equal(rebuilt['X_test'], expected)
+
+
+def test_model_split_of_changed_dataset_is_a_conflict(dataset_file):
+    DatasetService.load_dataset('ds', dataset_file)
+    split_id, _, _ = SplitService.perform_split('ds', 'target')
+    metadata = _model_metadata(split_id)
+
+    SplitService._splits.clear()
+    df = DatasetService.get_dataset('ds').copy()
+    df.loc[0, 'num'] += 1.0
+    DatasetService.update_dataset('ds', df)
+    with pytest.raises(HTTPException) as excinfo:
+        SplitService.get_model_split(metadata)
+    assert excinfo.value.status_code == 409
+
+
+def test_cache_evicts_least_recently_used(dataset_file, monkeypatch):
+    monkeypatch.setattr(settings, 'SPLIT_CACHE_SIZE', 2)
+    DatasetService.load_dataset('ds', dataset_file)
+    first, _, _ = SplitService.perform_split('ds', 'target', random_state=1)
+    second, _, _ = SplitService.perform_split('ds', 'target', random_state=2)
+    SplitService.get_split(first)
+    third, _, _ = SplitService.perform_split('ds', 'target', random_state=3)
+
+    assert list(SplitService._splits) == [first, third]
+    with pytest.raises(HTTPException):
+        SplitService.get_split(second)
+
+
+def test_missing_target_is_rejected(dataset_file):
+    DatasetService.load_dataset('ds', dataset_file)
+    with pytest.raises(HTTPException) as excinfo:
+        SplitService.perform_split('ds', 'nope')
+    assert excinfo.value.status_code == 400
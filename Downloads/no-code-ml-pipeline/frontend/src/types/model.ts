@@ -1,5 +1,5 @@
 // Model types
-export type ModelType = 'logistic_regression' | 'decision_tree'
+export type ModelType = 'logistic_regression' | 'decision_tree' | 'sgd_linear' | 'hist_gradient_boosting' | 'naive_bayes'
 
 export interface TrainTestSplitResponse {
     success: boolean
@@ -19,6 +19,8 @@ export interface ModelTrainResponse {
     precision?: number
     recall?: number
     f1_score?: number
+    roc_auc?: number
+    pr_auc?: number
     confusion_matrix?: number[][]
     feature_importance?: Record<string, number>
 }